@@ -1,6 +1,8 @@
-from scipy.stats import norm
+from blackscholes import norm_cdf, norm_pdf, SQRT_2PI
 from math import pi
 from numpy import log, sqrt
+from scipy.special import ndtr
+import numpy as np
 
 
 class ImpliedVol(object):
@@ -22,6 +24,103 @@ class ImpliedVol(object):
     def get_lower_bound(self):
         d1 = self.d1Value
         d2 = d1 - self.vol * sqrt(self.tau)
-        lowerBound = -norm.cdf(-d2) / (self.strike * sqrt(self.tau) * norm.pdf(d2))
+        lowerBound = -norm_cdf(-d2) / (self.strike * sqrt(self.tau) * norm_pdf(d2))
 
         return lowerBound
+
+
+def implied_vol(price, spot, strike, interestRate, dividend, tau, optionType=0,
+                volTolerance=1e-10, maxIterations=50, volLower=1e-6, volUpper=10.0):
+    """
+    Implied volatilities of whole chains (all inputs broadcast against each other)
+
+    Each price is turned into the price of the out-of-the-money option through put-call parity.
+    The iteration starts from the Corrado-Miller rational approximation and takes Halley steps on the log
+    of that price (using vega and volga), which stays well conditioned for deep out-of-the-money options.
+    Steps are safeguarded by a bracket [volLower, volUpper] that shrinks with the sign of the pricing error;
+    a step leaving the bracket is replaced by bisection. Converged elements are masked out and stop iterating.
+
+    optionType : 0 / OptionType.CALL for calls, 1 / OptionType.PUT for puts
+    Returns implied vols, NaN where the price has no time value or is above the no-arbitrage upper bound,
+    and where the iteration has not converged after maxIterations
+    """
+    price, spot, strike, interestRate, dividend, tau, optionType = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (price, spot, strike, interestRate, dividend, tau, optionType))
+    )
+    shape = price.shape
+    price, spot, strike, interestRate, dividend, tau, optionType = (
+        x.ravel() for x in (price, spot, strike, interestRate, dividend, tau, optionType)
+    )
+
+    forwardSpot = spot * np.exp(-dividend * tau)
+    discountedStrike = strike * np.exp(-interestRate * tau)
+
+    # Out-of-the-money option: call if K e^{-rT} >= S e^{-qT}, else put (sign -1)
+    sign = np.where(discountedStrike >= forwardSpot, 1.0, -1.0)
+    givenSign = 1.0 - 2.0 * optionType
+    intrinsic = np.maximum(givenSign * (forwardSpot - discountedStrike), 0.0)
+    target = price - intrinsic   # time value = price of the out-of-the-money option
+
+    upperPrice = np.where(sign > 0, forwardSpot, discountedStrike)
+    valid = (target > 0) & (price < np.where(givenSign > 0, forwardSpot, discountedStrike)) & (tau > 0)
+
+    logMoneyness = np.log(forwardSpot / discountedStrike)
+    sqrtTau = np.sqrt(tau)
+
+    # Corrado-Miller initial guess from the call price (inf / NaN where tau = 0, which are not valid anyway)
+    callPrice = target + np.maximum(forwardSpot - discountedStrike, 0.0)
+    halfGap = (forwardSpot - discountedStrike) / 2
+    radicand = np.maximum((callPrice - halfGap) ** 2 - (forwardSpot - discountedStrike) ** 2 / pi, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        guess = SQRT_2PI / (sqrtTau * (forwardSpot + discountedStrike)) * (callPrice - halfGap + np.sqrt(radicand))
+
+    vol = np.full(price.shape, np.nan)
+    lower = np.full(price.shape, volLower)
+    upper = np.full(price.shape, volUpper)
+    vol[valid] = np.clip(np.nan_to_num(guess[valid], nan=0.2), 2 * volLower, volUpper / 2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logTarget = np.log(target)
+    active = np.flatnonzero(valid & (target < upperPrice))
+    for _ in range(maxIterations):
+        if active.size == 0:
+            break
+
+        v, s, x, rt = vol[active], sign[active], logMoneyness[active], sqrtTau[active]
+        volSqrtTau = v * rt
+        d1 = x / volSqrtTau + 0.5 * volSqrtTau
+        d2 = d1 - volSqrtTau
+
+        model = s * (forwardSpot[active] * ndtr(s * d1) - discountedStrike[active] * ndtr(s * d2))
+        vega = forwardSpot[active] * np.exp(-0.5 * d1 ** 2) / SQRT_2PI * rt
+        volga = vega * d1 * d2 / v
+
+        # Price is increasing in vol: a model price above the target means the vol is too high
+        tooHigh = model > target[active]
+        lower[active] = np.where(tooHigh, lower[active], np.maximum(lower[active], v))
+        upper[active] = np.where(tooHigh, np.minimum(upper[active], v), upper[active])
+
+        # Halley step on log(model) - log(target), far better conditioned than the price for deep OTM options
+        error = np.log(model) - logTarget[active]
+        slope = vega / model
+        curvature = volga / model - slope ** 2
+        newton = error / slope
+        step = newton / (1 - 0.5 * newton * curvature / slope)
+        newVol = v - step
+
+        outside = ~np.isfinite(newVol) | (newVol <= lower[active]) | (newVol >= upper[active])
+        newVol = np.where(outside, 0.5 * (lower[active] + upper[active]), newVol)
+
+        # Elements already matching the target keep their vol
+        matched = np.abs(error) < 1e-13
+        newVol = np.where(matched, v, newVol)
+
+        # Halley converges cubically: after a step below sqrt(volTolerance) the remaining error is far below volTolerance
+        vol[active] = newVol
+        converged = (matched | (~outside & (np.abs(step) < np.sqrt(volTolerance)))
+                     | (upper[active] - lower[active] < volTolerance))
+        active = active[~converged]
+
+    # Not converged within maxIterations
+    vol[active] = np.nan
+    return vol.reshape(shape)
@@ -1,6 +1,8 @@
-from scipy.stats import norm
+from blackscholes import norm_cdf, norm_pdf, d1_d2, discount_factors
 from numpy import log, sqrt, exp, pi
 from enum import IntEnum
+from typing import NamedTuple
+import numpy as np
 
 
 class OptionType(IntEnum):
@@ -17,10 +19,9 @@ class SkewKurtAdjust(object):
         self.tau = tau
         self.dividend = dividend
 
-        self.d1 = (log(self.spot / self.strike) + (self.interestRate - self.dividend + (self.vol**2)/2 * self.tau)) / (sqrt(self.tau) * self.vol)
-        self.d2 = self.d1 - (self.vol * sqrt(self.tau))
+        self.d1, self.d2 = d1_d2(self.spot, self.strike, self.interestRate, self.dividend, self.vol, self.tau)
 
-        self.callOptionValue = self.spot * exp(-self.dividend * self.tau) * norm.cdf(self.d1) - self.strike * exp(-self.interestRate * self.tau) * norm.cdf(self.d2)
+        self.callOptionValue = self.spot * exp(-self.dividend * self.tau) * norm_cdf(self.d1) - self.strike * exp(-self.interestRate * self.tau) * norm_cdf(self.d2)
 
     def get_option_value_jarrow_rudd(self, dataSkew, dataKurt, optionType: OptionType):
         param = sqrt(exp(self.vol**2 * self.tau) - 1)
@@ -44,7 +45,7 @@ class SkewKurtAdjust(object):
             optionValue = self.callOptionValue + lambda1 * q3 + lambda2 * q4
 
         else:
-            optionValue = self.callOptionValue + lambda1 * q3 + lambda2 * q4 - self.spot * exp(-self.dividend * self.tau) + self.strike * exp(self.interestRate * self.tau)
+            optionValue = self.callOptionValue + lambda1 * q3 + lambda2 * q4 - self.spot * exp(-self.dividend * self.tau) + self.strike * exp(-self.interestRate * self.tau)
 
         return optionValue
 
@@ -52,8 +53,8 @@ class SkewKurtAdjust(object):
         skewness = dataSkew
         kurtosis = dataKurt
 
-        q3 = (1/6) * self.spot * self.vol * sqrt(self.tau) * ((2 * self.vol * sqrt(self.tau)) - self.d1) * norm.pdf(self.d1) + (self.vol**2 * self.tau * norm.cdf(self.d1))
-        q4 = (1/24) * self.spot * self.vol * sqrt(self.tau) * ((self.d1**2 - 1 - 3 * self.vol * sqrt(self.tau)*self.d2) * norm.pdf(self.d1)) + (self.vol**3 * self.tau**1.5 * norm.cdf(self.d1))
+        q3 = (1/6) * self.spot * self.vol * sqrt(self.tau) * ((2 * self.vol * sqrt(self.tau)) - self.d1) * norm_pdf(self.d1) + (self.vol**2 * self.tau * norm_cdf(self.d1))
+        q4 = (1/24) * self.spot * self.vol * sqrt(self.tau) * ((self.d1**2 - 1 - 3 * self.vol * sqrt(self.tau)*self.d2) * norm_pdf(self.d1)) + (self.vol**3 * self.tau**1.5 * norm_cdf(self.d1))
 
         if optionType == OptionType.CALL:
             optionValue = self.callOptionValue + skewness * q3 + (kurtosis - 3) * q4
@@ -70,13 +71,256 @@ class SkewKurtAdjust(object):
         w = (skewness/6) * self.vol**3 * self.tau**1.5 + (kurtosis/24) * self.vol**4 * self.tau**2
         d = self.d1 - (log(1+w / (self.vol*sqrt(self.tau))))
 
-        q3 = (1 / (6+6*w)) * self.spot * self.vol * sqrt(self.tau) * (2 * self.vol * sqrt(self.tau) - d) * norm.pdf(d)
-        q4 = (1 / (24+24*w)) * self.spot * self.vol * sqrt(self.tau) * (d**2 - 3 * d * self.vol * sqrt(self.tau) + 3 * self.vol**2 * self.tau - 1) * norm.pdf(d)
+        q3 = (1 / (6+6*w)) * self.spot * self.vol * sqrt(self.tau) * (2 * self.vol * sqrt(self.tau) - d) * norm_pdf(d)
+        q4 = (1 / (24+24*w)) * self.spot * self.vol * sqrt(self.tau) * (d**2 - 3 * d * self.vol * sqrt(self.tau) + 3 * self.vol**2 * self.tau - 1) * norm_pdf(d)
 
         if optionType == OptionType.CALL:
-            optionValue = self.callOptionValue + kurtosis * q3 + (kurtosis-3) * q4
+            optionValue = self.callOptionValue + skewness * q3 + (kurtosis - 3) * q4
 
         else:
             optionValue = self.callOptionValue + skewness * q3 + (kurtosis - 3) * q4 - self.spot * exp(-self.dividend * self.tau) + self.strike * exp(-self.interestRate * self.tau)
 
         return optionValue
+
+
+MODELS = ('jarrow_rudd', 'corrado_su', 'modified_corrado_su')
+
+
+class ExpansionTerms(NamedTuple):
+    """
+    Terms of the Jarrow-Rudd / Corrado-Su expansions on an (expiry x strike) grid, such that
+
+        price = callOptionValue + (skew - skewOffset) * q3 + (kurt - kurtOffset) * q4 + isPut * putAdjustment
+    """
+    callOptionValue : np.ndarray
+    q3              : np.ndarray
+    q4              : np.ndarray
+    skewOffset      : np.ndarray
+    kurtOffset      : np.ndarray
+    putAdjustment   : np.ndarray
+
+
+def _chain_grid(spot, strikes, interestRate, vols, taus, dividend):
+    """
+    Broadcast inputs to (expiry x strike): taus, per-expiry vols/rates/dividends become columns,
+    strikes a row (or a full grid). Returns the shared terms of SkewKurtAdjust.__init__.
+    """
+    taus = np.asarray(taus, dtype=np.float64).reshape(-1, 1)
+    column = lambda x: np.asarray(x, dtype=np.float64).reshape(-1, 1) if np.ndim(x) == 1 else np.asarray(x, dtype=np.float64)
+    strikes = np.asarray(strikes, dtype=np.float64)
+    strikes = strikes.reshape(1, -1) if strikes.ndim == 1 else strikes
+    vols, interestRate, dividend = column(vols), column(interestRate), column(dividend)
+
+    sqrtTau = np.sqrt(taus)
+    volSqrtTau = vols * sqrtTau
+    d1, d2 = d1_d2(spot, strikes, interestRate, dividend, vols, taus)
+
+    # Computed once per expiry (per option only if vols/rates are given per option)
+    rateDiscount, dividendDiscount = discount_factors(interestRate, dividend, taus)
+    callOptionValue = spot * dividendDiscount * norm_cdf(d1) - strikes * rateDiscount * norm_cdf(d2)
+
+    return taus, strikes, vols, interestRate, sqrtTau, volSqrtTau, d1, d2, rateDiscount, dividendDiscount, callOptionValue
+
+
+def expansion_terms(spot, strikes, interestRate, vols, taus, dividend, model='corrado_su'):
+    """
+    Expansion terms of a whole (expiry x strike) grid for the models that are linear in skewness and kurtosis
+    ('jarrow_rudd', 'corrado_su'); same formulas as SkewKurtAdjust
+
+    strikes : (nStrikes,) shared by all expiries, or (nExpiries, nStrikes)
+    vols, interestRate, dividend : scalar, (nExpiries,) or (nExpiries, nStrikes)
+    taus : (nExpiries,)
+    """
+    (taus, strikes, vols, interestRate, sqrtTau, volSqrtTau, d1, d2,
+     rateDiscount, dividendDiscount, callOptionValue) = _chain_grid(spot, strikes, interestRate, vols, taus, dividend)
+    forwardSpot = spot * dividendDiscount
+
+    if model == 'jarrow_rudd':
+        expVarianceMinusOne = np.exp(vols**2 * taus) - 1
+        param = np.sqrt(expVarianceMinusOne)
+
+        logSkew = 3*param + param**3
+        logKurt = 16*param**2 + 15*param**4 + 6*param**6 + param**8
+
+        a = (np.exp(-d2**2) / 2) / (strikes * vols * np.sqrt(taus * 2 * pi))
+        derivatives1 = a * (d2 - volSqrtTau) / (strikes * volSqrtTau)
+        derivatives2 = (a / strikes**2 * vols**2 * taus) * \
+                       ((d2 - volSqrtTau) ** 2 - volSqrtTau * (d2 - volSqrtTau) - 1)
+
+        spotDiscounted = spot * rateDiscount
+        q3 = -spotDiscounted**3 * expVarianceMinusOne**1.5 * (rateDiscount / 6) * derivatives1
+        q4 = (spotDiscounted**4 * expVarianceMinusOne**2 * rateDiscount * derivatives2) / 24
+
+        putAdjustment = -forwardSpot + strikes * rateDiscount
+        return ExpansionTerms(callOptionValue, q3, q4, logSkew, logKurt, putAdjustment)
+
+    if model == 'corrado_su':
+        pdf1, cdf1 = norm_pdf(d1), norm_cdf(d1)
+        q3 = (1/6) * spot * volSqrtTau * ((2 * volSqrtTau) - d1) * pdf1 + (vols**2 * taus * cdf1)
+        q4 = (1/24) * spot * volSqrtTau * ((d1**2 - 1 - 3 * volSqrtTau * d2) * pdf1) + (vols**3 * taus**1.5 * cdf1)
+
+        putAdjustment = -forwardSpot + strikes * rateDiscount
+        return ExpansionTerms(callOptionValue, q3, q4, np.zeros_like(taus), np.full_like(taus, 3.0), putAdjustment)
+
+    raise ValueError(f"expansion_terms supports 'jarrow_rudd' and 'corrado_su', not {model!r}")
+
+
+def price_chain(spot, strikes, interestRate, vols, taus, dividend, skews, kurts,
+                optionType=OptionType.CALL, model='corrado_su'):
+    """
+    Prices of a whole (expiry x strike) grid of calls and/or puts under one of MODELS,
+    with the formulas of the corresponding SkewKurtAdjust method
+
+    strikes : (nStrikes,) shared by all expiries, or (nExpiries, nStrikes)
+    vols, interestRate, dividend : scalar, (nExpiries,) or (nExpiries, nStrikes)
+    taus, skews, kurts : (nExpiries,)
+    optionType : OptionType, or an array of 0 (call) / 1 (put) broadcasting to (nExpiries, nStrikes)
+
+    Returns an array of shape (nExpiries, nStrikes)
+    """
+    skews = np.asarray(skews, dtype=np.float64).reshape(-1, 1)
+    kurts = np.asarray(kurts, dtype=np.float64).reshape(-1, 1)
+    isPut = np.asarray(optionType) == OptionType.PUT
+
+    if model in ('jarrow_rudd', 'corrado_su'):
+        terms = expansion_terms(spot, strikes, interestRate, vols, taus, dividend, model)
+        optionValue = terms.callOptionValue + (skews - terms.skewOffset) * terms.q3 + (kurts - terms.kurtOffset) * terms.q4
+        return np.where(isPut, optionValue + terms.putAdjustment, optionValue)
+
+    if model != 'modified_corrado_su':
+        raise ValueError(f'model must be one of {MODELS}')
+
+    (taus, strikes, vols, interestRate, sqrtTau, volSqrtTau, d1, d2,
+     rateDiscount, dividendDiscount, callOptionValue) = _chain_grid(spot, strikes, interestRate, vols, taus, dividend)
+
+    w = (skews/6) * vols**3 * taus**1.5 + (kurts/24) * vols**4 * taus**2
+    d = d1 - (log(1+w / volSqrtTau))
+    pdf = norm_pdf(d)
+
+    q3 = (1 / (6+6*w)) * spot * volSqrtTau * (2 * volSqrtTau - d) * pdf
+    q4 = (1 / (24+24*w)) * spot * volSqrtTau * (d**2 - 3 * d * volSqrtTau + 3 * vols**2 * taus - 1) * pdf
+
+    callValue = callOptionValue + skews * q3 + (kurts - 3) * q4
+    return np.where(isPut, callValue - spot * dividendDiscount + strikes * rateDiscount, callValue)
+
+
+class SkewKurtCalibration(NamedTuple):
+    """ Calibrated parameters per smile (row), and the root mean squared price error of the fit """
+    skew  : np.ndarray
+    kurt  : np.ndarray
+    vol   : np.ndarray
+    rmse  : np.ndarray
+    count : np.ndarray
+
+
+def _fit_skew_kurt(spot, strikes, interestRate, vols, taus, dividend, prices, isPut, weights, model):
+    """
+    Weighted least squares of (skew, kurt) per row through the 2 x 2 normal equations;
+    price - callOptionValue - isPut * putAdjustment + skewOffset * q3 + kurtOffset * q4 = skew * q3 + kurt * q4
+    """
+    terms = expansion_terms(spot, strikes, interestRate, vols, taus, dividend, model)
+    target = (prices - terms.callOptionValue - isPut * terms.putAdjustment
+              + terms.skewOffset * terms.q3 + terms.kurtOffset * terms.q4)
+
+    # Padded entries have zero weight; zero them so that NaN quotes do not propagate
+    used = weights > 0
+    q3 = np.where(used, terms.q3, 0.0)
+    q4 = np.where(used, terms.q4, 0.0)
+    target = np.where(used, target, 0.0)
+
+    a11 = np.einsum('ij,ij,ij->i', weights, q3, q3)
+    a12 = np.einsum('ij,ij,ij->i', weights, q3, q4)
+    a22 = np.einsum('ij,ij,ij->i', weights, q4, q4)
+    b1 = np.einsum('ij,ij,ij->i', weights, q3, target)
+    b2 = np.einsum('ij,ij,ij->i', weights, q4, target)
+
+    det = a11 * a22 - a12**2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        singular = ~(np.abs(det) > 1e-14 * np.maximum(a11 * a22, np.finfo(np.float64).tiny))
+        skew = np.where(singular, np.nan, (a22 * b1 - a12 * b2) / det)
+        kurt = np.where(singular, np.nan, (a11 * b2 - a12 * b1) / det)
+
+    residual = np.where(used, skew[:, None] * q3 + kurt[:, None] * q4 - target, 0.0)
+    sse = np.einsum('ij,ij,ij->i', weights, residual, residual)
+    return skew, kurt, sse
+
+
+def calibrate_skew_kurt(spot, strikes, interestRate, vols, taus, dividend, prices,
+                        optionType=OptionType.CALL, model='corrado_su', weights=None,
+                        fitVol=False, volBounds=(0.01, 2.0), volGridSize=41, volCandidates=3, volTolerance=1e-8):
+    """
+    Skewness and kurtosis (and optionally vol) that best fit observed option prices, for many smiles at once
+
+    Each row is one smile (e.g. one expiry of one underlying); rows of different lengths are padded with NaN prices.
+    The 'corrado_su' and 'jarrow_rudd' prices are linear in skewness and kurtosis, so for a given vol each row is a
+    weighted least squares problem solved in closed form through its 2 x 2 normal equations.
+    With fitVol, the vol of each row minimizes the error left after that solve: the local minima on volGridSize
+    log-spaced vols within volBounds are found, and the best volCandidates of them are refined to volTolerance
+    by a golden-section search, for all rows together.
+
+    spot, interestRate, dividend, taus : scalar or (nRows,)
+    strikes, prices : (nRows, nStrikes); strikes may also be (nStrikes,) if shared
+    vols : (nRows,), the fixed vols or, with fitVol, unused
+    optionType : OptionType, or an array of 0 (call) / 1 (put) broadcasting to (nRows, nStrikes)
+    weights : optional (nRows, nStrikes) weights of the squared price errors (1 by default)
+
+    Returns SkewKurtCalibration of (nRows,) arrays; kurt is the kurtosis itself (3 for a normal distribution)
+    """
+    if model not in ('jarrow_rudd', 'corrado_su'):
+        raise ValueError(f"calibrate_skew_kurt supports 'jarrow_rudd' and 'corrado_su', not {model!r}")
+
+    prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+    nRows = prices.shape[0]
+    column = lambda x: np.broadcast_to(np.asarray(x, dtype=np.float64).reshape(-1, 1), (nRows, 1))
+    spot, interestRate, dividend = column(spot), column(interestRate), column(dividend)
+    taus = column(taus)[:, 0]
+
+    strikes = np.broadcast_to(np.asarray(strikes, dtype=np.float64), prices.shape)
+    isPut = np.broadcast_to(np.asarray(optionType) == OptionType.PUT, prices.shape)
+    weights = np.ones(prices.shape) if weights is None else np.asarray(weights, dtype=np.float64)
+    weights = np.where(np.isfinite(prices) & np.isfinite(strikes) & (strikes > 0), weights, 0.0)
+    count = np.count_nonzero(weights, axis=1)
+
+    def fit(vols):
+        return _fit_skew_kurt(spot, strikes, interestRate, vols, taus, dividend, prices, isPut, weights, model)
+
+    if fitVol:
+        # The error is not unimodal in vol (a wrong vol can be partly offset by the kurtosis), so the local minima
+        # are first located on a log-spaced grid, then the best volCandidates of them are refined by a
+        # golden-section search, all vectorized over rows
+        volGrid = np.geomspace(volBounds[0], volBounds[1], volGridSize)
+        gridErrors = np.array([fit(np.full(nRows, vol))[2] for vol in volGrid])
+        gridErrors = np.where(np.isnan(gridErrors), np.inf, gridErrors)
+        padded = np.pad(gridErrors, ((1, 1), (0, 0)), constant_values=np.inf)
+        localMinimum = (gridErrors <= padded[:-2]) & (gridErrors <= padded[2:])
+        candidates = np.argsort(np.where(localMinimum, gridErrors, np.inf), axis=0, kind='stable')[:volCandidates]
+
+        invPhi = (sqrt(5) - 1) / 2
+        vols, bestErrors = np.full(nRows, np.nan), np.full(nRows, np.inf)
+        for best in candidates:
+            lower = volGrid[np.maximum(best - 1, 0)]
+            upper = volGrid[np.minimum(best + 1, volGridSize - 1)]
+            x1 = upper - invPhi * (upper - lower)
+            x2 = lower + invPhi * (upper - lower)
+            f1, f2 = fit(x1)[2], fit(x2)[2]
+            for _ in range(int(np.ceil(np.log(volTolerance / np.max(upper - lower)) / np.log(invPhi)))):
+                # Minimum in [lower, x2]: x1 becomes the new x2; otherwise in [x1, upper]: x2 becomes the new x1
+                left = ~(f1 > f2)
+                lower, upper = np.where(left, lower, x1), np.where(left, x2, upper)
+                kept, fKept = np.where(left, x1, x2), np.where(left, f1, f2)
+                new = np.where(left, upper - invPhi * (upper - lower), lower + invPhi * (upper - lower))
+                fNew = fit(new)[2]
+                x1, f1 = np.where(left, new, kept), np.where(left, fNew, fKept)
+                x2, f2 = np.where(left, kept, new), np.where(left, fKept, fNew)
+
+            vol = (lower + upper) / 2
+            error = fit(vol)[2]
+            better = error < bestErrors
+            vols, bestErrors = np.where(better, vol, vols), np.where(better, error, bestErrors)
+    else:
+        vols = np.broadcast_to(np.asarray(vols, dtype=np.float64), (nRows,))
+
+    skew, kurt, sse = fit(vols)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rmse = np.sqrt(sse / np.where(count > 0, np.einsum('ij->i', weights), np.nan))
+    return SkewKurtCalibration(skew, kurt, np.asarray(vols, dtype=np.float64), rmse, count)
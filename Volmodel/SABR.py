@@ -1,4 +1,176 @@
 from numpy import where, sqrt, log
+from typing import NamedTuple
+from scipy.optimize import least_squares
+import numpy as np
+
+
+class StrikeTerms(NamedTuple):
+    """ Strike-only terms of the SABR vol out of the money, computed once per smile """
+    forwardXPower    : np.ndarray   # (spot * K) ** ((1 - beta) / 2)
+    logForwardXRatio : np.ndarray   # log(spot / K)
+    denominator      : np.ndarray   # 1 + (1 - beta)^2 log^2 / 24 + (1 - beta)^4 log^4 / 1920
+    ratioPower       : np.ndarray   # (spot / K) ** (1 - beta)
+
+
+def strike_terms(spot, strikes, beta):
+    forwardX = spot * np.asarray(strikes, dtype=np.float64)
+    forwardXRatio = spot / np.asarray(strikes, dtype=np.float64)
+    betaComplement = 1 - beta
+    logForwardXRatio = log(forwardXRatio)
+    return StrikeTerms(
+        forwardX ** (betaComplement / 2),
+        logForwardXRatio,
+        1 + (betaComplement ** 2 * logForwardXRatio ** 2 / 24) + (betaComplement ** 4 * logForwardXRatio ** 4 / 1920),
+        forwardXRatio ** betaComplement,
+    )
+
+
+SERIES_Z_THRESHOLD = 0.05
+SERIES_ORDER = 12
+
+
+def _chi_over_z_series(zValue, rho):
+    """
+    chi(z) / z and its derivatives with respect to z and rho, as power series in z
+
+    chi'(z) = 1 / sqrt(1 - 2 rho z + z^2) is the generating function of the Legendre polynomials P_n(rho),
+    so chi(z) / z = sum P_n(rho) z^n / (n + 1); truncated at SERIES_ORDER, the error is below 1e-16 for
+    |z| < SERIES_Z_THRESHOLD
+    """
+    legendre, previousLegendre = np.ones_like(rho), np.zeros_like(rho)
+    dLegendre, previousDLegendre = np.zeros_like(rho), np.zeros_like(rho)
+    power, previousPower = np.ones_like(zValue), np.zeros_like(zValue)
+    series, dSeriesdZ, dSeriesdRho = np.zeros_like(zValue), np.zeros_like(zValue), np.zeros_like(zValue)
+    for n in range(SERIES_ORDER + 1):
+        series = series + legendre * power / (n + 1)
+        dSeriesdZ = dSeriesdZ + n * legendre * previousPower / (n + 1)
+        dSeriesdRho = dSeriesdRho + dLegendre * power / (n + 1)
+        # (n + 1) P_{n+1} = (2n + 1) rho P_n - n P_{n-1},  P'_{n+1} = P'_{n-1} + (2n + 1) P_n
+        legendre, previousLegendre, dLegendre, previousDLegendre = (
+            ((2 * n + 1) * rho * legendre - n * previousLegendre) / (n + 1), legendre,
+            previousDLegendre + (2 * n + 1) * legendre, dLegendre,
+        )
+        power, previousPower = power * zValue, power
+    return series, dSeriesdZ, dSeriesdRho
+
+
+def _z_ratio(zValue, rho):
+    """
+    z / chi(z) with its derivatives with respect to z and rho (z held fixed)
+
+    Near the money (|z| < SERIES_Z_THRESHOLD, including z = 0) the power series of chi(z) / z is used,
+    which tends to z / chi = 1 - rho z / 2 + (2 - 3 rho^2) z^2 / 12 + ...; elsewhere the closed form
+    """
+    shape = np.broadcast(zValue, rho).shape
+    zValue, rho = np.broadcast_arrays(np.atleast_1d(np.asarray(zValue, dtype=np.float64)),
+                                      np.atleast_1d(np.asarray(rho, dtype=np.float64)))
+    root = sqrt(1 - 2 * rho * zValue + zValue ** 2)
+    near = np.abs(zValue) < SERIES_Z_THRESHOLD
+
+    # chi = log((root + z - rho) / (1 - rho)) written with log1p, since (root + z - rho) / (1 - rho) -> 1
+    farZ = np.where(near, 1.0, zValue)
+    chiZValue = np.log1p((farZ + (farZ ** 2 - 2 * rho * farZ) / (root + 1)) / (1 - rho))
+    farRatio = farZ / chiZValue
+    farDRatiodZ = (1 - farRatio / root) / chiZValue
+    # (-z / root - 1) / (root + z - rho) + 1 / (1 - rho) with the cancelling terms taken out
+    dChidRho = farZ ** 2 * (root + farZ - 2 * rho + rho * (2 * rho - farZ) / (root + 1)) / \
+               ((root + 1) * (1 - rho) * root * (root + farZ - rho))
+
+    zRatio, dRatiodZ, dRatiodRho = farRatio, farDRatiodZ, -farRatio / chiZValue * dChidRho
+    if near.any():
+        # z / chi = 1 / (chi / z), evaluated only where needed
+        series, dSeriesdZ, dSeriesdRho = _chi_over_z_series(zValue[near], rho[near])
+        zRatio[near] = 1 / series
+        dRatiodZ[near] = -zRatio[near] ** 2 * dSeriesdZ
+        dRatiodRho[near] = -zRatio[near] ** 2 * dSeriesdRho
+
+    return zRatio.reshape(shape), dRatiodZ.reshape(shape), dRatiodRho.reshape(shape)
+
+
+def sabr_vol_out_atm(alpha, rho, vVol, beta, tau, terms, jacobian=False):
+    """
+    Vol of StochasticABR.get_vol_of_out_atm from precomputed StrikeTerms; parameters broadcast against the strikes
+
+    With jacobian, also returns the derivatives with respect to (alpha, rho, vVol) stacked on a last axis
+    """
+    betaComplement = 1 - beta
+    zValue = (alpha / vVol) * terms.forwardXPower * terms.logForwardXRatio
+    zRatio, dRatiodZ, dRatiodRho = _z_ratio(zValue, rho)
+
+    scale = 1 / (terms.forwardXPower * terms.denominator)
+    firstTerm = alpha * zRatio * scale
+    secondTerm = tau * (1 + ((betaComplement ** 2 * alpha ** 2 / (24 * terms.ratioPower)) +
+                             0.25 * (rho * beta * vVol * alpha) / terms.forwardXPower +
+                             ((2 - 3 * rho ** 2) * vVol ** 2) / 24))
+    vol = firstTerm * secondTerm
+    if not jacobian:
+        return vol
+
+    # dz/dalpha = z / alpha, dz/dvVol = -z / vVol
+    dFirstdAlpha = (zRatio + zValue * dRatiodZ) * scale
+    dFirstdRho = alpha * dRatiodRho * scale
+    dFirstdVVol = -alpha * dRatiodZ * zValue / vVol * scale
+
+    dSeconddAlpha = tau * (betaComplement ** 2 * alpha / (12 * terms.ratioPower) + 0.25 * rho * beta * vVol / terms.forwardXPower)
+    dSeconddRho = tau * (0.25 * beta * vVol * alpha / terms.forwardXPower - rho * vVol ** 2 / 4)
+    dSeconddVVol = tau * (0.25 * rho * beta * alpha / terms.forwardXPower + (2 - 3 * rho ** 2) * vVol / 12)
+
+    return vol, np.stack([
+        dFirstdAlpha * secondTerm + firstTerm * dSeconddAlpha,
+        dFirstdRho * secondTerm + firstTerm * dSeconddRho,
+        dFirstdVVol * secondTerm + firstTerm * dSeconddVVol,
+    ], axis=-1)
+
+
+def sabr_vol_atm(alpha, rho, vVol, beta, spot, jacobian=False):
+    """ Vol of StochasticABR.get_vol_of_atm, optionally with its derivatives with respect to (alpha, rho, vVol) """
+    betaComplement = 1 - beta
+    spotPower = spot ** betaComplement
+
+    atmFirstTerm = alpha / spotPower
+    atmSecondTerm = betaComplement ** 2 / (24 * spotPower ** 2) + \
+                    0.25 * (rho * beta * alpha * vVol) / spotPower + ((2 - 3 * rho ** 2) * vVol ** 2) / 24
+    vol = atmFirstTerm * atmSecondTerm
+    if not jacobian:
+        return vol
+
+    return vol, np.stack(np.broadcast_arrays(
+        atmSecondTerm / spotPower + atmFirstTerm * 0.25 * rho * beta * vVol / spotPower,
+        atmFirstTerm * (0.25 * beta * alpha * vVol / spotPower - rho * vVol ** 2 / 4),
+        atmFirstTerm * (0.25 * rho * beta * alpha / spotPower + (2 - 3 * rho ** 2) * vVol / 12),
+    ), axis=-1)
+
+
+class SABRVols(NamedTuple):
+    """ SABR vols and their derivatives with respect to the parameters, all of shape (nParams, nStrikes) """
+    vol    : np.ndarray
+    dAlpha : np.ndarray
+    dRho   : np.ndarray
+    dVVol  : np.ndarray
+
+
+def sabr_vol(alpha, rho, vVol, beta, spot, tau, strikes, terms=None):
+    """
+    SABR vols of many parameter sets on arbitrary strikes, with their parameter sensitivities
+
+    The vol is that of sabr_vol_out_atm at every strike: at and near the money z / chi(z) tends to its limit
+    (see _z_ratio), so no separate ATM branch is needed and the smile stays smooth through the money.
+    Note that this limit is not the formula of get_vol_of_atm, which StochasticABR keeps for its ATM quote.
+
+    alpha, rho, vVol, spot, tau : scalars or (nParams,) arrays
+    strikes : (nStrikes,) shared by all parameter sets, or (nParams, nStrikes)
+    terms : optional strike_terms(spot, strikes, beta), to reuse across calls with the same spot and strikes
+
+    Returns SABRVols of (nParams, nStrikes) arrays
+    """
+    column = lambda x: np.asarray(x, dtype=np.float64).reshape(-1, 1) if np.ndim(x) == 1 else np.asarray(x, dtype=np.float64)
+    alpha, rho, vVol, spot, tau = (column(x) for x in (alpha, rho, vVol, spot, tau))
+    if terms is None:
+        strikes = np.asarray(strikes, dtype=np.float64)
+        terms = strike_terms(spot, strikes.reshape(1, -1) if strikes.ndim == 1 else strikes, beta)
+
+    vol, jac = sabr_vol_out_atm(alpha, rho, vVol, beta, tau, terms, jacobian=True)
+    return SABRVols(vol, jac[..., 0], jac[..., 1], jac[..., 2])
 
 
 class StochasticABR(object):
@@ -14,6 +186,10 @@ class StochasticABR(object):
         self.marketVolOutATM = self.marketVol[where(self.strikePrices != self.atTheMoney)]
         self.marketVolATM = self.marketVol[where(self.strikePrices == self.atTheMoney)]
 
+        self.terms = strike_terms(self.spot, self.strikesOutATM, self.beta)
+        self.params = None
+        self._lastEvaluation = None
+
     def calibrate_model(self, args):
         """
         :param args: Sequence; alpha, rho, volatility of volatility
@@ -78,3 +254,62 @@ class StochasticABR(object):
         volATM = atmFirstTerm * atmSecondTerm
 
         return volATM
+
+    def update_market(self, marketVol, spot=None, tau=None):
+        """
+        New snapshot of the same strikes: strike-only terms are recomputed only if the spot moved,
+        and the last calibrated parameters are kept as the next starting point
+        """
+        self.marketVol = marketVol
+        self.marketVolOutATM = self.marketVol[where(self.strikePrices != self.atTheMoney)]
+        self.marketVolATM = self.marketVol[where(self.strikePrices == self.atTheMoney)]
+        if tau is not None:
+            self.tau = tau
+        if spot is not None and spot != self.spot:
+            self.spot = spot
+            self.terms = strike_terms(self.spot, self.strikesOutATM, self.beta)
+        self._lastEvaluation = None
+
+    def _evaluate(self, args):
+        # least_squares asks for the residuals and the Jacobian at the same point, so both come from one pass
+        key = tuple(args)
+        if self._lastEvaluation is None or self._lastEvaluation[0] != key:
+            alpha, rho, vVol = args
+            volOutATM, jacOutATM = sabr_vol_out_atm(alpha, rho, vVol, self.beta, self.tau, self.terms, jacobian=True)
+            volATM, jacATM = sabr_vol_atm(alpha, rho, vVol, self.beta, self.spot, jacobian=True)
+            nATM = len(self.marketVolATM)
+            residuals = np.concatenate([volOutATM - self.marketVolOutATM, np.full(nATM, volATM) - self.marketVolATM])
+            jac = np.concatenate([jacOutATM, np.broadcast_to(jacATM, (nATM, 3))])
+            self._lastEvaluation = key, residuals, jac
+        return self._lastEvaluation[1:]
+
+    def residuals(self, args):
+        """
+        :param args: Sequence; alpha, rho, volatility of volatility
+        :return: model minus market vols, out of the money strikes first; calibrate_model is their sum of squares
+        """
+        return self._evaluate(args)[0]
+
+    def jacobian(self, args):
+        """ Analytic derivatives of residuals with respect to (alpha, rho, vVol), shape (nStrikes, 3) """
+        return self._evaluate(args)[1]
+
+    def calibrate(self, initialGuess=None, bounds=((1e-8, -0.9999, 1e-8), (np.inf, 0.9999, np.inf)), **kwargs):
+        """
+        Least squares fit of (alpha, rho, vVol) with the analytic Jacobian
+
+        :param initialGuess: starting point; by default the parameters of the previous calibration (warm start),
+                             or a guess from the mean market vol for the first one
+        :param kwargs: passed to scipy.optimize.least_squares
+        :return: calibrated (alpha, rho, vVol), also kept in self.params
+        """
+        if initialGuess is None:
+            initialGuess = self.params
+        if initialGuess is None:
+            initialGuess = (np.mean(self.marketVol) * self.spot ** (1 - self.beta), 0.0, 0.5)
+        lower, upper = np.asarray(bounds[0], dtype=np.float64), np.asarray(bounds[1], dtype=np.float64)
+        initialGuess = np.clip(np.asarray(initialGuess, dtype=np.float64), lower, upper)
+
+        result = least_squares(self.residuals, initialGuess, jac=self.jacobian, bounds=(lower, upper), **kwargs)
+        self.params = result.x
+        return self.params
@@ -0,0 +1,208 @@
+from typing import NamedTuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from SABR import strike_terms, sabr_vol_out_atm, sabr_vol_atm
+
+LOWER_BOUNDS = np.array([1e-8, -0.9999, 1e-8])
+UPPER_BOUNDS = np.array([np.inf, 0.9999, np.inf])
+# Converged when every Jacobian column is this close to orthogonal to the residuals (gtol of scipy's least_squares)
+GRADIENT_TOLERANCE = 1e-8
+
+PARAMETER_DTYPE = [
+    ('alpha', np.float64), ('rho', np.float64), ('vVol', np.float64),
+    ('tau', np.float64), ('rmse', np.float64), ('iterations', np.int32), ('converged', np.bool_),
+]
+
+
+class SmileQuote(NamedTuple):
+    """ One smile: the StochasticABR inputs of one expiry of one underlying """
+    underlying   : str
+    expiry       : object          # anything np.datetime64 accepts, e.g. '2021-06-18'
+    tau          : float
+    spot         : float
+    atTheMoney   : float
+    strikePrices : np.ndarray
+    marketVol    : np.ndarray
+
+
+class SABRSurfaceParameters(object):
+    """
+    Calibrated parameters as a structured array sorted by (underlying, expiry), one record per smile
+    with the fields underlying, expiry and those of PARAMETER_DTYPE
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._index = None
+
+    def __len__(self):
+        return len(self.table)
+
+    def get(self, underlying, expiry, default=None):
+        """ Record of one smile, or default """
+        if self._index is None:
+            self._index = {(u, e): i for i, (u, e) in
+                           enumerate(zip(self.table['underlying'].tolist(), self.table['expiry'].tolist()))}
+        i = self._index.get((underlying, np.datetime64(expiry, 'D').tolist()))
+        return default if i is None else self.table[i]
+
+    def __getitem__(self, key):
+        record = self.get(*key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def params(self, underlying, expiry):
+        """ (alpha, rho, vVol) of one smile, e.g. to warm-start StochasticABR.calibrate """
+        record = self[underlying, expiry]
+        return np.array([record['alpha'], record['rho'], record['vVol']])
+
+
+def _pad_batch(smiles, beta):
+    """
+    Stack a batch of smiles into padded (nSmiles, nStrikes) arrays; padded entries are masked out and given
+    a harmless strike so that the strike terms stay finite
+    """
+    nSmiles, nStrikes = len(smiles), max(len(smile.strikePrices) for smile in smiles)
+    spot = np.array([smile.spot for smile in smiles], dtype=np.float64)[:, None]
+    tau = np.array([smile.tau for smile in smiles], dtype=np.float64)[:, None]
+
+    strikes = np.repeat(spot * 2, nStrikes, axis=1)
+    marketVol = np.zeros((nSmiles, nStrikes))
+    used = np.zeros((nSmiles, nStrikes), dtype=bool)
+    atm = np.zeros((nSmiles, nStrikes), dtype=bool)
+    for i, smile in enumerate(smiles):
+        n = len(smile.strikePrices)
+        strikes[i, :n] = smile.strikePrices
+        marketVol[i, :n] = smile.marketVol
+        used[i, :n] = True
+        atm[i, :n] = np.asarray(smile.strikePrices) == smile.atTheMoney
+
+    strikes = np.where(atm, spot * 2, strikes)
+    return spot, tau, strike_terms(spot, strikes, beta), marketVol, used, atm
+
+
+def _residuals(params, beta, spot, tau, terms, marketVol, used, atm, jacobian):
+    alpha, rho, vVol = (params[:, i, None] for i in range(3))
+    # Trial points outside the domain of chi(z) give NaN costs, which are simply not accepted
+    with np.errstate(invalid='ignore', divide='ignore'):
+        volOutATM, jacOutATM = sabr_vol_out_atm(alpha, rho, vVol, beta, tau, terms, jacobian=True)
+        volATM, jacATM = sabr_vol_atm(alpha, rho, vVol, beta, spot, jacobian=True)
+
+    residuals = np.where(used, np.where(atm, volATM, volOutATM) - marketVol, 0.0)
+    if not jacobian:
+        return residuals
+    jac = np.where(used[..., None], np.where(atm[..., None], jacATM, jacOutATM), 0.0)
+    return residuals, jac
+
+
+def _calibrate_batch(smiles, beta, initialGuess, maxIterations, tolerance):
+    """
+    Levenberg-Marquardt on a batch of smiles at once: the 3 x 3 damped normal equations of all smiles are solved
+    together, and each smile keeps its own damping and stops on its own
+    """
+    spot, tau, terms, marketVol, used, atm = _pad_batch(smiles, beta)
+    model = (beta, spot, tau, terms, marketVol, used, atm)
+
+    params = np.clip(initialGuess, LOWER_BOUNDS, UPPER_BOUNDS)
+    residuals, jac = _residuals(params, *model, jacobian=True)
+    cost = np.einsum('ij,ij->i', residuals, residuals)
+    damping = np.full(len(smiles), 1e-3)
+    active = np.ones(len(smiles), dtype=bool)
+    converged = np.zeros(len(smiles), dtype=bool)
+    iterations = np.zeros(len(smiles), dtype=np.int32)
+
+    for _ in range(maxIterations):
+        gradient = np.einsum('ijk,ij->ik', jac, residuals)
+        columnNorms = np.sqrt(np.einsum('ijk,ijk->ik', jac, jac))
+        residualNorms = np.sqrt(cost)[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stationary = np.all(np.abs(gradient) <= GRADIENT_TOLERANCE * residualNorms * columnNorms, axis=1)
+        converged |= active & stationary
+        active &= ~converged
+        if not active.any():
+            break
+
+        hessian = np.einsum('ijk,ijl->ikl', jac, jac)
+        diagonal = np.einsum('ikk->ik', hessian)
+        damped = hessian + (damping[:, None] * np.maximum(diagonal, 1e-12))[..., None] * np.eye(3)
+        with np.errstate(invalid='ignore'):
+            step = -np.linalg.solve(damped, gradient[..., None])[..., 0]
+        step = np.where(np.isfinite(step), step, 0.0)
+
+        trial = np.clip(params + step, LOWER_BOUNDS, UPPER_BOUNDS)
+        trialResiduals, trialJac = _residuals(trial, *model, jacobian=True)
+        trialCost = np.einsum('ij,ij->i', trialResiduals, trialResiduals)
+
+        accepted = active & (trialCost < cost)
+        iterations += active
+        # Converged on a small accepted step only; a rejected one says nothing about the minimum
+        smallChange = accepted & (cost - trialCost <= tolerance * np.maximum(cost, tolerance)) & \
+                      (np.abs(trial - params).max(axis=1) <= np.sqrt(tolerance) * (1 + np.abs(params).max(axis=1)))
+
+        params = np.where(accepted[:, None], trial, params)
+        residuals = np.where(accepted[:, None], trialResiduals, residuals)
+        jac = np.where(accepted[:, None, None], trialJac, jac)
+        cost = np.where(accepted, trialCost, cost)
+        damping = np.where(accepted, damping / 3, damping * 2)
+
+        converged |= active & (smallChange | (cost == 0))
+        # A smile whose damping blows up without an accepted step is stalled: stopped, but not converged
+        stalled = active & ~converged & (damping > 1e12)
+        active &= ~(converged | stalled)
+
+    count = used.sum(axis=1)
+    return params, np.sqrt(cost / count), iterations, converged
+
+
+def _default_guess(smile, beta):
+    return np.array([np.mean(smile.marketVol) * smile.spot ** (1 - beta), 0.0, 0.5])
+
+
+def calibrate_surface(smiles, beta, previous=None, batchSize=256, maxWorkers=None, maxIterations=100, tolerance=1e-12):
+    """
+    Calibrate (alpha, rho, vVol) of many smiles, e.g. every expiry of every underlying, with a common beta
+
+    The smiles (SmileQuote, of any lengths) are grouped in batches of batchSize that are calibrated as arrays
+    (see _calibrate_batch), and the batches are spread over a process pool.
+
+    previous : SABRSurfaceParameters of an earlier calibration; smiles found in it start from their previous
+               parameters (warm start), the others from a guess from the mean market vol
+    maxWorkers : number of processes (1 runs in this process, None uses os.cpu_count())
+
+    Returns SABRSurfaceParameters; converged is False for smiles that stalled or reached maxIterations
+    """
+    smiles = list(smiles)
+    if not smiles:
+        raise ValueError('no smiles to calibrate')
+
+    initialGuess = np.empty((len(smiles), 3))
+    for i, smile in enumerate(smiles):
+        record = previous.get(smile.underlying, smile.expiry) if previous is not None else None
+        initialGuess[i] = _default_guess(smile, beta) if record is None else \
+                          (record['alpha'], record['rho'], record['vVol'])
+
+    # Batches of smiles of similar lengths pad less
+    order = np.argsort([len(smile.strikePrices) for smile in smiles], kind='stable')
+    batches = [order[start:start + batchSize] for start in range(0, len(smiles), batchSize)]
+    arguments = [([smiles[i] for i in batch], beta, initialGuess[batch], maxIterations, tolerance) for batch in batches]
+
+    if maxWorkers == 1 or len(batches) == 1:
+        results = [_calibrate_batch(*args) for args in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=maxWorkers) as executor:
+            results = list(executor.map(_calibrate_batch, *zip(*arguments)))
+
+    underlyingLength = max(len(str(smile.underlying)) for smile in smiles)
+    table = np.empty(len(smiles), dtype=[('underlying', f'U{underlyingLength}'), ('expiry', 'datetime64[D]')] + PARAMETER_DTYPE)
+    table['underlying'] = [str(smile.underlying) for smile in smiles]
+    table['expiry'] = [np.datetime64(smile.expiry, 'D') for smile in smiles]
+    table['tau'] = [smile.tau for smile in smiles]
+    for batch, (params, rmse, iterations, converged) in zip(batches, results):
+        table['alpha'][batch], table['rho'][batch], table['vVol'][batch] = params.T
+        table['rmse'][batch] = rmse
+        table['iterations'][batch] = iterations
+        table['converged'][batch] = converged
+
+    return SABRSurfaceParameters(np.sort(table, order=['underlying', 'expiry']))
@@ -8,12 +8,33 @@ SVI model Calibration
 # IMPORTS
 
 import numpy as np
-from scipy.optimize import minimize, fmin
+from scipy.optimize import minimize, fmin, least_squares, lsq_linear
 
 
 # ----------------------------------------------------------------
 # FUNCTIONS 
 
+def svi_total_variance(k, alpha, beta, rho, mu, sigma, jacobian = False):
+    """
+    Raw SVI total variance w(k) = alpha + beta * ( rho * (k - mu) + sqrt( (k - mu)^2 + sigma^2 ) ),
+    broadcast over k and the parameters; with jacobian, also the derivatives with respect to
+    (alpha, beta, rho, mu, sigma) stacked on a last axis
+    """
+    shifted = k - mu
+    root = np.sqrt( shifted**2 + sigma**2 )
+    modelw = alpha + beta * ( rho * shifted + root )
+    if not jacobian:
+        return modelw
+
+    return modelw, np.stack( np.broadcast_arrays(
+        np.ones_like(modelw),
+        rho * shifted + root,
+        beta * shifted,
+        beta * ( -rho - shifted / root ),
+        beta * sigma / root,
+    ), axis = -1 )
+
+
 class SVI:
     
     def __init__(self,  strikes ,forward, tau, marketvol):
@@ -22,23 +43,103 @@ class SVI:
         self.strikes = strikes
         self.tau = tau
         self.marketw = marketvol**2 * tau
+        self.k = np.log(self.strikes / self.forward)
+        self.params = None
         
     def calibration(self, args):
         
         alpha, beta, rho, mu, sigma = args 
-        k = np.log(self.strikes / self.forward)  
-        modelw = alpha + beta * ( rho * (k - mu) + np.sqrt( (k - mu)**2 + sigma**2 ) )        
+        modelw = svi_total_variance(self.k, alpha, beta, rho, mu, sigma)
         objective = ( modelw - self.marketw )**2
         
-        return sum( objective )
+        return np.sum( objective )
 
     def volofmodel(self, alpha, beta, rho, mu, sigma):
 
-        k = np.log(self.strikes / self.forward)
-        modelw = alpha + beta * ( rho * (k - mu) + np.sqrt( (k - mu)**2 + sigma**2 ) )
+        modelw = svi_total_variance(self.k, alpha, beta, rho, mu, sigma)
         
         return modelw
 
+    def residuals(self, args):
+        """ Model minus market total variances; calibration is their sum of squares """
+        return svi_total_variance(self.k, *args) - self.marketw
+
+    def jacobian(self, args):
+        """ Analytic derivatives of residuals with respect to (alpha, beta, rho, mu, sigma) """
+        return svi_total_variance(self.k, *args, jacobian = True)[1]
+
+    def bounds(self):
+        """ Box bounds of (alpha, beta, rho, mu, sigma), those of the constraints of the example below """
+        lower = np.array([10**(-5), 0.001, -1, 2 * min(self.k), 10**(-8)])
+        upper = np.array([max(self.marketw), 1, 1, 2 * max(self.k), 1])
+        return lower, upper
+
+    def calibrate(self, initialguess = None, **kwargs):
+        """
+        Least squares fit with the analytic Jacobian, within bounds() instead of constraint functions;
+        starts from the previous calibration by default. kwargs go to scipy.optimize.least_squares
+        """
+        if initialguess is None:
+            initialguess = self.params
+        if initialguess is None:
+            initialguess = [0.5*min(self.marketw), 0.1, -0.5, 0.1, 0.1]
+        lower, upper = self.bounds()
+        initialguess = np.clip(np.asarray(initialguess, dtype = np.float64), lower, upper)
+
+        opt = least_squares(self.residuals, initialguess, jac = self.jacobian, bounds = (lower, upper), **kwargs)
+        self.params = opt.x
+        return self.params
+
+    def linear_fit(self, mu, sigma):
+        """
+        Quasi-explicit step: for fixed (mu, sigma), w = a + d * y + c * sqrt(y^2 + 1) with y = (k - mu) / sigma
+        is linear in (a, d, c) = (alpha, rho * beta * sigma, beta * sigma). Solved by linear least squares
+        within the bounds of alpha and beta and |d| <= c (|rho| <= 1)
+
+        Returns (alpha, beta, rho) and the sum of squared residuals
+        """
+        lower, upper = self.bounds()
+        y = (self.k - mu) / sigma
+        root = np.sqrt(y**2 + 1)
+        design = np.column_stack([np.ones_like(y), y, root])
+        boxLower = np.array([lower[0], -upper[1] * sigma, lower[1] * sigma])
+        boxUpper = np.array([upper[0], upper[1] * sigma, upper[1] * sigma])
+
+        a, d, c = np.linalg.lstsq(design, self.marketw, rcond = None)[0]
+        if not ( np.all(( boxLower <= (a, d, c) ) & ( (a, d, c) <= boxUpper )) and abs(d) <= c ):
+            a, d, c = lsq_linear(design, self.marketw, bounds = (boxLower, boxUpper), method = 'bvls').x
+            if abs(d) > c:
+                # The problem is convex, so the violated constraint d = +-c is active at the optimum
+                side = np.sign(d)
+                a, c = lsq_linear(np.column_stack([design[:, 0], side * y + root]), self.marketw,
+                                  bounds = (boxLower[[0, 2]], boxUpper[[0, 2]]), method = 'bvls').x
+                d = side * c
+
+        objective = np.sum( ( design @ (a, d, c) - self.marketw )**2 )
+        return (a, c / sigma, d / c), objective
+
+    def calibrate_quasi_explicit(self, initialguess = None, **kwargs):
+        """
+        Quasi-explicit calibration: Nelder-Mead over (mu, sigma) only, with (alpha, beta, rho) from linear_fit;
+        kwargs go to scipy.optimize.minimize
+        """
+        lower, upper = self.bounds()
+        if initialguess is None:
+            initialguess = self.params
+        if initialguess is None:
+            initialguess = [0.5*min(self.marketw), 0.1, -0.5, 0.1, 0.1]
+        start = np.clip(np.asarray(initialguess, dtype = np.float64)[3:], lower[3:], upper[3:])
+
+        def objective(x):
+            return self.linear_fit(*np.clip(x, lower[3:], upper[3:]))[1]
+
+        kwargs.setdefault('options', {'xatol' : 1e-8, 'fatol' : 1e-16})
+        opt = minimize(objective, start, method = 'Nelder-Mead', **kwargs)
+        mu, sigma = np.clip(opt.x, lower[3:], upper[3:])
+        (alpha, beta, rho), _ = self.linear_fit(mu, sigma)
+        self.params = np.array([alpha, beta, rho, mu, sigma])
+        return self.params
+
 
 if __name__=="__main__":
 
@@ -67,7 +168,7 @@ if __name__=="__main__":
     opt = minimize(svi.calibration, initialguess, constraints = cons)
     solutions = opt.x
     modelw = svi.volofmodel(solutions[0], solutions[1], solutions[2], solutions[3], solutions[4])
-    modelvol = np.sqrt( modelw / tau ) 
+    modelvol = np.sqrt( modelw / tau )
 
 
 
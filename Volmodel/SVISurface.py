@@ -0,0 +1,133 @@
+"""
+
+SVI volatility surface: slice-by-slice SVI across expiries
+
+"""
+
+# ----------------------------------------------------------------
+# IMPORTS
+
+import numpy as np
+
+from SVI import SVI, svi_total_variance
+
+
+# ----------------------------------------------------------------
+# FUNCTIONS
+
+class SVISurface:
+    """
+    Raw SVI parameters per expiry, as arrays sorted by tau
+
+        taus     : (nExpiries,)
+        forwards : (nExpiries,)
+        params   : (nExpiries, 5) of (alpha, beta, rho, mu, sigma)
+
+    Between expiries, total variance is interpolated linearly in tau at fixed log-moneyness k = log(K / F(tau)),
+    with the forward interpolated log-linearly. Before the first expiry total variance goes linearly to 0,
+    and after the last one it grows in proportion to tau (constant implied vol).
+
+    calendarViolations : result of calendar_arbitrage() for a calibrated surface, None if not checked
+    """
+
+    def __init__(self, taus, forwards, params):
+        order = np.argsort(taus)
+        self.taus = np.asarray(taus, dtype = np.float64)[order]
+        self.forwards = np.asarray(forwards, dtype = np.float64)[order]
+        self.params = np.asarray(params, dtype = np.float64).reshape(-1, 5)[order]
+        self.calendarViolations = None
+
+    @classmethod
+    def calibrate(cls, strikes, forwards, taus, marketvols, quasiExplicit = False, previous = None,
+                  strict = False, **kwargs):
+        """
+        Fit one SVI slice per expiry (SVI.calibrate, or SVI.calibrate_quasi_explicit), then check the surface
+        for calendar spread arbitrage (calendar_arbitrage on its default grid); the result is kept in
+        calendarViolations
+
+        strikes, marketvols : one array per expiry, of any lengths
+        previous : SVISurface of an earlier calibration; a slice with the same tau starts from its parameters,
+                   the others from the slice fitted just before (shorter tau), if any
+        strict : raise ValueError if there is calendar arbitrage
+        kwargs : passed to the SVI calibration of each slice (e.g. tolerances)
+        """
+        order = np.argsort(taus)
+        params = np.empty((len(taus), 5))
+        lastSolution = None
+        for i in order:
+            svi = SVI(np.asarray(strikes[i], dtype = np.float64), forwards[i], taus[i],
+                      np.asarray(marketvols[i], dtype = np.float64))
+            initialguess = lastSolution
+            if previous is not None:
+                match = np.flatnonzero(np.isclose(previous.taus, taus[i], rtol = 0, atol = 1e-10))
+                if len(match):
+                    initialguess = previous.params[match[0]]
+            if quasiExplicit:
+                lastSolution = svi.calibrate_quasi_explicit(initialguess, **kwargs)
+            else:
+                lastSolution = svi.calibrate(initialguess, **kwargs)
+            params[i] = lastSolution
+
+        surface = cls(taus, forwards, params)
+        surface.calendarViolations = surface.calendar_arbitrage()
+        if strict and surface.calendarViolations.any():
+            pairs = ', '.join(f'{surface.taus[i]:g} and {surface.taus[i + 1]:g}'
+                              for i in np.flatnonzero(surface.calendarViolations))
+            raise ValueError(f'calendar spread arbitrage between the expiries tau = {pairs}')
+        return surface
+
+    def slice_total_variance(self, k):
+        """ Total variance of every slice at log-moneyness k; shape (nExpiries,) + k.shape """
+        k = np.asarray(k, dtype = np.float64)
+        columns = (self.params[:, j].reshape((-1,) + (1,) * k.ndim) for j in range(5))
+        return svi_total_variance(k, *columns)
+
+    def calendar_arbitrage(self, k = None, tolerance = 1e-12):
+        """
+        Calendar spread arbitrage check: total variance must not decrease with tau at any k
+
+        k : log-moneyness grid to check on (by default 201 points on [-1.5, 1.5])
+
+        Returns a (nExpiries - 1,) boolean array, True where slice i + 1 lies below slice i somewhere on k
+        """
+        k = np.linspace(-1.5, 1.5, 201) if k is None else np.asarray(k, dtype = np.float64)
+        w = self.slice_total_variance(k)
+        return np.any(w[1:] < w[:-1] - tolerance, axis = -1)
+
+    def forward(self, tau):
+        """ Forward at any tau, log-linear between expiries and flat outside """
+        return np.exp(np.interp(tau, self.taus, np.log(self.forwards)))
+
+    def total_variance(self, strikes, taus):
+        """ Total implied variance on any (strike, tau) points; strikes and taus broadcast against each other """
+        strikes, taus = np.broadcast_arrays(np.asarray(strikes, dtype = np.float64),
+                                            np.asarray(taus, dtype = np.float64))
+        k = np.log(strikes / self.forward(taus))
+
+        # Neighbouring slices and linear weight of the upper one; outside the expiries both are the same slice
+        upper = np.clip(np.searchsorted(self.taus, taus), 0, len(self.taus) - 1)
+        lower = np.clip(upper - 1, 0, None)
+        lower = np.where(taus <= self.taus[0], upper, lower)
+        span = self.taus[upper] - self.taus[lower]
+        weight = np.where(span > 0, (taus - self.taus[lower]) / np.where(span > 0, span, 1), 1.0)
+
+        lowerW = svi_total_variance(k, *np.moveaxis(self.params[lower], -1, 0))
+        upperW = svi_total_variance(k, *np.moveaxis(self.params[upper], -1, 0))
+        w = (1 - weight) * lowerW + weight * upperW
+
+        # Outside the expiries: w proportional to tau
+        w = np.where(taus < self.taus[0], upperW * taus / self.taus[0], w)
+        return np.where(taus > self.taus[-1], upperW * taus / self.taus[-1], w)
+
+    def implied_vol(self, strikes, taus):
+        """ Implied vol on any (strike, tau) points """
+        taus = np.asarray(taus, dtype = np.float64)
+        return np.sqrt(self.total_variance(strikes, taus) / taus)
+
+    def to_arrays(self):
+        """ Surface as a dict of arrays (e.g. for np.savez) """
+        return {'taus' : self.taus, 'forwards' : self.forwards, 'params' : self.params}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays['taus'], arrays['forwards'], arrays['params'])
@@ -1,4 +1,4 @@
-from scipy.stats import norm
+from blackscholes import norm_cdf, norm_pdf
 from math import pi
 from numpy import log, sqrt
 
@@ -22,6 +22,6 @@ class ImpliedVol(object):
     def get_lower_bound(self):
         d1 = self.d1Value
         d2 = d1 - self.vol * sqrt(self.tau)
-        lowerBound = -norm.cdf(-d2) / (self.strike * sqrt(self.tau) * norm.pdf(d2))
+        lowerBound = -norm_cdf(-d2) / (self.strike * sqrt(self.tau) * norm_pdf(d2))
 
         return lowerBound
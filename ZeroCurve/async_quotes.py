@@ -0,0 +1,174 @@
+from collections import OrderedDict
+from datetime    import date, datetime
+import asyncio
+import os
+
+import aiohttp
+
+import request_quotes
+from quote_providers import QuoteProvider, SnapshotQuoteProvider, save_snapshot, SOURCES, _check_source
+
+URLS = {
+    'LIBOR' : request_quotes.LIBOR_URL,
+    'ED'    : request_quotes.ED_URL,
+    'IRS'   : request_quotes.IRS_URL,
+}
+
+PARSERS = {
+    'LIBOR' : request_quotes.parse_USD_LIBOR,
+    'ED'    : request_quotes.parse_Eurodollar_Futures,
+    'IRS'   : request_quotes.parse_USD_Swap_Rates,
+}
+
+# Seconds allowed for one request of each source
+DEFAULT_TIMEOUTS = {'LIBOR' : 10, 'ED' : 10, 'IRS' : 10}
+
+# Errors after which a request is retried: network errors, and pages the parsers reject (ValueError).
+# Anything else is a bug and is raised rather than hidden behind the last good quotes.
+RETRY_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ValueError)
+
+
+class AsyncQuoteFetcher:
+    """
+    Fetch the three quote sources concurrently over one pooled HTTP session.
+
+    Each request has its own timeout and is retried with exponential backoff. A source that still
+    fails is served from the last good quotes: first those fetched earlier by this fetcher, then the
+    snapshot file at last_good_path, which is rewritten after every fetch_all(). Quotes served that way keep
+    the date they were fetched on, and the snapshot is dated by its oldest source.
+
+        async with AsyncQuoteFetcher(last_good_path='last_good.json') as fetcher:
+            quotes = await fetcher.fetch_all()
+
+    Args:
+        urls : dict or None
+            source -> URL; URLS if None (point these to a FixtureServer in tests)
+        timeouts : dict or None
+            source -> seconds; DEFAULT_TIMEOUTS if None
+        retries : int
+            number of retries after the first attempt
+        backoff : float
+            seconds before the first retry, doubled for each further retry
+        last_good_path : str or None
+            snapshot file of the last good quotes
+        limit : int
+            maximum number of pooled connections
+    """
+
+    def __init__(self, urls=None, timeouts=None, retries=2, backoff=0.5, last_good_path=None, limit=10):
+        self.urls = dict(URLS, **(urls or {}))
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.retries = retries
+        self.backoff = backoff
+        self.last_good_path = last_good_path
+        self.limit = limit
+
+        self.stale = set()   # sources served from the last good quotes in the latest fetch
+        self.fetch_dates = dict()   # source -> date on which its latest quotes were fetched
+        self._last_good = dict()
+        self._session = None
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.limit), headers=request_quotes.HEADERS
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+        self._session = None
+
+    async def fetch(self, source):
+        """
+        Fetch and parse one source
+
+        Args:
+            source : str
+                one of 'LIBOR', 'ED', 'IRS'
+        Returns:
+            OrderedDict : quotes
+        """
+        timeout = aiohttp.ClientTimeout(total=self.timeouts[source])
+        error = None
+
+        for attempt in range(self.retries + 1):
+            if attempt > 0:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                async with self._session.get(self.urls[source], timeout=timeout) as response:
+                    response.raise_for_status()
+                    page = await response.read()
+                quotes = OrderedDict(PARSERS[source](page))
+                if not quotes:
+                    raise ValueError(f'No {source} quotes in {self.urls[source]}')
+            except RETRY_ERRORS as e:
+                error = e
+                continue
+
+            self._last_good[source] = quotes
+            self.fetch_dates[source] = date.today()
+            self.stale.discard(source)
+            return OrderedDict(quotes)
+
+        return self.__last_good(source, error)
+
+    async def fetch_all(self):
+        """
+        Fetch all sources concurrently
+
+        Returns:
+            dict : source -> OrderedDict of quotes
+        """
+        results = await asyncio.gather(*(self.fetch(source) for source in SOURCES))
+        quotes = dict(zip(SOURCES, results))
+
+        if self.last_good_path is not None:
+            save_snapshot(self.last_good_path, min(self.fetch_dates[source] for source in SOURCES), **quotes)
+        return quotes
+
+    def __last_good(self, source, error):
+        self.stale.add(source)
+        if source in self._last_good:
+            return OrderedDict(self._last_good[source])
+        if self.last_good_path is not None and os.path.exists(self.last_good_path):
+            snapshot = SnapshotQuoteProvider(self.last_good_path)
+            self.fetch_dates[source] = datetime.strptime(snapshot.present_date, '%Y-%m-%d').date()
+            return snapshot.get(source)
+        raise error
+
+
+def fetch_quotes(**kwargs):
+    """
+    Fetch all sources concurrently from synchronous code
+
+    Args:
+        **kwargs : arguments of AsyncQuoteFetcher
+    Returns:
+        dict : source -> OrderedDict of quotes
+    """
+    async def run():
+        async with AsyncQuoteFetcher(**kwargs) as fetcher:
+            return await fetcher.fetch_all()
+
+    return asyncio.run(run())
+
+
+class AsyncQuoteProvider(QuoteProvider):
+    """
+    QuoteProvider fetching all sources at once with AsyncQuoteFetcher.
+    The first get() fetches the three sources together, and every later get() is served from that batch.
+    Create a new provider, or wrap it in CachedQuoteProvider, to refresh the quotes.
+
+    Args:
+        **kwargs : arguments of AsyncQuoteFetcher
+    """
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self._quotes = None
+
+    def get(self, source):
+        _check_source(source)
+        if self._quotes is None:
+            self._quotes = fetch_quotes(**self.kwargs)
+        return OrderedDict(self._quotes[source])
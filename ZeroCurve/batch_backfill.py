@@ -0,0 +1,168 @@
+from collections        import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import math
+import os
+import numpy as np
+
+from zero_curve import ZeroCurve
+from schedule   import MONTHS
+
+logger = logging.getLogger(__name__)
+
+# Default tenors of the output grid in days: 1W, 1M, 3M, 6M, 9M, 1Y, 18M, 2Y, ..., 30Y
+DEFAULT_TENORS = np.array(
+    [7, 30, 91, 182, 273] + [int(365 * y) for y in np.arange(1, 30.5, 0.5)],
+    dtype=np.int64
+)
+
+QUANTITIES = ('zero_rate', 'discount_factor')
+
+
+def read_quote_table(table):
+    """
+    Read dated quote sets from a long-format table with the columns
+
+        date   : curve date (e.g. 2021-03-15)
+        source : 'LIBOR', 'ED' or 'IRS'
+        term   : e.g. 1 week, MAR 2021, 1-Year
+        rate   : quote
+
+    Terms are kept in the row order of the table, so ED contracts must be listed chronologically.
+
+    Args:
+        table : pandas.DataFrame or str
+            a DataFrame, or the path of a .parquet / .csv file
+    Returns:
+        list of tuple:
+            (date as str 'YYYY-MM-DD', LIBOR, ED, IRS) sorted by date
+    """
+    import pandas as pd
+
+    if isinstance(table, str):
+        if table.endswith('.parquet'):
+            table = pd.read_parquet(table, columns=['date', 'source', 'term', 'rate'])
+        else:
+            table = pd.read_csv(table)
+
+    dates = pd.to_datetime(table['date']).dt.strftime('%Y-%m-%d').to_numpy()
+    quote_sets = dict()
+    for present_date, source, term, rate in zip(
+        dates, table['source'].to_numpy(), table['term'].to_numpy(), table['rate'].to_numpy()
+    ):
+        quotes = quote_sets.setdefault(
+            present_date, {'LIBOR' : OrderedDict(), 'ED' : OrderedDict(), 'IRS' : OrderedDict()}
+        )
+        quotes[source][term] = float(rate)
+
+    return [
+        (present_date, quotes['LIBOR'], quotes['ED'], quotes['IRS'])
+            for present_date, quotes in sorted(quote_sets.items())
+    ]
+
+
+def check_quotes(LIBOR, ED, IRS):
+    """
+    Raise ValueError if a quote set cannot make a curve: a source without quotes,
+    a rate that is not a finite number, or an ED term that is not a contract month such as MAR 2021
+    """
+    for source, quotes in (('LIBOR', LIBOR), ('ED', ED), ('IRS', IRS)):
+        if not quotes:
+            raise ValueError(f'No {source} quotes')
+        for term, rate in quotes.items():
+            if not isinstance(rate, (int, float)) or not math.isfinite(rate):
+                raise ValueError(f'Invalid {source} quote {rate!r} for {term}')
+    for term in ED:
+        month, _, year = str(term).partition(' ')
+        if month.upper() not in MONTHS or not year.isdigit():
+            raise ValueError(f'Invalid ED term {term!r}')
+
+
+def build_rows(quote_sets, tenors=DEFAULT_TENORS, quantity='zero_rate'):
+    """
+    Build the curves of several quote sets and evaluate them on the tenor grid
+
+    Args:
+        quote_sets : list of tuple
+            (date, LIBOR, ED, IRS) as returned by read_quote_table
+        tenors : np.ndarray
+            days from each curve date
+        quantity : str
+            'zero_rate' (%) or 'discount_factor'
+    Returns:
+        np.ndarray : (len(quote_sets), len(tenors)); rows of curves that fail to build are NaN
+    """
+    rows = np.full((len(quote_sets), len(tenors)), np.nan)
+    year_fractions = np.asarray(tenors, dtype=np.float64) / 360
+
+    for i, (present_date, LIBOR, ED, IRS) in enumerate(quote_sets):
+        # Bad or incomplete quotes and dates outside the schedule raise ValueError; anything else is a bug
+        try:
+            check_quotes(LIBOR, ED, IRS)
+            compiled = ZeroCurve(present_date, LIBOR, ED, IRS).compile()
+        except ValueError as e:
+            logger.warning('Curve of %s not built: %s', present_date, e)
+            continue
+        rows[i] = getattr(compiled, quantity)(year_fractions)
+
+    return rows
+
+
+def backfill(
+    table, output_dir,
+    tenors = DEFAULT_TENORS,
+    quantity = 'zero_rate',
+    max_workers = None,
+    chunksize = 64
+):
+    """
+    Build the curves of every date in the table with a process pool
+    and write them as one (dates x tenors) array
+
+    Files written in output_dir:
+        dates.npy     : datetime64[D], (n_dates,)
+        tenors.npy    : int64 days, (n_tenors,)
+        <quantity>.npy : float64, (n_dates, n_tenors); NaN rows for curves that failed to build
+
+    Args:
+        table : pandas.DataFrame or str
+            see read_quote_table
+        output_dir : str
+        tenors : array-like
+            days from each curve date
+        quantity : str
+            'zero_rate' (%) or 'discount_factor'
+        max_workers : int or None
+            number of processes (os.cpu_count() if None)
+        chunksize : int
+            number of curves built per task
+    Returns:
+        np.memmap : the written (n_dates, n_tenors) array, opened read-only
+    """
+    if quantity not in QUANTITIES:
+        raise ValueError(f'quantity must be one of {QUANTITIES}')
+
+    quote_sets = read_quote_table(table)
+    tenors = np.asarray(tenors, dtype=np.int64)
+
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(os.path.join(output_dir, 'dates.npy'),
+            np.array([present_date for present_date, *_ in quote_sets], dtype='datetime64[D]'))
+    np.save(os.path.join(output_dir, 'tenors.npy'), tenors)
+
+    path = os.path.join(output_dir, f'{quantity}.npy')
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(len(quote_sets), len(tenors)))
+
+    chunks = range(0, len(quote_sets), chunksize)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(build_rows, quote_sets[start:start+chunksize], tenors, quantity) : start
+                for start in chunks
+        }
+        for future, start in futures.items():
+            rows = future.result()
+            out[start:start+len(rows)] = rows
+
+    out.flush()
+    del out
+    return np.load(path, mmap_mode='r')
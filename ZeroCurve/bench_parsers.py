@@ -0,0 +1,61 @@
+"""
+Benchmark of the quote parsers on the fixture pages
+
+    python bench_parsers.py [--repeat N]
+
+For reference, the time to build a BeautifulSoup tree of the same page is also shown when bs4 is installed;
+the previous parsers built that tree and then serialized it back to a string before searching it.
+"""
+
+import argparse
+import os
+import timeit
+
+from fixture_server import FIXTURE_DIR, FIXTURE_PAGES
+from quote_parsers  import parse_libor, parse_eurodollar_futures, parse_swap_rates
+
+PARSERS = {
+    'LIBOR' : parse_libor,
+    'ED'    : parse_eurodollar_futures,
+    'IRS'   : parse_swap_rates,
+}
+
+
+def bench(repeat=1000):
+    """
+    Returns:
+        dict : source -> {'parse_us' : microseconds per page, 'bs4_tree_us' : ... or None}
+    """
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        BeautifulSoup = None
+
+    results = dict()
+    for source, page_name in FIXTURE_PAGES.items():
+        with open(os.path.join(FIXTURE_DIR, page_name), 'rb') as f:
+            page = f.read()
+
+        parse = PARSERS[source]
+        parse_us = min(timeit.repeat(lambda: parse(page), number=repeat, repeat=3)) / repeat * 1e6
+
+        bs4_tree_us = None
+        if BeautifulSoup is not None:
+            bs4_tree_us = min(timeit.repeat(
+                lambda: str(BeautifulSoup(page, 'html.parser')), number=repeat, repeat=3
+            )) / repeat * 1e6
+
+        results[source] = {'parse_us' : parse_us, 'bs4_tree_us' : bs4_tree_us}
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    for source, result in bench(args.repeat).items():
+        line = f"{source:6s} parse: {result['parse_us']:8.1f} us/page"
+        if result['bs4_tree_us'] is not None:
+            line += f"   bs4 tree + str: {result['bs4_tree_us']:8.1f} us/page"
+        print(line)
@@ -0,0 +1,95 @@
+from datetime          import date
+from scipy.interpolate import CubicSpline
+import numpy as np
+
+
+class CompiledCurve:
+    """
+    Zero curve with an interpolator built once, for vectorized queries.
+
+    Times are measured as days from the present date; year fractions are ACT/360 as in ZeroCurve.
+    Zero rates are continuously compounded and quoted in percent, like ZeroCurve.curve().
+    Between the curve dates rates are interpolated with a cubic spline (as in ZeroCurve.plot_curve);
+    outside them the first and last rates are extended flat.
+
+    Args:
+        present_date : datetime.date
+        curve : dict
+            key : datetime.date
+            value : zero rate (%)
+    """
+
+    def __init__(self, present_date, curve):
+        self.present_date = present_date
+        self._present = np.datetime64(present_date, 'D')
+
+        items = sorted(curve.items())
+        self.days = np.array([(term - present_date).days for term, _ in items], dtype=np.int64)
+        self.rates = np.array([rate for _, rate in items], dtype=np.float64)
+
+        self._spline = CubicSpline(self.days, self.rates)
+        self._derivative = self._spline.derivative()
+
+    def to_days(self, x):
+        """
+        Convert query points to days from the present date
+
+        Args:
+            x : array-like
+                datetime64 / datetime.date values, or year fractions (ACT/360) as floats
+        Returns:
+            np.ndarray : days (float)
+        """
+        if isinstance(x, date):
+            x = np.datetime64(x, 'D')
+        x = np.asarray(x)
+        if x.dtype == object:
+            x = x.astype('datetime64[D]')
+        if np.issubdtype(x.dtype, np.datetime64):
+            return (x.astype('datetime64[D]') - self._present).astype(np.float64)
+        return x.astype(np.float64) * 360
+
+    def zero_rate(self, x):
+        """
+        Args:
+            x : array-like of dates or year fractions
+        Returns:
+            np.ndarray : zero rates (%)
+        """
+        return self.__zero_rate_days(self.to_days(x))
+
+    def discount_factor(self, x):
+        """
+        Args:
+            x : array-like of dates or year fractions
+        Returns:
+            np.ndarray : discount factors
+        """
+        days = self.to_days(x)
+        return np.exp(-self.__zero_rate_days(days) / 100 * days / 360)
+
+    def forward_rate(self, x1, x2=None):
+        """
+        Continuously compounded forward rate (%) between x1 and x2,
+        or the instantaneous forward rate at x1 if x2 is None
+
+        Args:
+            x1, x2 : array-like of dates or year fractions
+        Returns:
+            np.ndarray : forward rates (%)
+        """
+        days1 = self.to_days(x1)
+        rate1 = self.__zero_rate_days(days1)
+
+        if x2 is None:
+            # f(t) = r(t) + t * r'(t); the slope is zero where the curve is extended flat
+            inside = (days1 > self.days[0]) & (days1 < self.days[-1])
+            slope = np.where(inside, self._derivative(days1), 0.0)
+            return rate1 + days1 * slope
+
+        days2 = self.to_days(x2)
+        rate2 = self.__zero_rate_days(days2)
+        return (rate2 * days2 - rate1 * days1) / (days2 - days1)
+
+    def __zero_rate_days(self, days):
+        return self._spline(np.clip(days, self.days[0], self.days[-1]))
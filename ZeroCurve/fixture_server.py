@@ -0,0 +1,81 @@
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from functools   import partial
+import os
+import threading
+import time
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Fixture page served in place of each quote source
+FIXTURE_PAGES = {
+    'LIBOR' : 'usd_libor.html',
+    'ED'    : 'eurodollar_futures.json',
+    'IRS'   : 'usd_swap_rates.html',
+}
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    """ Serve fixture files, optionally after a delay or with a failure status """
+
+    delays = dict()
+    failures = dict()
+
+    def do_GET(self):
+        name = self.path.lstrip('/').split('?')[0]
+        time.sleep(self.delays.get(name, 0))
+        try:
+            if self.failures.get(name, 0) > 0:
+                self.failures[name] -= 1
+                self.send_error(503)
+                return
+            super().do_GET()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (e.g. timed out) while the page was delayed
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """
+    Local stand-in for the quote sites, serving the pages in fixtures/ over HTTP
+
+        with FixtureServer() as server:
+            quotes = fetch_quotes(urls=server.urls)
+
+    Args:
+        directory : str
+            directory of the fixture pages
+        delays : dict
+            page name -> seconds to wait before answering
+        failures : dict
+            page name -> number of requests answered with 503 before serving the page
+    """
+
+    def __init__(self, directory=FIXTURE_DIR, delays=None, failures=None):
+        handler = type('Handler', (_FixtureHandler,), {
+            'delays' : dict(delays or {}), 'failures' : dict(failures or {})
+        })
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), partial(handler, directory=directory))
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def urls(self):
+        """ URL of every quote source on this server """
+        host, port = self._server.server_address
+        return {source : f'http://{host}:{port}/{page}' for source, page in FIXTURE_PAGES.items()}
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,202 @@
+from html.parser import HTMLParser
+from datetime    import datetime
+from collections import OrderedDict
+from typing      import NamedTuple, Optional
+import json
+import numpy as np
+
+LIBOR_TABLE_STYLE = 'width:100%;margin:16px 0px 0px 0px;border:1px solid #CCCCCC;'
+
+
+class QuoteRecords(NamedTuple):
+    """
+    Parsed quotes of one source in columnar form
+
+    Attributes:
+        source : str
+            'LIBOR', 'ED' or 'IRS'
+        terms : np.ndarray of str
+            e.g. 1 week, DEC 2020, 1-Year, in page order
+        rates : np.ndarray of float64
+            quote of each term
+        as_of : datetime.date or None
+            quote date, if the page gives one
+    """
+    source : str
+    terms  : np.ndarray
+    rates  : np.ndarray
+    as_of  : Optional[object] = None
+
+    def to_dict(self):
+        """ Quotes as an OrderedDict of term to rate """
+        return OrderedDict(zip(self.terms.tolist(), self.rates.tolist()))
+
+
+def _text(page):
+    return page.decode('utf-8', errors='replace') if isinstance(page, (bytes, bytearray)) else page
+
+
+def _to_float(text):
+    try:
+        return float(text.replace('%', '').replace(',', '').strip())
+    except ValueError:
+        return np.nan
+
+
+class _LiborParser(HTMLParser):
+    """ Collect the header dates and the row cells of the LIBOR table in one pass """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.dates, self.rows = [], []
+        self._in_table = self._done = False
+        self._row_class = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        attrs = dict(attrs)
+        if tag == 'table' and attrs.get('style') == LIBOR_TABLE_STYLE:
+            self._in_table = True
+        elif not self._in_table:
+            return
+        elif tag == 'tr':
+            self._row_class = attrs.get('class')
+            if self._row_class in ('tabledata1', 'tabledata2'):
+                self.rows.append([])
+        elif tag in ('td', 'span') and self._row_class is not None:
+            if tag == 'td' or self._row_class == 'tableheader':
+                self._cell = []
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def handle_endtag(self, tag):
+        if not self._in_table or self._done:
+            return
+        if tag == 'table':
+            self._done = True
+        elif tag == 'span' and self._row_class == 'tableheader' and self._cell is not None:
+            self.dates.append(''.join(self._cell).strip())
+            self._cell = None
+        elif tag == 'td' and self._cell is not None:
+            if self._row_class != 'tableheader':
+                self.rows[-1].append(''.join(self._cell).strip())
+            self._cell = None
+        elif tag == 'tr':
+            self._row_class = None
+
+
+def parse_libor(page):
+    """
+    Parse the USD LIBOR page (quotes of the latest date in the table)
+
+    Args:
+        page : bytes or str
+    Returns:
+        QuoteRecords
+    """
+    parser = _LiborParser()
+    parser.feed(_text(page))
+    parser.close()
+
+    terms, rates = [], []
+    for row in parser.rows:
+        if len(row) < 2:
+            continue
+        rate = _to_float(row[len(parser.dates)] if len(row) > len(parser.dates) else row[-1])
+        if np.isnan(rate):
+            continue
+        terms.append(row[0].replace('USD LIBOR - ', ''))
+        rates.append(rate)
+
+    as_of = datetime.strptime(parser.dates[-1], '%m-%d-%Y').date() if parser.dates else None
+    return QuoteRecords('LIBOR', np.array(terms, dtype=str), np.array(rates, dtype=np.float64), as_of)
+
+
+def parse_eurodollar_futures(page):
+    """
+    Parse the CME Eurodollar Futures quotes (JSON), skipping contracts without a last price
+
+    Raises ValueError if the page is not JSON or lacks the expected fields
+
+    Args:
+        page : bytes or str
+    Returns:
+        QuoteRecords
+    """
+    data = json.loads(page)
+
+    terms, rates = [], []
+    try:
+        for quote in data['quotes']:
+            if quote['last'] == '-':
+                continue
+            terms.append(quote['expirationMonth'])
+            rates.append(float(quote['last']))
+    except (KeyError, TypeError) as e:
+        raise ValueError(f'Unexpected Eurodollar Futures quotes: {e!r}') from e
+
+    as_of = None
+    if 'tradeDate' in data:
+        try:
+            as_of = datetime.strptime(data['tradeDate'], '%d %b %Y').date()
+        except ValueError:
+            pass
+    return QuoteRecords('ED', np.array(terms, dtype=str), np.array(rates, dtype=np.float64), as_of)
+
+
+class _SwapRatesParser(HTMLParser):
+    """ Collect the link texts inside the TableRows div in one pass """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.texts = []
+        self._depth = 0   # div nesting depth inside TableRows; 0 outside
+        self._link = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'div':
+            if self._depth:
+                self._depth += 1
+            elif dict(attrs).get('id') == 'TableRows':
+                self._depth = 1
+        elif tag == 'a' and self._depth:
+            self._link = []
+
+    def handle_data(self, data):
+        if self._link is not None:
+            self._link.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'div' and self._depth:
+            self._depth -= 1
+        elif tag == 'a' and self._link is not None:
+            self.texts.append(''.join(self._link).strip())
+            self._link = None
+
+
+def parse_swap_rates(page):
+    """
+    Parse the USD Swap rates widget: each term (e.g. 1-Year) is followed by its rate (e.g. 0.22%)
+
+    Args:
+        page : bytes or str
+    Returns:
+        QuoteRecords
+    """
+    parser = _SwapRatesParser()
+    parser.feed(_text(page))
+    parser.close()
+
+    terms, rates = [], []
+    for text in parser.texts:
+        if 'Year' in text:
+            terms.append(text)
+            rates.append(0.0)
+        elif '%' in text and terms:
+            rates[-1] = _to_float(text)
+
+    return QuoteRecords('IRS', np.array(terms, dtype=str), np.array(rates, dtype=np.float64))
@@ -0,0 +1,197 @@
+from datetime    import datetime
+from collections import OrderedDict
+import json
+import os
+import time
+
+SOURCES = ('LIBOR', 'ED', 'IRS')
+
+
+class QuoteProvider:
+    """
+    Base class of the quote providers used by ZeroCurve.
+    A provider returns the quotes of one source ('LIBOR', 'ED' or 'IRS') as an OrderedDict of term to rate
+    """
+
+    def get(self, source):
+        """
+        Args:
+            source : str
+                one of 'LIBOR', 'ED', 'IRS'
+        Returns:
+            OrderedDict:
+                key : term (e.g. 1 week, DEC 2020, 1-Year)
+                value : quote
+        """
+        raise NotImplementedError
+
+    def quotes(self):
+        """ Return all three sources as a dict keyed by source """
+        return {source : self.get(source) for source in SOURCES}
+
+
+class LiveQuoteProvider(QuoteProvider):
+    """
+    Scrape the latest quotes with request_quotes.
+    Nothing is requested until get() is called.
+    """
+
+    def get(self, source):
+        _check_source(source)
+
+        # Imported here so that importing this module never pulls in the scrapers
+        import request_quotes
+        fetch = {
+            'LIBOR' : request_quotes.USD_LIBOR,
+            'ED'    : request_quotes.Eurodollar_Futures,
+            'IRS'   : request_quotes.USD_Swap_Rates,
+        }[source]
+        return OrderedDict(fetch())
+
+
+class CachedQuoteProvider(QuoteProvider):
+    """
+    Wrap another provider with a time-to-live cache kept in memory and, optionally, on disk
+    so that several processes share one fetch.
+
+    Args:
+        provider : QuoteProvider
+        ttl : float
+            seconds for which fetched quotes are reused
+        cache_dir : str or None
+            directory of the disk cache; the disk cache is not used if None
+    """
+
+    def __init__(self, provider, ttl=3600, cache_dir=None):
+        self.provider = provider
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self._memory = dict()
+
+    def get(self, source):
+        _check_source(source)
+        now = time.time()
+
+        if source in self._memory:
+            fetched_at, quotes = self._memory[source]
+            if now - fetched_at < self.ttl:
+                return OrderedDict(quotes)
+
+        cached = self.__read_disk(source)
+        if cached is not None and now - cached[0] < self.ttl:
+            self._memory[source] = cached
+            return OrderedDict(cached[1])
+
+        quotes = self.provider.get(source)
+        self._memory[source] = (now, quotes)
+        self.__write_disk(source, now, quotes)
+        return OrderedDict(quotes)
+
+    def clear(self):
+        """ Drop the in-memory cache (the disk cache expires by ttl) """
+        self._memory.clear()
+
+    def __path(self, source):
+        return os.path.join(self.cache_dir, f'{source}.json')
+
+    def __read_disk(self, source):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self.__path(source)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data['fetched_at'], OrderedDict(data['quotes'])
+
+    def __write_disk(self, source, fetched_at, quotes):
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Write to a temporary file first so that readers never see a partial file
+        path = self.__path(source)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'fetched_at' : fetched_at, 'quotes' : list(quotes.items())}, f)
+        os.replace(tmp_path, path)
+
+
+class SnapshotQuoteProvider(QuoteProvider):
+    """
+    Serve quotes from a local JSON snapshot without touching the network.
+    The snapshot is written by save_snapshot() and looks like
+
+        {"present_date": "2021-03-15", "LIBOR": {...}, "ED": {...}, "IRS": {...}}
+
+    Args:
+        path : str
+            path of the snapshot file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._snapshot = None
+
+    @property
+    def present_date(self):
+        return self.__snapshot().get('present_date')
+
+    def get(self, source):
+        _check_source(source)
+        return OrderedDict(self.__snapshot()[source])
+
+    def __snapshot(self):
+        if self._snapshot is None:
+            with open(self.path) as f:
+                self._snapshot = json.load(f, object_pairs_hook=OrderedDict)
+        return self._snapshot
+
+
+def save_snapshot(path, present_date, LIBOR, ED, IRS):
+    """
+    Save quotes as a snapshot readable by SnapshotQuoteProvider
+
+    Args:
+        path : str
+        present_date : str or datetime.date
+        LIBOR, ED, IRS : dict
+    Returns:
+        None
+    """
+    if not isinstance(present_date, str):
+        present_date = datetime.strftime(present_date, '%Y-%m-%d')
+
+    with open(path, 'w') as f:
+        json.dump(
+            {'present_date' : present_date, 'LIBOR' : LIBOR, 'ED' : ED, 'IRS' : IRS},
+            f, indent=4
+        )
+
+
+_default_provider = None
+
+def default_provider():
+    """
+    Provider used by ZeroCurve when no quotes or provider are given.
+
+    If the environment variable ZEROCURVE_SNAPSHOT is set, quotes are served from that snapshot file.
+    Otherwise the live scrapers are used behind a one-hour cache stored in ZEROCURVE_CACHE_DIR
+    (default: ~/.cache/zerocurve).
+    """
+    global _default_provider
+    if _default_provider is None:
+        snapshot = os.environ.get('ZEROCURVE_SNAPSHOT')
+        if snapshot:
+            _default_provider = SnapshotQuoteProvider(snapshot)
+        else:
+            cache_dir = os.environ.get(
+                'ZEROCURVE_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'zerocurve')
+            )
+            _default_provider = CachedQuoteProvider(LiveQuoteProvider(), cache_dir=cache_dir)
+    return _default_provider
+
+
+def _check_source(source):
+    if source not in SOURCES:
+        raise KeyError(f'Unknown quote source {source!r}; expected one of {SOURCES}')
@@ -1,13 +1,33 @@
-from bs4            import BeautifulSoup
-from datetime       import datetime
 from urllib.request import urlopen, Request
-from collections    import defaultdict, OrderedDict
-import re
-import yaml
+
+from quote_parsers import parse_libor, parse_eurodollar_futures, parse_swap_rates
 
 import pprint
 pp=pprint.PrettyPrinter(indent=2)
 
+LIBOR_URL = 'https://www.global-rates.com/en/interest-rates/libor/american-dollar/american-dollar.aspx'
+ED_URL    = 'https://www.cmegroup.com/CmeWS/mvc/Quotes/Future/1/G?quoteCodes=null'
+IRS_URL   = 'https://www.thefinancials.com/Widget.aspx?pid=FREE&wid=0050600496&mode=js&width=100%'
+
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+
+def fetch_page(link, timeout=None):
+    """
+    Download a page
+
+    Args:
+        link : str
+        timeout : float or None
+            seconds to wait for the server
+    Returns:
+        bytes : page content
+    """
+    req = Request(link, headers=HEADERS)
+    with urlopen(req, timeout=timeout) as html:
+        return html.read()
+
+
 def USD_LIBOR():
     """
     Get the most recent USD LIBOR Quotes from the link below
@@ -19,52 +39,21 @@ def USD_LIBOR():
             key: term (e.g. 1 week, 1 month, etc)
             value: Corresponding USD LIBOR rate 
     """
+    return parse_USD_LIBOR(fetch_page(LIBOR_URL))
+
 
-    _dict = defaultdict(dict)
-
-    link  = 'https://www.global-rates.com/en/interest-rates/libor/american-dollar/american-dollar.aspx'
-    req   = Request(link, headers={'User-Agent': 'Mozilla/5.0'})
-    html  = urlopen(req)
-    bsObj = BeautifulSoup(html, 'html.parser')
-    
-    table = bsObj.find('table', 
-        {'style' : 'width:100%;margin:16px 0px 0px 0px;border:1px solid #CCCCCC;'}
-    )
-
-    # Get columns(dates) as datetime format
-    table_dates = str(table.find('tr', {'class' : 'tableheader'})).split('</td>')
-    for i, item in enumerate(table_dates[1:-1]):
-        str_left, str_right = f'hdr{i+2}">', '</span>'
-        i_left, i_right     = len(str_left), len(str_right)
-
-        date = datetime.strptime(
-            re.search(r'%s(.*?)%s' %(str_left, str_right), item)[0][i_left:-i_right],
-            '%m-%d-%Y'
-        ).date()
-
-        # Insert date into dict as key; insert keys only (without values)
-        _dict[date]
-
-    # Get rates and update _dict
-    for i in [1, 2]:
-        table_data = str(table.findAll('tr', {'class' : 'tabledata%s'%(i)})).split('</tr>')
-        for row_term in table_data:
-            for i, item in enumerate(row_term.split('</td>')[:-1]):
-                if i == 0:
-                    str_left, str_right = 'USD LIBOR - ', '</a>'
-                    i_left, i_right     = len(str_left), len(str_right)
-                    term = re.search(r'%s(.*?)%s' %(str_left, str_right), item)[0][i_left:-i_right]
-                else:
-                    str_left = '<td align="center">'
-                    try:
-                        rate = float(item.replace(str_left, '')[:-2])
-                    except ValueError:
-                        continue
-
-                    list_keys = list(_dict)
-                    _dict[list_keys[i-1]].update({term : rate})
-
-    return _dict[date]
+def parse_USD_LIBOR(html):
+    """
+    Parse the USD LIBOR page
+
+    Args:
+        html : bytes or str
+    Return:
+        Dictionary:
+            key: term (e.g. 1 week, 1 month, etc)
+            value: Corresponding USD LIBOR rate 
+    """
+    return parse_libor(html).to_dict()
 
 
 def Eurodollar_Futures():
@@ -78,22 +67,21 @@ def Eurodollar_Futures():
             key: Term (e.g. DEC 2020)
             value: Corresponding 'last' quote
     """
-    
-    dict_quotes = OrderedDict()
+    return parse_Eurodollar_Futures(fetch_page(ED_URL))
 
-    link = 'https://www.cmegroup.com/CmeWS/mvc/Quotes/Future/1/G?quoteCodes=null'
-    req   = Request(link, headers={'User-Agent': 'Mozilla/5.0'})
-    html  = urlopen(req)
-    bsObj = str(BeautifulSoup(html, 'html.parser'))
 
-    get_quotes = yaml.safe_load(bsObj)['quotes']
-    for dict_month in get_quotes:
-        month, quote = dict_month['expirationMonth'], dict_month['last']
-        if quote == '-':
-            continue
-        dict_quotes[month] = float(quote)
+def parse_Eurodollar_Futures(html):
+    """
+    Parse the Eurodollar Futures quotes
 
-    return dict_quotes
+    Args:
+        html : bytes or str
+    Returns:
+        OrderedDict:
+            key: Term (e.g. DEC 2020)
+            value: Corresponding 'last' quote
+    """
+    return parse_eurodollar_futures(html).to_dict()
 
 
 def USD_Swap_Rates():
@@ -107,33 +95,18 @@ def USD_Swap_Rates():
             key: term (e.g. 1-Year)
             value: corresponding swap rate
     """
-    dict_quotes = defaultdict(float)
-
-    link = 'https://www.thefinancials.com/Widget.aspx?pid=FREE&wid=0050600496&mode=js&width=100%'
-    req   = Request(link, headers={'User-Agent': 'Mozilla/5.0'})
-    html  = urlopen(req)
-    bsObj = BeautifulSoup(html, 'html.parser')
-
-    table = bsObj.find('div', {'id' : 'TableRows', 'style' : ''})
-    
-    for item in str(table).split('</div>'):
-        
-        if '</a>' not in item:
-            continue
-        
-        str_left, str_right = '.jpg">', '</a>'
-        i_left, i_right = len(str_left), len(str_right)
-        data = re.search(r'%s(.*?)%s' %(str_left, str_right), item)[0][i_left:-i_right]
-        
-        if 'Year' in data:
-            dict_quotes[data]
-
-        elif '%' in data:
-            dict_key = list(dict_quotes)[-1]
-            dict_quotes[dict_key] = float(data[:-1])
-        
-        elif ('+' in data) or ('-' in data):
-            continue
-
-    return OrderedDict(dict_quotes.items())
-    
\ No newline at end of file
+    return parse_USD_Swap_Rates(fetch_page(IRS_URL))
+
+
+def parse_USD_Swap_Rates(html):
+    """
+    Parse the USD Swap rates widget
+
+    Args:
+        html : bytes or str
+    Returns:
+        OrderedDict:
+            key: term (e.g. 1-Year)
+            value: corresponding swap rate
+    """
+    return parse_swap_rates(html).to_dict()
@@ -0,0 +1,122 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from zero_curve import ZeroCurve
+
+
+class ScenarioEngine:
+    """
+    Rebuild a curve under many quote bumps, reusing the parts of the bootstrap that a bump does not touch.
+
+    Bumps are given as a matrix with one row per scenario and one column per quote, in the order of
+    `quote_keys`, and are in rate units (%) for every quote. A +0.01 bump raises a LIBOR or IRS rate by 1bp;
+    for an ED contract it lowers the futures price by 0.01, i.e. raises the futures rate by 1bp.
+
+    Args:
+        curve : ZeroCurve
+            base curve
+    """
+
+    def __init__(self, curve):
+        self.curve = curve
+        self.maturities = curve.quote_maturities()
+        self.quote_keys = list(self.maturities)
+
+    @classmethod
+    def from_quotes(cls, present_date, LIBOR, ED, IRS):
+        return cls(ZeroCurve(present_date, LIBOR, ED, IRS))
+
+    def key_rate_bumps(self, size=0.01):
+        """ One scenario per quote, bumping that quote only """
+        return size * np.eye(len(self.quote_keys))
+
+    def parallel_bump(self, size=0.01):
+        """ One scenario bumping every quote by the same size """
+        return np.full((1, len(self.quote_keys)), float(size))
+
+    def twist(self, short_size=-0.01, long_size=0.01):
+        """
+        One scenario moving the shortest quote by short_size and the longest by long_size,
+        linearly in maturity in between
+        """
+        days = np.array(list(self.maturities.values()), dtype=np.float64)
+        weight = (days - days.min()) / (days.max() - days.min())
+        return (short_size + (long_size - short_size) * weight)[None, :]
+
+    def discount_factors(self, bumps, dates, max_workers=None, chunksize=8):
+        """
+        Discount factors of every bumped curve
+
+        Args:
+            bumps : np.ndarray, (n_scenarios, n_quotes)
+            dates : array-like
+                datetime64 / datetime.date values or ACT/360 year fractions
+            max_workers : int or None
+                number of processes; scenarios are built in this process if 1
+            chunksize : int
+                number of scenarios built per task
+        Returns:
+            np.ndarray : (n_scenarios, n_dates)
+        """
+        bumps = np.atleast_2d(np.asarray(bumps, dtype=np.float64))
+        if bumps.shape[1] != len(self.quote_keys):
+            raise ValueError(f'bumps must have {len(self.quote_keys)} columns, one per quote')
+
+        # Build the base segments once here so that every scenario starts from them
+        base = self.curve
+        year_fractions = base.compile().to_days(dates) / 360
+
+        if max_workers == 1 or len(bumps) <= chunksize:
+            return _bumped_discount_factors(base, self.quote_keys, bumps, year_fractions)
+
+        chunks = [bumps[i:i+chunksize] for i in range(0, len(bumps), chunksize)]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                _bumped_discount_factors,
+                [base] * len(chunks), [self.quote_keys] * len(chunks), chunks, [year_fractions] * len(chunks)
+            )
+            return np.concatenate(list(results))
+
+    def key_rate_sensitivities(self, dates, amounts=None, size=0.01, max_workers=None):
+        """
+        Key-rate sensitivities per 1bp of every quote
+
+        Args:
+            dates : array-like
+                cash flow dates (or ACT/360 year fractions)
+            amounts : array-like or None
+                cash flow amounts
+            size : float
+                bump size (%) used for the finite difference
+            max_workers : int or None
+        Returns:
+            np.ndarray:
+                (n_quotes,) change of the portfolio value per 1bp if amounts are given,
+                otherwise (n_quotes, n_dates) change of each discount factor per 1bp
+        """
+        base = self.curve.compile().discount_factor(dates)
+        bumped = self.discount_factors(self.key_rate_bumps(size), dates, max_workers=max_workers)
+        sensitivities = (bumped - base) * (0.01 / size)
+
+        if amounts is None:
+            return sensitivities
+        return sensitivities @ np.asarray(amounts, dtype=np.float64)
+
+
+def _bumped_discount_factors(base, quote_keys, bumps, year_fractions):
+    """ Build the bumped curves of several scenarios and evaluate their discount factors """
+    out = np.empty((len(bumps), len(year_fractions)))
+    quotes = {'LIBOR' : base.LIBOR, 'ED' : base.ED_futures, 'IRS' : base.IRS}
+
+    for i, row in enumerate(bumps):
+        changes = {'LIBOR' : dict(), 'ED' : dict(), 'IRS' : dict()}
+        for (source, term), bump in zip(quote_keys, row):
+            if bump == 0:
+                continue
+            # ED futures are quoted as 100 - rate
+            changes[source][term] = quotes[source][term] + (-bump if source == 'ED' else bump)
+
+        curve = base.bumped(changes['LIBOR'], changes['ED'], changes['IRS'])
+        out[i] = curve.compile().discount_factor(year_fractions)
+
+    return out
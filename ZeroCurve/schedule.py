@@ -0,0 +1,85 @@
+from datetime  import date, timedelta
+from functools import lru_cache
+import calendar
+import numpy as np
+
+# 'JAN' -> 1, ..., 'DEC' -> 12
+MONTHS = {calendar.month_abbr[i].upper() : i for i in range(1, 13)}
+
+
+class ScheduleIndex:
+    """
+    Dates used in curve building, precomputed as integer days from the present date.
+
+        - IMM dates (third Wednesday) of every month from one year before the present date
+          up to the horizon, indexed by absolute month number (year * 12 + month - 1)
+        - Semiannual coupon dates rolled from the present date with relativedelta(months=6) semantics:
+          the day of month is carried forward from the previous coupon and clipped to the month end
+        - ACT/360 year fractions
+
+    Args:
+        present_date : datetime.date
+        horizon_years : int
+            number of years covered after the present date
+    """
+
+    def __init__(self, present_date, horizon_years=32):
+        self.present_date = present_date
+        self.horizon_years = horizon_years
+        present = np.datetime64(present_date, 'D')
+
+        # IMM dates
+        self.first_month = (present_date.year - 1) * 12 + present_date.month - 1
+        months = np.arange(self.first_month, self.first_month + 12 * (horizon_years + 1))
+        months = (months - 1970 * 12).astype('datetime64[M]')   # datetime64[M] counts months from 1970-01
+        first_days = months.astype('datetime64[D]')
+        weekdays = (first_days.astype(np.int64) + 3) % 7   # 1970-01-01 is a Thursday; Monday = 0
+        third_wednesdays = first_days + (calendar.WEDNESDAY - weekdays) % 7 + 14
+        self.imm_days = (third_wednesdays - present).astype(np.int64)
+
+        # Semiannual coupon dates; coupon_days[i] is the i-th roll of 6 months (coupon_days[0] = 0)
+        n_coupons = 2 * horizon_years + 1
+        coupon_months = np.datetime64(present_date, 'M') + 6 * np.arange(n_coupons)
+        month_ends = ((coupon_months + 1).astype('datetime64[D]') - 1).astype('datetime64[D]')
+        days_in_month = (month_ends - coupon_months.astype('datetime64[D]')).astype(np.int64) + 1
+        day_of_month = np.minimum.accumulate(np.minimum(days_in_month, present_date.day))
+        coupon_dates = coupon_months.astype('datetime64[D]') + (day_of_month - 1)
+        self.coupon_days = (coupon_dates - present).astype(np.int64)
+        self.coupon_year_fractions = self.year_fraction(self.coupon_days)
+
+    @staticmethod
+    def year_fraction(days):
+        """ ACT/360 year fraction of day counts (scalar or array) """
+        return np.asarray(days) / 360
+
+    def month_index(self, term):
+        """
+        Absolute month number of a futures term or a date
+
+        Args:
+            term : str or datetime.date
+                e.g. DEC 2020, datetime.date(2020, 12, 16)
+        Returns:
+            int : year * 12 + month - 1
+        """
+        if isinstance(term, date):
+            return term.year * 12 + term.month - 1
+        month, year = term.split()
+        return int(year) * 12 + MONTHS[month.upper()] - 1
+
+    def imm_day(self, month):
+        """ Days from the present date to the IMM date of an absolute month number """
+        i = month - self.first_month
+        if not 0 <= i < len(self.imm_days):
+            raise ValueError(f'Month {month // 12}-{month % 12 + 1:02d} is outside the schedule horizon')
+        return int(self.imm_days[i])
+
+    def to_date(self, days):
+        """ datetime.date of a day count from the present date """
+        return self.present_date + timedelta(int(days))
+
+
+@lru_cache(maxsize=256)
+def schedule_index(present_date, horizon_years=32):
+    """ Shared ScheduleIndex per (present date, horizon) """
+    return ScheduleIndex(present_date, horizon_years)
@@ -0,0 +1,100 @@
+from scipy.interpolate import CubicSpline
+import numpy as np
+
+
+def interpolate_swap_rates(IRS_days, IRS_rates, term_days):
+    """
+    Interpolate swap rates of one or many curves with one cubic spline call
+
+    Args:
+        IRS_days : np.ndarray, (n_quotes,)
+            terms of the quoted swaps in days (1-Year -> 365, ...), shared by all curves
+        IRS_rates : np.ndarray, (..., n_quotes)
+            quoted swap rates; leading axes index the curves
+        term_days : np.ndarray, (n_terms,) or (..., n_terms)
+            terms to interpolate, shared by all curves or given per curve
+    Returns:
+        np.ndarray : (..., n_terms) interpolated swap rates
+    """
+    IRS_rates = np.asarray(IRS_rates, dtype=np.float64)
+    term_days = np.asarray(term_days)
+    spline = CubicSpline(IRS_days, IRS_rates, axis=-1)
+
+    if term_days.ndim <= 1:
+        return spline(term_days)
+
+    # Terms differ by curve: evaluate each curve's polynomial pieces at its own terms
+    batch_shape = IRS_rates.shape[:-1]
+    term_days = np.broadcast_to(term_days, batch_shape + term_days.shape[-1:])
+    coefficients = spline.c.reshape(spline.c.shape[:2] + (-1,))      # (4, n_quotes - 1, n_curves)
+    flat_terms = term_days.reshape(-1, term_days.shape[-1])            # (n_curves, n_terms)
+
+    knots = spline.x
+    interval = np.clip(np.searchsorted(knots, flat_terms, side='right') - 1, 0, len(knots) - 2)
+    dx = flat_terms - knots[interval]
+    c = coefficients[:, interval, np.arange(flat_terms.shape[0])[:, None]]   # (4, n_curves, n_terms)
+
+    rates = ((c[0] * dx + c[1]) * dx + c[2]) * dx + c[3]
+    return rates.reshape(term_days.shape)
+
+
+def bootstrap_discount_factors(swap_rates, initial_discount_factor):
+    """
+    Bootstrap semiannual discount factors from par swap rates of one or many curves
+
+    The i-th par swap (i = 1, ..., n) satisfies
+
+        0.5 * s_i * (D_0 + D_1 + ... + D_i) + D_i = 1
+
+    where D_0 is the discount factor of the first coupon, taken from the shorter curve.
+    This is a lower triangular system. It is solved in closed form with running
+    products: writing S_i = D_0 + ... + D_i and u_i = 1 / (1 + 0.5 * s_i),
+
+        S_i = u_i * (S_{i-1} + 1)   =>   S_i = P_i * (D_0 + sum_{k<=i} 1 / P_{k-1}),  P_i = u_1 * ... * u_i
+
+    Args:
+        swap_rates : np.ndarray, (..., n)
+            par swap rates (decimal) of the 2nd, 3rd, ... semiannual terms
+        initial_discount_factor : float or np.ndarray, (...,)
+            D_0 of each curve
+    Returns:
+        np.ndarray : (..., n) discount factors D_1, ..., D_n
+    """
+    swap_rates = np.asarray(swap_rates, dtype=np.float64)
+    initial_discount_factor = np.broadcast_to(
+        np.asarray(initial_discount_factor, dtype=np.float64)[..., None], swap_rates.shape[:-1] + (1,)
+    )
+
+    u = 1 / (1 + 0.5 * swap_rates)
+    P = np.cumprod(u, axis=-1)
+    P_previous = np.concatenate([np.ones_like(P[..., :1]), P[..., :-1]], axis=-1)
+
+    S = P * (initial_discount_factor + np.cumsum(1 / P_previous, axis=-1))
+    S_previous = np.concatenate([initial_discount_factor, S[..., :-1]], axis=-1)
+
+    return u * (1 - 0.5 * swap_rates * S_previous)
+
+
+def long_end_zero_rates(IRS_days, IRS_rates, term_days, terms, initial_zero_rate):
+    """
+    Zero rates (%) of the long end of one or many curves
+
+    Args:
+        IRS_days : np.ndarray, (n_quotes,)
+            terms of the quoted swaps in days
+        IRS_rates : np.ndarray, (..., n_quotes)
+            quoted swap rates (%)
+        term_days : np.ndarray, (n_terms,) or (..., n_terms)
+            coupon terms in days (12 months, 18 months, ...)
+        terms : np.ndarray, (n_terms,)
+            coupon terms in years (1, 1.5, ...)
+        initial_zero_rate : float or np.ndarray, (...,)
+            zero rate (%) of the first coupon (6 months before the first term)
+    Returns:
+        np.ndarray : (..., n_terms) zero rates (%)
+    """
+    swap_rates = interpolate_swap_rates(IRS_days, IRS_rates, term_days) / 100
+    initial_discount_factor = np.exp(-0.5 * np.asarray(initial_zero_rate) / 100)
+
+    discount_factors = bootstrap_discount_factors(swap_rates, initial_discount_factor)
+    return 100 * -np.log(discount_factors) / terms
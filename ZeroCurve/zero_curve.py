@@ -1,14 +1,16 @@
 from math                   import log, exp
 from datetime               import datetime, date, timedelta
 from collections            import OrderedDict
-from scipy.interpolate      import CubicSpline
 from dateutil.relativedelta import relativedelta
-import inspect
-import calendar
+from itertools              import islice
+import copy
 import numpy as np
 import matplotlib.pyplot as plt
 
-from request_quotes import USD_LIBOR, Eurodollar_Futures, USD_Swap_Rates
+from quote_providers import default_provider
+from compiled_curve  import CompiledCurve
+from schedule        import schedule_index
+from swap_bootstrap  import long_end_zero_rates
 
 class ZeroCurve:
     """ 
@@ -18,26 +20,87 @@ class ZeroCurve:
 
     def __init__(
         self, 
-        present_date = datetime.strftime(datetime.today(), '%Y-%m-%d'), 
-        LIBOR = USD_LIBOR(),
-        ED = Eurodollar_Futures(), 
-        IRS = USD_Swap_Rates()
+        present_date = None, 
+        LIBOR = None,
+        ED = None, 
+        IRS = None,
+        provider = None
     ):
-        
-        self.present_date = self.__datetime_date(present_date)
-        self.LIBOR = LIBOR
-        self.ED_futures = ED
-        self.IRS = IRS
+        """
+        Args:
+            present_date : str or datetime.date
+                if None, the present date of the provider (e.g. of a snapshot), else today
+            LIBOR, ED, IRS : dict or None
+                quotes that are not given are fetched from the provider when the curve first needs them
+            provider : QuoteProvider or None
+                quote_providers.default_provider() if None
+        """
+        self.provider = provider
+        if present_date is None:
+            present_date = getattr(self.__provider(), 'present_date', None) or date.today()
+        self.present_date = present_date
+        self._LIBOR = LIBOR
+        self._ED_futures = ED
+        self._IRS = IRS
         self.VOL = 0.005
 
+        # Bootstrapped segments keyed by the quotes they depend on: name -> (key, OrderedDict)
+        self._segments = dict()
+
+    def __provider(self):
+        return self.provider if self.provider is not None else default_provider()
+
+    def __quotes(self, source):
+        return self.__provider().get(source)
+
+    @property
+    def present_date(self):
+        return self._present_date
+
+    @present_date.setter
+    def present_date(self, present_date):
+        # The schedule depends on the present date; cached segments are keyed by it and rebuild on their own
+        self._present_date = self.__datetime_date(present_date)
+        self.schedule = schedule_index(self._present_date)
+
+    @property
+    def LIBOR(self):
+        if self._LIBOR is None:
+            self._LIBOR = self.__quotes('LIBOR')
+        return self._LIBOR
+
+    @LIBOR.setter
+    def LIBOR(self, LIBOR):
+        self._LIBOR = LIBOR
+
+    @property
+    def ED_futures(self):
+        if self._ED_futures is None:
+            self._ED_futures = self.__quotes('ED')
+        return self._ED_futures
+
+    @ED_futures.setter
+    def ED_futures(self, ED):
+        self._ED_futures = ED
+
+    @property
+    def IRS(self):
+        if self._IRS is None:
+            self._IRS = self.__quotes('IRS')
+        return self._IRS
+
+    @IRS.setter
+    def IRS(self, IRS):
+        self._IRS = IRS
+
     def __datetime_date(self, str_date):
         ''' Casting string-formatted date to datetime.date '''
+        if isinstance(str_date, datetime):
+            return str_date.date()
+        if isinstance(str_date, date):
+            return str_date
         return datetime.strptime(str_date, '%Y-%m-%d').date()
 
-    def __delta(self, date):
-        ''' Daycount from the present date to the input date divided by 360 '''
-        return (date - self.present_date).days / 360
-
     def __term_to_days(self, term):
         """
         Transform a string-formatted term to days
@@ -55,51 +118,113 @@ class ZeroCurve:
                 return int(term[0]) * 365
             return int(term[0]) * 30
 
-    def __ED_settlement_date(self, term):
-        """
-        Return the third Wednesday of the month of 'term'
-        which is a settlement date of Eurodollar Futures
-
-        Args:
-            term : string or datetime.date
-                e.g. DEC 2020, datetime.date(2020, 03, 02)          
-        Returns:
-            int : datetime.date
-        """
-        try:
-            datetime_term = datetime.strptime(term, '%b %Y').date()
-        except TypeError:
-            datetime_term = term
-
-        year, month = datetime_term.year, datetime_term.month
-        calendarSUN = calendar.Calendar(firstweekday=calendar.SUNDAY)
-        monthlyCalendar = calendarSUN.monthdatescalendar(year, month)
-        return [day 
-            for week in monthlyCalendar 
-                for day in week 
-                    if day.weekday() == calendar.WEDNESDAY and day.month == month
-        ][2]
-        
-
-    def __initial_zero_rate(self, date):
+    def __initial_zero_rate(self, date, shorter_rate):
         """
         Calculate the zero rate for the first term of middle curve or long end curve
         in order for the initial discount factor calculation
 
         Args:
             date : datetime.date
+            shorter_rate : OrderedDict
+                the segment preceding the one being built (short-end curve for the middle curve,
+                middle curve for the long-end curve)
         Returns:
             float : zero rate
         """
-        calling_from = inspect.stack()[1].function
-        shorter_rate = self.short_end_curve() if calling_from == 'middle_curve' else self.middle_curve()
-
         for t1, t2 in zip(list(shorter_rate)[:-1], list(shorter_rate)[1:]):
             if t1 <= date <= t2:
                 return ((t2-date).days * shorter_rate[t1]   + \
                         (date-t1).days * shorter_rate[t2] ) / (t2 - t1).days
 
 
+    def update_quotes(self, LIBOR = None, ED = None, IRS = None):
+        """
+        Replace some quotes of the curve, e.g. on a new tick.
+        Only the segments depending on the changed quotes are rebuilt on the next request.
+
+        Args:
+            LIBOR, ED, IRS : dict or None
+                terms to update; terms not given keep their current quotes
+        Returns:
+            None
+        """
+        if LIBOR:
+            self._LIBOR = OrderedDict(self.LIBOR, **LIBOR)
+        if ED:
+            self._ED_futures = OrderedDict(self.ED_futures, **ED)
+        if IRS:
+            self._IRS = OrderedDict(self.IRS, **IRS)
+
+    def bumped(self, LIBOR = None, ED = None, IRS = None):
+        """
+        Copy of the curve with some quotes replaced.
+        The copy starts with the cached segments of this curve, so segments not affected
+        by the new quotes are not bootstrapped again.
+
+        Args:
+            LIBOR, ED, IRS : dict or None
+                terms to replace
+        Returns:
+            ZeroCurve
+        """
+        # Resolve the quotes before copying so that both curves share them
+        self.LIBOR, self.ED_futures, self.IRS
+
+        curve = copy.copy(self)
+        curve._segments = dict(self._segments)
+        curve.update_quotes(LIBOR, ED, IRS)
+        return curve
+
+    def quote_maturities(self):
+        """
+        Maturity of every quote in days from the present date
+
+        Args:
+            None
+        Returns:
+            OrderedDict:
+                key : (source, term), e.g. ('LIBOR', '1 week'), ('ED', 'MAR 2021'), ('IRS', '1-Year')
+                value : days
+        """
+        maturities = OrderedDict()
+        for term in self.LIBOR:
+            if term != 'overnight':
+                maturities[('LIBOR', term)] = self.__term_to_days(term)
+        for term in self.ED_futures:
+            # A contract covers the 3 months after its IMM date
+            month = self.schedule.month_index(term)
+            maturities[('ED', term)] = self.schedule.imm_day(month + 3)
+        for term in self.IRS:
+            maturities[('IRS', term)] = int(term.replace('-Year', '')) * 365
+        return maturities
+
+    def __segment_keys(self):
+        """
+        Cache keys of the three segments.
+        Each key contains the key of the preceding segment, so a change of the short-end quotes
+        invalidates the middle and long-end curves as well.
+        """
+        short_key  = (self.present_date, tuple(self.LIBOR.items()))
+        middle_key = (short_key, self.VOL, tuple(self.ED_futures.items()))
+        long_key   = (middle_key, tuple(self.IRS.items()))
+        return {'short' : short_key, 'middle' : middle_key, 'long' : long_key}
+
+    def __segment(self, name):
+        """ Return the cached segment, rebuilding it if the quotes it depends on have changed """
+        key = self.__segment_keys()[name]
+        cached = self._segments.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        build = {
+            'short'  : self.__build_short_end_curve,
+            'middle' : self.__build_middle_curve,
+            'long'   : self.__build_long_end_curve,
+        }[name]
+        segment = build()
+        self._segments[name] = (key, segment)
+        return segment
+
     def short_end_curve(self):
         """
         Generate zero rates from LIBOR or other short-term rates
@@ -111,6 +236,9 @@ class ZeroCurve:
                 key : datetime.date
                 value : zero rate
         """
+        return OrderedDict(self.__segment('short'))
+
+    def __build_short_end_curve(self):
         _dict = dict()
         for term, rate in self.LIBOR.items():
             if term == 'overnight':
@@ -135,32 +263,45 @@ class ZeroCurve:
                 key : datetime.date
                 value : zero rate
         """
+        return OrderedDict(self.__segment('middle'))
+
+    def __build_middle_curve(self):
         _dict = OrderedDict()
-        rates_ED = self.ED_futures
+        index = self.schedule
+
+        # Quotes keyed by the absolute month number of the contract
+        rates_ED = OrderedDict(
+            (index.month_index(term), quote) for term, quote in self.ED_futures.items()
+        )
+        months_ED = list(rates_ED)
 
         # short-end curve dict의 term들이 이번달 Eurodollar Futures 결제일보다 모두 늦는 경우
         # 초기 zero rate 값을 short-end curve에서 보간할 수 없음
         # 따라서 zero date를 다음달 결제일로 이월하여 계산
         i = 0; zero_rate = None
         while isinstance(zero_rate, type(None)):
-            zero_date = self.__ED_settlement_date(list(rates_ED)[i])
-            zero_rate = self.__initial_zero_rate(zero_date)
+            if i == len(months_ED):
+                raise ValueError('The short-end curve does not reach the settlement of any Eurodollar Futures quote')
+            month = months_ED[i]
+            zero_days = index.imm_day(month)
+            zero_rate = self.__initial_zero_rate(index.to_date(zero_days), self.__segment('short'))
             i += 1
-        discount_factor = exp(-self.__delta(zero_date) * zero_rate/100)
+        discount_factor = exp(-index.year_fraction(zero_days) * zero_rate/100)
 
-        ED_month = lambda t : datetime.strftime(t, '%b %Y').upper()
-        while ED_month(zero_date) in list(self.ED_futures):
+        while month in rates_ED:
 
-            settlement_date  = zero_date
-            zero_date = self.__ED_settlement_date(settlement_date+relativedelta(months=3))
+            settlement_days = zero_days
+            zero_days = index.imm_day(month + 3)
 
-            futures_rate = 100 - self.ED_futures[ED_month(settlement_date)]
-            convexity    = 0.5 * (self.VOL**2) * self.__delta(settlement_date) * self.__delta(zero_date)
+            futures_rate = 100 - rates_ED[month]
+            convexity    = 0.5 * (self.VOL**2) * index.year_fraction(settlement_days) * index.year_fraction(zero_days)
             forward_rate = futures_rate - (convexity*100)
 
-            discount_factor /= (1 + ((zero_date - settlement_date).days/360) * (forward_rate/100))
-            zero_rate = 100 * (-log(discount_factor)) / (self.__delta(zero_date))
-            _dict[zero_date] =zero_rate
+            discount_factor /= (1 + ((zero_days - settlement_days)/360) * (forward_rate/100))
+            zero_rate = 100 * (-log(discount_factor)) / (index.year_fraction(zero_days))
+            _dict[index.to_date(zero_days)] = zero_rate
+
+            month += 3
 
         return _dict
 
@@ -176,32 +317,28 @@ class ZeroCurve:
                 key : datetime.date
                 value : zero rate
         """
+        return OrderedDict(self.__segment('long'))
+
+    def __build_long_end_curve(self):
         _dict = OrderedDict()
 
         term_to_year = lambda term: int(term.replace('-Year', ''))
         zero_date = self.present_date + relativedelta(years=term_to_year(next(iter(self.IRS))))
-        zero_rate = self.__initial_zero_rate(zero_date - relativedelta(months=6))
-        sum_discount_factor = exp(-0.5 * zero_rate/100)
+        zero_rate = self.__initial_zero_rate(zero_date - relativedelta(months=6), self.__segment('middle'))
+        if zero_rate is None:
+            raise ValueError('The middle curve does not reach the first coupon of the IRS quotes')
+
+        # Coupon dates 12 months, 18 months, ..., 30 years after the present date
+        coupon_days = self.schedule.coupon_days[2:61]
+        list_terms =  np.linspace(1,31,60,endpoint=False)[:-1] # 1, 1.5, 2, 2.5, ..., 30
 
-        IRS_rates_interpolated =  CubicSpline(
+        zero_rates = long_end_zero_rates(
             [term_to_year(term) * 365 for term in self.IRS], # 1-Year -> 365, 2-Year -> 2 * 365, ...
             list(self.IRS.values()), # list of rates
+            coupon_days, list_terms, zero_rate
         )
-
-        list_terms =  np.linspace(1,31,60,endpoint=False)[:-1] # 1, 1.5, 2, 2.5, ..., 30
-        datetime_term = self.present_date + relativedelta(months=6)
-        for term in list_terms:
-            datetime_term += relativedelta(months=6)
-            
-            term_to_days = (datetime_term - self.present_date).days
-            swap_rate = IRS_rates_interpolated(term_to_days) / 100
-            # print(term_to_days, swap_rate);continue
-
-            discount_factor = (1 - 0.5 * swap_rate * sum_discount_factor)/ (1 + 0.5 * swap_rate)
-            zero_rate = 100 * -log(discount_factor) / term
-            sum_discount_factor += discount_factor
-
-            _dict[datetime_term] = zero_rate
+        for term_to_days, zero_rate in zip(coupon_days, zero_rates):
+            _dict[self.schedule.to_date(term_to_days)] = zero_rate
 
         return _dict
 
@@ -218,16 +355,30 @@ class ZeroCurve:
         """
 
         # Only first two items will be taken from the short-end curve (1-week and 1-month)
-        short_end_curve = self.short_end_curve()
-        while len(short_end_curve) > 2:
-            short_end_curve.popitem()
+        short_end_curve = islice(self.__segment('short').items(), 2)
 
         # Only first three items will be taken from the middle curve (3-month to < 1-year)
-        middle_curve = self.middle_curve()
-        while len(middle_curve) > 3:
-            middle_curve.popitem()
+        middle_curve = islice(self.__segment('middle').items(), 3)
+
+        return {**dict(short_end_curve), **dict(middle_curve), **self.__segment('long')}
+
+    def compile(self):
+        """
+        Build the curve once into an interpolator for vectorized queries
+
+        Args:
+            None
+        Returns:
+            CompiledCurve : discount factors, zero rates and forward rates over arrays of dates
+        """
+        key = self.__segment_keys()['long']
+        cached = self._segments.get('compiled')
+        if cached is not None and cached[0] == key:
+            return cached[1]
 
-        return {**short_end_curve, **middle_curve, **self.long_end_curve()}
+        compiled = CompiledCurve(self.present_date, self.curve())
+        self._segments['compiled'] = (key, compiled)
+        return compiled
 
     def plot_curve(self):
         """
@@ -238,14 +389,10 @@ class ZeroCurve:
         Returns:
             None
         """
-        swap_curve = { 
-            (date - self.present_date).days : rate 
-                for date, rate in self.curve().items()
-        }
-        x = list(swap_curve)
-        y = CubicSpline(x, list(swap_curve.values()))
+        compiled = self.compile()
+        x = compiled.days
 
-        datetime_x = [self.present_date + timedelta(i) for i in x]
-        plt.plot(datetime_x, y(x))
+        datetime_x = [self.present_date + timedelta(int(i)) for i in x]
+        plt.plot(datetime_x, compiled.zero_rate(x / 360))
         plt.title(f'{self.present_date} Zero Curve')
-        plt.show()
\ No newline at end of file
+        plt.show()
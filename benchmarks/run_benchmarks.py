@@ -0,0 +1,368 @@
+"""
+Benchmarks of the pricing, calibration and curve hot paths
+
+    python benchmarks/run_benchmarks.py [--quick] [--only NAME ...] [--repeat N] [--output results.json]
+    python benchmarks/run_benchmarks.py --compare baseline.json [--threshold 1.10]
+
+Every benchmark runs a fixed-seed workload over a sweep of sizes (paths, strikes, expiries, smiles, curves)
+and records the best wall time of --repeat runs, the throughput in items per second and the peak memory
+traced by tracemalloc (measured in one separate run, since tracing slows the code down).
+Results are written as JSON; --compare prints the time ratios against an earlier results file and
+exits with status 1 if any benchmark is slower than --threshold times its baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'ZeroCurve'), os.path.join(ROOT, 'Volmodel')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+SEED = 20210315
+SNAPSHOT = os.path.join(ROOT, 'ZeroCurve', 'snapshots', '2021-03-15.json')
+
+# name -> (setup, sizes, quick sizes, unit); setup(size) returns (function to time, number of items it processes)
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(name, sizes, quickSizes, unit):
+    def register(setup):
+        BENCHMARKS[name] = (setup, sizes, quickSizes, unit)
+        return setup
+    return register
+
+
+# ----------------------------------------------------------------
+# WORKLOADS
+
+@benchmark('brownian_bridge_paths', [10**3, 10**4, 10**5], [10**3, 10**4], 'paths')
+def bridge_paths(numberOfPaths):
+    from brownianbridge import brownianBridgePaths
+
+    def run():
+        generator = np.random.default_rng(SEED)
+        return brownianBridgePaths(64, 0.0, 1.0, 0.0, generator.standard_normal(numberOfPaths),
+                                   numberOfPaths, generator=generator)
+    return run, numberOfPaths
+
+
+@benchmark('brownian_bridge_single', [100, 1000], [100], 'paths')
+def bridge_single(numberOfPaths):
+    from brownianbridge import brownianBridge
+
+    def run():
+        np.random.seed(SEED)
+        return [brownianBridge(64, 0.0, 1.0, 0.0, z) for z in np.random.standard_normal(numberOfPaths)]
+    return run, numberOfPaths
+
+
+def _chain(numberOfStrikes, numberOfExpiries):
+    rng = np.random.default_rng(SEED)
+    strikes = np.linspace(50, 150, numberOfStrikes)
+    taus = np.linspace(0.05, 2.0, numberOfExpiries)
+    vols = rng.uniform(0.15, 0.35, numberOfExpiries)
+    skews = rng.uniform(-0.8, 0.2, numberOfExpiries)
+    kurts = rng.uniform(3.0, 5.0, numberOfExpiries)
+    return strikes, taus, vols, skews, kurts
+
+
+@benchmark('skew_kurt_chain', [100, 1000, 10000], [100, 1000], 'options (20 expiries x strikes)')
+def skew_kurt_chain(numberOfStrikes):
+    from OptionPricing.SkewKurtAdjust import price_chain, MODELS
+    strikes, taus, vols, skews, kurts = _chain(numberOfStrikes, 20)
+    optionType = (strikes < 100).astype(int)
+
+    def run():
+        return [price_chain(100.0, strikes, 0.02, vols, taus, 0.01, skews, kurts, optionType, model)
+                for model in MODELS]
+    return run, 3 * 20 * numberOfStrikes
+
+
+@benchmark('skew_kurt_scalar', [100, 1000], [100], 'options')
+def skew_kurt_scalar(numberOfOptions):
+    from OptionPricing.SkewKurtAdjust import SkewKurtAdjust, OptionType
+    strikes = np.linspace(50, 150, numberOfOptions)
+
+    def run():
+        return [SkewKurtAdjust(100.0, strike, 0.02, 0.2, 0.5, 0.01).get_option_value_corrado_su(-0.3, 4.0, OptionType.CALL)
+                for strike in strikes]
+    return run, numberOfOptions
+
+
+@benchmark('skew_kurt_calibration', [10, 100, 1000], [10, 100], 'smiles of 25 strikes')
+def skew_kurt_calibration(numberOfSmiles):
+    from OptionPricing.SkewKurtAdjust import price_chain, calibrate_skew_kurt
+    strikes, taus, vols, skews, kurts = _chain(25, numberOfSmiles)
+    prices = price_chain(100.0, strikes, 0.02, vols, taus, 0.01, skews, kurts, 0, 'corrado_su')
+
+    def run():
+        return calibrate_skew_kurt(100.0, strikes, 0.02, vols, taus, 0.01, prices, 0, 'corrado_su')
+    return run, numberOfSmiles
+
+
+@benchmark('implied_vol_bounds', [10**3, 10**5, 10**6], [10**3, 10**5], 'options')
+def implied_vol_bounds(numberOfOptions):
+    from ImvolBoundary import ImpliedVol
+    rng = np.random.default_rng(SEED)
+    strikes = rng.uniform(50, 150, numberOfOptions)
+    vols = rng.uniform(0.1, 0.5, numberOfOptions)
+    taus = rng.uniform(0.05, 2.0, numberOfOptions)
+
+    def run():
+        bounds = ImpliedVol(100.0, strikes, 0.02, 0.01, vols, taus)
+        return bounds.get_lower_bound(), bounds.get_upper_bound()
+    return run, numberOfOptions
+
+
+@benchmark('implied_vol_solver', [10**3, 10**5, 10**6], [10**3, 10**5], 'options')
+def implied_vol_solver(numberOfOptions):
+    from ImvolBoundary import implied_vol
+    from blackscholes import black_scholes_price
+    rng = np.random.default_rng(SEED)
+    strikes = rng.uniform(50, 150, numberOfOptions)
+    taus = rng.uniform(0.05, 2.0, numberOfOptions)
+    optionType = rng.integers(0, 2, numberOfOptions)
+    prices = black_scholes_price(100.0, strikes, 0.02, 0.01, rng.uniform(0.1, 0.5, numberOfOptions), taus, optionType)
+
+    def run():
+        return implied_vol(prices, 100.0, strikes, 0.02, 0.01, taus, optionType)
+    return run, numberOfOptions
+
+
+def _sabr_smiles(numberOfSmiles, beta):
+    from SABR import StochasticABR
+    from SABRSurface import SmileQuote
+    rng = np.random.default_rng(SEED)
+    smiles = []
+    for i in range(numberOfSmiles):
+        spot = 100.0
+        strikes = np.arange(70.0, 131.0, 5.0)
+        tau = 0.1 + 0.1 * (i % 20)
+        alpha, rho, vVol = rng.uniform(1, 3), rng.uniform(-0.6, 0.3), rng.uniform(0.2, 1.0)
+        model = StochasticABR(beta, spot, strikes, spot, tau, np.ones(len(strikes)))
+        marketVol = np.empty(len(strikes))
+        marketVol[strikes != spot] = model.get_vol_of_out_atm(alpha, rho, vVol)
+        marketVol[strikes == spot] = model.get_vol_of_atm(alpha, rho, vVol)
+        smiles.append(SmileQuote(f'U{i // 20:04d}', np.datetime64('2021-03-15') + int(tau * 365), tau, spot, spot,
+                                 strikes, marketVol * (1 + rng.normal(0, 1e-4, len(strikes)))))
+    return smiles
+
+
+@benchmark('sabr_calibration', [10, 100], [10], 'smiles of 13 strikes')
+def sabr_calibration(numberOfSmiles):
+    from SABR import StochasticABR
+    smiles = _sabr_smiles(numberOfSmiles, 0.5)
+
+    def run():
+        return [StochasticABR(0.5, smile.atTheMoney, smile.strikePrices, smile.spot, smile.tau, smile.marketVol).calibrate()
+                for smile in smiles]
+    return run, numberOfSmiles
+
+
+@benchmark('sabr_surface_calibration', [10, 100, 1000], [10, 100], 'smiles of 13 strikes')
+def sabr_surface_calibration(numberOfSmiles):
+    from SABRSurface import calibrate_surface
+    smiles = _sabr_smiles(numberOfSmiles, 0.5)
+
+    def run():
+        return calibrate_surface(smiles, 0.5, maxWorkers=1)
+    return run, numberOfSmiles
+
+
+@benchmark('sabr_vol_evaluation', [100, 1000], [100], 'vols (parameter sets x 1000 strikes)')
+def sabr_vol_evaluation(numberOfParams):
+    from SABR import sabr_vol
+    rng = np.random.default_rng(SEED)
+    alpha, rho, vVol = rng.uniform(1, 3, numberOfParams), rng.uniform(-0.6, 0.3, numberOfParams), rng.uniform(0.2, 1.0, numberOfParams)
+    strikes = np.linspace(50, 150, 1000)
+
+    def run():
+        return sabr_vol(alpha, rho, vVol, 0.5, 100.0, 0.5, strikes)
+    return run, numberOfParams * 1000
+
+
+def _svi_slices(numberOfExpiries):
+    from SVI import svi_total_variance
+    taus = np.linspace(0.1, 3.0, numberOfExpiries)
+    strikes = [np.linspace(60, 140, 21) for _ in taus]
+    params = [(0.004 * tau / 0.1, 0.05 * np.sqrt(tau / 0.1), -0.4, 0.0, 0.1) for tau in taus]
+    vols = [np.sqrt(svi_total_variance(np.log(K / 100.0), *p) / tau) for K, p, tau in zip(strikes, params, taus)]
+    return strikes, np.full(numberOfExpiries, 100.0), taus, vols
+
+
+@benchmark('svi_calibration', [5, 20, 50], [5, 20], 'expiries of 21 strikes')
+def svi_calibration(numberOfExpiries):
+    from SVISurface import SVISurface
+    strikes, forwards, taus, vols = _svi_slices(numberOfExpiries)
+
+    def run():
+        return SVISurface.calibrate(strikes, forwards, taus, vols)
+    return run, numberOfExpiries
+
+
+@benchmark('svi_quasi_explicit_calibration', [5, 20], [5], 'expiries of 21 strikes')
+def svi_quasi_explicit_calibration(numberOfExpiries):
+    from SVISurface import SVISurface
+    strikes, forwards, taus, vols = _svi_slices(numberOfExpiries)
+
+    def run():
+        return SVISurface.calibrate(strikes, forwards, taus, vols, quasiExplicit=True)
+    return run, numberOfExpiries
+
+
+@benchmark('svi_surface_evaluation', [10**4, 10**6], [10**4], 'points')
+def svi_surface_evaluation(numberOfPoints):
+    from SVISurface import SVISurface
+    strikes, forwards, taus, vols = _svi_slices(10)
+    surface = SVISurface.calibrate(strikes, forwards, taus, vols)
+    rng = np.random.default_rng(SEED)
+    queryStrikes, queryTaus = rng.uniform(60, 140, numberOfPoints), rng.uniform(0.05, 3.5, numberOfPoints)
+
+    def run():
+        return surface.implied_vol(queryStrikes, queryTaus)
+    return run, numberOfPoints
+
+
+def _bumped_quotes(numberOfCurves):
+    from quote_providers import SnapshotQuoteProvider
+    snapshot = SnapshotQuoteProvider(SNAPSHOT)
+    quotes = snapshot.quotes()
+    rng = np.random.default_rng(SEED)
+    curves = []
+    for _ in range(numberOfCurves):
+        shift = rng.normal(0, 0.01)
+        curves.append({
+            'LIBOR' : OrderedDict((term, rate + shift) for term, rate in quotes['LIBOR'].items()),
+            'ED' : OrderedDict((term, price - shift) for term, price in quotes['ED'].items()),
+            'IRS' : OrderedDict((term, rate + shift) for term, rate in quotes['IRS'].items()),
+        })
+    return snapshot.present_date, curves
+
+
+@benchmark('zero_curve_bootstrap', [1, 10, 50], [1, 10], 'curves')
+def zero_curve_bootstrap(numberOfCurves):
+    from zero_curve import ZeroCurve
+    presentDate, curves = _bumped_quotes(numberOfCurves)
+
+    def run():
+        return [ZeroCurve(presentDate, **quotes).curve() for quotes in curves]
+    return run, numberOfCurves
+
+
+@benchmark('zero_curve_compiled_queries', [10**4, 10**6], [10**4], 'queries (discount factors)')
+def zero_curve_compiled_queries(numberOfQueries):
+    from zero_curve import ZeroCurve
+    presentDate, (quotes,) = _bumped_quotes(1)
+    compiled = ZeroCurve(presentDate, **quotes).compile()
+    times = np.random.default_rng(SEED).uniform(0, 30, numberOfQueries)
+
+    def run():
+        return compiled.discount_factor(times)
+    return run, numberOfQueries
+
+
+# ----------------------------------------------------------------
+# RUNNER
+
+def measure(setup, size, repeat):
+    """ Best wall time of repeat runs and peak traced memory of one more run """
+    run, items = setup(size)
+    run()   # warm-up: imports, caches, first-touch allocations
+
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peakBytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'items' : items, 'seconds' : seconds, 'itemsPerSecond' : items / seconds, 'peakBytes' : peakBytes}
+
+
+def environment():
+    import scipy
+    return {
+        'timestamp' : datetime.now().isoformat(timespec='seconds'),
+        'python' : platform.python_version(),
+        'numpy' : np.__version__,
+        'scipy' : scipy.__version__,
+        'platform' : platform.platform(),
+        'processor' : platform.processor(),
+        'cpuCount' : os.cpu_count(),
+        'seed' : SEED,
+    }
+
+
+def run_benchmarks(names=None, quick=False, repeat=3, log=print):
+    results = []
+    for name, (setup, sizes, quickSizes, unit) in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        for size in (quickSizes if quick else sizes):
+            result = {'benchmark' : name, 'size' : size, 'unit' : unit}
+            result.update(measure(setup, size, repeat))
+            results.append(result)
+            log(f"{name:32s} {size:>8d}  {result['seconds'] * 1e3:10.2f} ms  "
+                f"{result['itemsPerSecond']:14,.0f} {unit.split(' ')[0]}/s  {result['peakBytes'] / 2**20:9.2f} MiB")
+    return {'environment' : environment(), 'results' : results}
+
+
+def compare(results, baseline, threshold=1.10, log=print):
+    """
+    Time ratios of results against baseline for the (benchmark, size) pairs found in both
+
+    Returns the list of (benchmark, size, ratio) slower than threshold
+    """
+    baseTimes = {(r['benchmark'], r['size']) : r['seconds'] for r in baseline['results']}
+    regressions = []
+    for r in results['results']:
+        key = (r['benchmark'], r['size'])
+        if key not in baseTimes:
+            continue
+        ratio = r['seconds'] / baseTimes[key]
+        flag = 'SLOWER' if ratio > threshold else ('faster' if ratio < 1 / threshold else '')
+        log(f"{key[0]:32s} {key[1]:>8d}  {baseTimes[key] * 1e3:10.2f} ms -> {r['seconds'] * 1e3:10.2f} ms  x{ratio:6.2f} {flag}")
+        if ratio > threshold:
+            regressions.append((key[0], key[1], ratio))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--quick', action='store_true', help='smaller size sweeps')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='benchmarks to run')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='JSON results file (default: results-<timestamp>.json)')
+    parser.add_argument('--compare', default=None, help='earlier JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=1.10, help='time ratio counted as a regression')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only, args.quick, args.repeat)
+
+    output = args.output or f"results-{datetime.now().strftime('%Y%m%dT%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'results written to {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f'\ncompared with {args.compare}')
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
@@ -0,0 +1,101 @@
+"""
+Vectorized Black-Scholes kernels shared by the pricing modules
+"""
+
+# ----------------------------------------------------------------
+# IMPORTS
+
+import numpy as np
+from typing import NamedTuple
+from scipy.special import ndtr
+
+# ----------------------------------------------------------------
+# FUNCTIONS
+
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def norm_cdf(x):
+    """ Standard normal CDF without the per-call overhead of scipy.stats.norm """
+    return ndtr(x)
+
+
+def norm_pdf(x):
+    """ Standard normal density """
+    return np.exp(-0.5 * np.square(x)) / SQRT_2PI
+
+
+def d1_d2(spot, strike, interestRate, dividend, vol, tau):
+    """
+    d1 = (log(S/K) + (r - q + vol^2 / 2) * tau) / (vol * sqrt(tau)),  d2 = d1 - vol * sqrt(tau)
+    """
+    volSqrtTau = vol * np.sqrt(tau)
+    d1 = (np.log(spot / strike) + (interestRate - dividend + 0.5 * vol ** 2) * tau) / volSqrtTau
+    return d1, d1 - volSqrtTau
+
+
+def discount_factors(interestRate, dividend, tau):
+    """ (exp(-r * tau), exp(-q * tau)) """
+    return np.exp(-interestRate * tau), np.exp(-dividend * tau)
+
+
+class BlackScholesResult(NamedTuple):
+    """ Prices and Greeks of black_scholes; theta is per year, vega/rho per unit of vol/rate """
+    price : np.ndarray
+    d1    : np.ndarray
+    d2    : np.ndarray
+    delta : np.ndarray
+    gamma : np.ndarray
+    vega  : np.ndarray
+    theta : np.ndarray
+    rho   : np.ndarray
+    vanna : np.ndarray
+    volga : np.ndarray
+
+
+def black_scholes(spot, strike, interestRate, dividend, vol, tau, optionType=0):
+    """
+    Black-Scholes prices, d1/d2, first-order (delta, vega, theta, rho) and second-order (gamma, vanna, volga)
+    Greeks in a single pass
+
+    All inputs broadcast against each other, so a whole chain can be priced in one call.
+    optionType : 0 / OptionType.CALL for calls, 1 / OptionType.PUT for puts (scalar or array)
+    """
+    spot, strike, interestRate, dividend, vol, tau = (
+        np.asarray(x, dtype=np.float64) for x in (spot, strike, interestRate, dividend, vol, tau)
+    )
+    # +1 for calls, -1 for puts: put formulas are the call formulas with N(x) replaced by -N(-x)
+    sign = 1.0 - 2.0 * np.asarray(optionType, dtype=np.float64)
+
+    d1, d2 = d1_d2(spot, strike, interestRate, dividend, vol, tau)
+    sqrtTau = np.sqrt(tau)
+    volSqrtTau = vol * sqrtTau
+
+    rateDiscount, dividendDiscount = discount_factors(interestRate, dividend, tau)
+    forwardSpot = spot * dividendDiscount
+    discountedStrike = strike * rateDiscount
+
+    cdf1 = ndtr(sign * d1)
+    cdf2 = ndtr(sign * d2)
+    pdf1 = np.exp(-0.5 * d1 ** 2) / SQRT_2PI
+
+    price = sign * (forwardSpot * cdf1 - discountedStrike * cdf2)
+    delta = sign * dividendDiscount * cdf1
+    gamma = dividendDiscount * pdf1 / (spot * volSqrtTau)
+    vega = forwardSpot * pdf1 * sqrtTau
+    theta = (-forwardSpot * pdf1 * vol / (2 * sqrtTau)
+             - sign * interestRate * discountedStrike * cdf2
+             + sign * dividend * forwardSpot * cdf1)
+    rho = sign * discountedStrike * tau * cdf2
+    vanna = -dividendDiscount * pdf1 * d2 / vol
+    volga = vega * d1 * d2 / vol
+
+    return BlackScholesResult(price, d1, d2, delta, gamma, vega, theta, rho, vanna, volga)
+
+
+def black_scholes_price(spot, strike, interestRate, dividend, vol, tau, optionType=0):
+    """ Black-Scholes prices only (broadcast over all inputs) """
+    sign = 1.0 - 2.0 * np.asarray(optionType, dtype=np.float64)
+    d1, d2 = d1_d2(spot, strike, interestRate, dividend, vol, tau)
+    rateDiscount, dividendDiscount = discount_factors(interestRate, dividend, tau)
+    return sign * (spot * dividendDiscount * ndtr(sign * d1) - strike * rateDiscount * ndtr(sign * d2))
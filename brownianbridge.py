@@ -7,56 +7,239 @@ Brownian Bridge using conditional expectation
 
 import numpy as np
 import math
+from functools import lru_cache
+from scipy.stats import qmc
+from scipy.special import ndtri
 
 # ----------------------------------------------------------------
 # FUNCTIONS 
 
-def brownianBridge(
-    numberOfstepinhalfyear, starttime, 
-    endtime, startrandomnormal, endrandomnormal
-    ):  
-    # numberOfstepinhalfyear is expected to be power of 2
+class BridgePlan(object):
+    """
+    Construction plan of a Brownian bridge on an arbitrary increasing time grid
+
+    The interior points are filled by bisecting index intervals, coarsest level first:
+    the midpoint of (0, n), then the midpoints of (0, n // 2) and (n // 2, n), and so on.
+    On a power-of-2 grid this is the order of brownianBridge.
+
+    For each interior point the plan keeps its left/right neighbours and the weights
+    W[middle] = lowerWeight * W[lower] + upperWeight * W[upper] + stddev * Z
+    as flat arrays, with levelBounds delimiting the levels.
+    """
+
+    def __init__(self, timegrid):
+        timegrid = np.asarray(timegrid, dtype=np.float64)
+        if timegrid.ndim != 1 or len(timegrid) < 2 or np.any(np.diff(timegrid) <= 0):
+            raise ValueError('timegrid must be a strictly increasing 1-D array with at least 2 points')
+        self.timegrid = timegrid
+
+        middles, lowers, uppers, levelBounds = [], [], [], [0]
+        intervals = [(0, len(timegrid) - 1)]
+        while intervals:
+            children = []
+            for lower, upper in intervals:
+                if upper - lower < 2:
+                    continue
+                middle = (lower + upper) // 2
+                middles.append(middle); lowers.append(lower); uppers.append(upper)
+                children += [(lower, middle), (middle, upper)]
+            if len(middles) > levelBounds[-1]:
+                levelBounds.append(len(middles))
+            intervals = children
+
+        self.middle = np.array(middles, dtype=np.int64)
+        self.lower = np.array(lowers, dtype=np.int64)
+        self.upper = np.array(uppers, dtype=np.int64)
+        self.levelBounds = np.array(levelBounds, dtype=np.int64)
+
+        tl, tm, tu = timegrid[self.lower], timegrid[self.middle], timegrid[self.upper]
+        self.lowerWeight = (tu - tm) / (tu - tl)
+        self.upperWeight = (tm - tl) / (tu - tl)
+        self.stddev = np.sqrt((tm - tl) * (tu - tm) / (tu - tl))
+
+    @property
+    def numberOfNormals(self):
+        """ Number of normals needed per path for the interior points """
+        return len(self.middle)
+
+    def levels(self):
+        """ Slices of the flat arrays, one per level """
+        return [slice(a, b) for a, b in zip(self.levelBounds[:-1], self.levelBounds[1:])]
+
+    def paths(self, startrandomnormal, endrandomnormal, numberOfPaths, generator = None, randomnormals = None):
+        """
+        Many paths at once, filled level by level with array operations
+
+        startrandomnormal, endrandomnormal : scalar or (numberOfPaths,) normals of the end points;
+                                             W(t_0) = sqrt(t_0) * start, W(t_n) = sqrt(t_n) * end
+        generator : np.random.Generator used to draw the normals (a new default_rng() if None)
+        randomnormals : optional (numberOfPaths, numberOfNormals) normals in bridge order
+
+        Returns an array of shape (numberOfPaths, len(timegrid))
+        """
+        numberOfNormals = self.numberOfNormals
+        if randomnormals is None:
+            # Drawn time-major directly; equivalent to passing the transpose of these normals
+            generator = np.random.default_rng() if generator is None else generator
+            randomnormals = generator.standard_normal((numberOfNormals, numberOfPaths)).T
+        randomnormals = np.asarray(randomnormals)
+        if randomnormals.shape != (numberOfPaths, numberOfNormals):
+            raise ValueError(f'randomnormals must have shape ({numberOfPaths}, {numberOfNormals})')
+
+        # Filled time-major so that each grid point is a contiguous row of paths
+        Wiener = np.empty((len(self.timegrid), numberOfPaths))
+        Wiener[-1] = np.sqrt(self.timegrid[-1]) * endrandomnormal
+        Wiener[0] = np.sqrt(self.timegrid[0]) * startrandomnormal
+
+        randomnormals = randomnormals.T
+        for level in self.levels():
+            Wiener[self.middle[level]] = (
+                self.lowerWeight[level, None] * Wiener[self.lower[level]]
+                + self.upperWeight[level, None] * Wiener[self.upper[level]]
+                + self.stddev[level, None] * randomnormals[level]
+            )
 
-    timestep = np.linspace(starttime, endtime, numberOfstepinhalfyear + 1)
-    Z = np.random.normal(0, 1, size = numberOfstepinhalfyear + 1)
-    holder = numberOfstepinhalfyear
-    j_max = 1
+        return Wiener.T
 
-    Wiener = np.zeros(numberOfstepinhalfyear + 1)
+    def to_arrays(self):
+        """ Plan as a dict of arrays (e.g. for np.savez) """
+        return {name : getattr(self, name) for name in
+                ('timegrid', 'middle', 'lower', 'upper', 'levelBounds', 'lowerWeight', 'upperWeight', 'stddev')}
 
-    Wiener[-1] = np.sqrt(endtime) * endrandomnormal
-    Wiener[0] = np.sqrt(starttime) * startrandomnormal
+    @classmethod
+    def from_arrays(cls, arrays):
+        """ Rebuild a plan from to_arrays() output without recomputing it """
+        plan = cls.__new__(cls)
+        for name, value in arrays.items():
+            setattr(plan, name, np.asarray(value))
+        return plan
 
-    powerofendtime = int(math.log(numberOfstepinhalfyear, 2))
+    def save(self, path):
+        np.savez(path, **self.to_arrays())
 
-    for k in range(powerofendtime):
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls.from_arrays({name : arrays[name] for name in arrays.files})
 
-        middle_min = int(holder / 2)
-        middle = middle_min
-        lower = 0
-        upper = holder
 
-        for j in range(j_max):
+def endNormal(starttime, endtime, startrandomnormal, incrementnormal):
+    """
+    Normal of the end point, in the W(T) = sqrt(T) * end convention of BridgePlan.paths, consistent with
+    the start point W(t_0) = sqrt(t_0) * start: the increment W(T) - W(t_0) is drawn from incrementnormal
+    """
+    return (math.sqrt(starttime) * np.asarray(startrandomnormal)
+            + math.sqrt(endtime - starttime) * np.asarray(incrementnormal)) / math.sqrt(endtime)
 
-            a = (
-                (timestep[upper] - timestep[middle]) * Wiener[lower]
-                + (timestep[middle] - timestep[lower]) * Wiener[upper]
-            ) / (timestep[upper] - timestep[lower])
-           
-            b = np.sqrt(
-                (timestep[middle] - timestep[lower])
-                * (timestep[upper] - timestep[middle])
-                / (timestep[upper] - timestep[lower])
-            )
 
-            Wiener[middle] = a + b * Z[middle]
+@lru_cache(maxsize=128)
+def _cachedBridgePlan(timegrid):
+    return BridgePlan(timegrid)
+
 
-            middle = middle + holder
-            lower = lower + holder
-            upper = upper + holder
+def bridgePlan(timegrid):
+    """ BridgePlan of a time grid, shared through an LRU cache keyed by the grid values """
+    return _cachedBridgePlan(tuple(np.asarray(timegrid, dtype=np.float64).tolist()))
 
-        j_max = 2 * j_max
-        holder = middle_min
+
+def brownianBridge(
+    numberOfstepinhalfyear, starttime, 
+    endtime, startrandomnormal, endrandomnormal
+    ):  
+    # Any number of steps; the construction plan of the grid is cached
+
+    timestep = np.linspace(starttime, endtime, numberOfstepinhalfyear + 1)
+    Z = np.random.normal(0, 1, size = numberOfstepinhalfyear + 1)
+    plan = bridgePlan(timestep)
+
+    return plan.paths(startrandomnormal, endrandomnormal, 1, randomnormals=Z[plan.middle][None, :])[0]
+
+
+def brownianBridgePaths(
+    numberOfstepinhalfyear, starttime,
+    endtime, startrandomnormal, endrandomnormal,
+    numberOfPaths, generator = None, randomnormals = None
+    ):
+    """
+    Many Brownian bridge paths at once on the grid of brownianBridge (see BridgePlan.paths)
+
+    randomnormals : optional (numberOfPaths, numberOfstepinhalfyear - 1) normals in bridge order,
+                    i.e. the midpoint of the coarsest level first, then each finer level from left to right
+
+    Returns an array of shape (numberOfPaths, numberOfstepinhalfyear + 1)
+    """
+    plan = bridgePlan(np.linspace(starttime, endtime, numberOfstepinhalfyear + 1))
+    return plan.paths(startrandomnormal, endrandomnormal, numberOfPaths, generator, randomnormals)
+
+
+def brownianBridgeOnGrid(
+    timegrid, startrandomnormal, endrandomnormal,
+    numberOfPaths, generator = None, randomnormals = None
+    ):
+    """
+    Many Brownian bridge paths on an arbitrary increasing time grid (e.g. irregular fixing dates)
+
+    Returns an array of shape (numberOfPaths, len(timegrid))
+    """
+    return bridgePlan(timegrid).paths(startrandomnormal, endrandomnormal, numberOfPaths, generator, randomnormals)
+
+
+def sobolBrownianBridgePaths(
+    numberOfstepinhalfyear, starttime,
+    endtime, numberOfPaths, numberOfReplications = 1, seed = None
+    ):
+    """
+    Brownian bridge paths driven by scrambled Sobol points (randomized quasi-Monte Carlo)
+
+    The Sobol dimensions are assigned in bridge order so that the first, best distributed dimensions
+    drive the largest moves: dimension 0 is the end point (its increment from the start point if starttime > 0),
+    dimension 1 the start point (only if starttime > 0), then the midpoints of the coarsest level down to the finest.
+
+    numberOfPaths should be a power of 2 to keep the balance properties of the Sobol sequence.
+    Each replication uses an independent scrambling, so the replications give an error estimate (see rqmcEstimate).
+
+    Returns an array of shape (numberOfReplications, numberOfPaths, numberOfstepinhalfyear + 1)
+    """
+    hasStart = starttime > 0
+    dimension = numberOfstepinhalfyear + hasStart
+    powerOfPaths = math.log2(numberOfPaths)
+
+    Wiener = np.empty((numberOfReplications, numberOfPaths, numberOfstepinhalfyear + 1))
+    for r, childSeed in enumerate(np.random.SeedSequence(seed).spawn(numberOfReplications)):
+        sobol = qmc.Sobol(dimension, scramble=True, seed=np.random.default_rng(childSeed))
+        if powerOfPaths.is_integer():
+            points = sobol.random_base2(int(powerOfPaths))
+        else:
+            points = sobol.random(numberOfPaths)
+
+        # Keep the points inside (0, 1) so that every normal is finite
+        eps = np.finfo(np.float64).eps
+        normals = ndtri(np.clip(points, eps, 1 - eps))
+
+        # W(t_0) and W(T) - W(t_0) are independent, so W(T) = sqrt(t_0) * start + sqrt(T - t_0) * increment
+        startNormals = normals[:, 1] if hasStart else 0.0
+        endNormals = endNormal(starttime, endtime, startNormals, normals[:, 0])
+        Wiener[r] = brownianBridgePaths(
+            numberOfstepinhalfyear, starttime, endtime, startNormals, endNormals,
+            numberOfPaths, randomnormals=normals[:, 1 + hasStart:]
+        )
 
     return Wiener
 
+
+def rqmcEstimate(values):
+    """
+    Estimate and standard error from randomized QMC replications
+
+    values : (numberOfReplications, numberOfPaths) payoffs, one row per independent scrambling
+
+    Returns (estimate, standard error); the error is taken across the replication means
+    """
+    values = np.asarray(values)
+    replicationMeans = values.mean(axis=1)
+    numberOfReplications = len(replicationMeans)
+
+    estimate = replicationMeans.mean()
+    if numberOfReplications < 2:
+        return estimate, np.nan
+    return estimate, replicationMeans.std(ddof=1) / np.sqrt(numberOfReplications)
@@ -0,0 +1,316 @@
+"""
+Versioned on-disk store of calibrated curves and model parameters, loaded memory-mapped
+"""
+
+# ----------------------------------------------------------------
+# IMPORTS
+
+import numpy as np
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+# ----------------------------------------------------------------
+# FUNCTIONS
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+LATEST = 'LATEST'
+LOCK = '.lock'
+
+
+def curveColumns(curves):
+    """
+    Columns of the 'curves' table from zero curves
+
+    curves : dict of name -> ZeroCurve, or name -> (present_date, {date : zero rate (%)})
+
+    All curves share flat days / rates columns; row i of the key columns (name, presentDate, offset, length)
+    points to its slice of them.
+    """
+    names, presentDates, lengths, days, rates = [], [], [], [], []
+    for name, curve in curves.items():
+        presentDate, points = (curve.present_date, curve.curve()) if hasattr(curve, 'curve') else curve
+        items = sorted(points.items())
+        names.append(str(name))
+        presentDates.append(np.datetime64(presentDate, 'D'))
+        lengths.append(len(items))
+        days += [(term - presentDate).days for term, _ in items]
+        rates += [rate for _, rate in items]
+
+    lengths = np.array(lengths, dtype=np.int64)
+    return {
+        'name' : np.array(names, dtype=str),
+        'presentDate' : np.array(presentDates, dtype='datetime64[D]'),
+        'offset' : np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64),
+        'length' : lengths,
+        'days' : np.array(days, dtype=np.int64),
+        'rates' : np.array(rates, dtype=np.float64),
+    }
+
+
+def sabrColumns(parameters):
+    """ Columns of the 'sabr' table from SABRSurfaceParameters (or its structured array) """
+    table = getattr(parameters, 'table', parameters)
+    return {name : np.ascontiguousarray(table[name]) for name in table.dtype.names}
+
+
+def sviColumns(surfaces):
+    """
+    Columns of the 'svi' table from SVI surfaces, one row per (underlying, expiry)
+
+    surfaces : dict of underlying -> SVISurface (or its to_arrays() dict)
+    """
+    underlyings, taus, forwards, params = [], [], [], []
+    for underlying, surface in surfaces.items():
+        arrays = surface.to_arrays() if hasattr(surface, 'to_arrays') else surface
+        underlyings += [str(underlying)] * len(arrays['taus'])
+        taus.append(arrays['taus'])
+        forwards.append(arrays['forwards'])
+        params.append(np.asarray(arrays['params']).reshape(-1, 5))
+
+    params = np.concatenate(params) if params else np.empty((0, 5))
+    columns = {
+        'underlying' : np.array(underlyings, dtype=str),
+        'tau' : np.concatenate(taus) if taus else np.empty(0),
+        'forward' : np.concatenate(forwards) if forwards else np.empty(0),
+    }
+    for j, name in enumerate(('alpha', 'beta', 'rho', 'mu', 'sigma')):
+        columns[name] = np.ascontiguousarray(params[:, j])
+    return columns
+
+
+def _versionName(asOf):
+    if isinstance(asOf, str):
+        asOf = datetime.fromisoformat(asOf)
+    elif isinstance(asOf, date) and not isinstance(asOf, datetime):
+        asOf = datetime(asOf.year, asOf.month, asOf.day)
+    return asOf, asOf.strftime('%Y%m%dT%H%M%S')
+
+
+class Calibration(object):
+    """
+    One published calibration, opened read-only: every column is an np.memmap of its .npy file,
+    so opening costs a few file mappings and the pages are shared by all processes that read them
+
+    tables : dict of table name -> dict of column name -> array
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest['version']
+        self.asOf = datetime.fromisoformat(self.manifest['asOf'])
+        self.metadata = self.manifest.get('metadata', {})
+
+        self.tables = {
+            table : {
+                column : np.load(os.path.join(path, table, column + '.npy'), mmap_mode='r', allow_pickle=False)
+                for column in columns
+            }
+            for table, columns in self.manifest['tables'].items()
+        }
+        self._indexes = dict()
+
+    def __repr__(self):
+        return f'Calibration(version={self.version!r}, tables={sorted(self.tables)})'
+
+    def table(self, name):
+        return self.tables[name]
+
+    def _index(self, table, *keys):
+        # Row numbers keyed by the given columns, built on first use
+        if (table, keys) not in self._indexes:
+            columns = [self.tables[table][key].tolist() for key in keys]
+            self._indexes[table, keys] = {key : row for row, key in enumerate(zip(*columns))}
+        return self._indexes[table, keys]
+
+    def curve(self, name):
+        """ (present date, days from it, zero rates (%)) of one curve; days and rates are views of the memmaps """
+        curves = self.tables['curves']
+        row = self._index('curves', 'name')[(name,)]
+        start, length = curves['offset'][row], curves['length'][row]
+        return (curves['presentDate'][row].astype(object),
+                curves['days'][start:start + length], curves['rates'][start:start + length])
+
+    def sabr_params(self, underlying, expiry):
+        """ (alpha, rho, vVol) of one smile """
+        sabr = self.tables['sabr']
+        row = self._index('sabr', 'underlying', 'expiry')[(underlying, np.datetime64(expiry, 'D').astype(object))]
+        return np.array([sabr['alpha'][row], sabr['rho'][row], sabr['vVol'][row]])
+
+    def svi_arrays(self, underlying):
+        """ taus, forwards and params of one underlying, as taken by SVISurface.from_arrays """
+        svi = self.tables['svi']
+        rows = np.flatnonzero(svi['underlying'] == underlying)
+        return {
+            'taus' : svi['tau'][rows],
+            'forwards' : svi['forward'][rows],
+            'params' : np.column_stack([svi[name][rows] for name in ('alpha', 'beta', 'rho', 'mu', 'sigma')]),
+        }
+
+
+class CalibrationStore(object):
+    """
+    Directory of calibrations, one subdirectory per version:
+
+        root/
+            LATEST                      name of the latest version
+            20210315T160000/
+                manifest.json           version, as-of timestamp, tables and their columns, metadata
+                curves/name.npy, curves/days.npy, ...
+                sabr/underlying.npy, sabr/expiry.npy, sabr/alpha.npy, ...
+                svi/...
+
+    A version is named after its as-of timestamp (with a -1, -2... suffix if published again). It is written
+    in a temporary directory and renamed into place, then LATEST is replaced, so readers never see a partial
+    calibration. Publishers update LATEST under a lock on root/.lock, so it only ever moves to a newer version.
+    Published versions are never modified.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._listeners = []
+
+    def subscribe(self, callback):
+        """ Call callback(version) after every publish from this process (e.g. to invalidate caches) """
+        self._listeners.append(callback)
+
+    def publish(self, asOf, tables, metadata=None):
+        """
+        Write a new version
+
+        asOf : datetime, date or ISO string
+        tables : dict of table name -> dict of column name -> array (see curveColumns, sabrColumns, sviColumns)
+        metadata : optional JSON-serializable dict
+
+        Returns the version name
+        """
+        asOf, baseName = _versionName(asOf)
+        temporary = os.path.join(self.root, f'.{baseName}.{os.getpid()}.tmp')
+        shutil.rmtree(temporary, ignore_errors=True)
+
+        manifest = {
+            'formatVersion' : FORMAT_VERSION,
+            'asOf' : asOf.isoformat(),
+            'created' : datetime.now().isoformat(timespec='seconds'),
+            'metadata' : metadata or {},
+            'tables' : dict(),
+        }
+        try:
+            for table, columns in tables.items():
+                os.makedirs(os.path.join(temporary, table))
+                manifest['tables'][table] = dict()
+                for column, values in columns.items():
+                    values = np.ascontiguousarray(values)
+                    if values.dtype == object:
+                        raise TypeError(f'column {table}.{column} has dtype object, which cannot be memory-mapped')
+                    np.save(os.path.join(temporary, table, column + '.npy'), values, allow_pickle=False)
+                    manifest['tables'][table][column] = {'dtype' : values.dtype.str, 'shape' : list(values.shape)}
+
+            version, suffix = baseName, 0
+            while True:
+                manifest['version'] = version
+                with open(os.path.join(temporary, MANIFEST), 'w') as f:
+                    json.dump(manifest, f, indent=2)
+                try:
+                    # rename fails if the target exists, so concurrent publishers get distinct names
+                    os.rename(temporary, os.path.join(self.root, version))
+                    break
+                except OSError:
+                    if not os.path.isdir(os.path.join(self.root, version)):
+                        raise
+                    suffix += 1
+                    version = f'{baseName}-{suffix}'
+        except BaseException:
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+
+        self._setLatest(version)
+        for callback in self._listeners:
+            callback(version)
+        return version
+
+    @contextmanager
+    def _lock(self, timeout=10.0):
+        # Exclusive lock on a persistent lock file, so that only one publisher at a time reads and replaces LATEST.
+        # The operating system releases it when its holder exits, so a publisher that dies cannot block the others.
+        path = os.path.join(self.root, LOCK)
+        descriptor = os.open(path, os.O_CREAT | os.O_RDWR)
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    else:
+                        msvcrt.locking(descriptor, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f'{path} is held by another publisher')
+                    time.sleep(0.01)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(descriptor, fcntl.LOCK_UN)
+                else:
+                    msvcrt.locking(descriptor, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(descriptor)
+
+    def _setLatest(self, version):
+        # Only move LATEST forward, so a late publish of an older as-of does not hide a newer one
+        with self._lock():
+            latest = self.latest()
+            if latest is not None and self._sortKey(latest) > self._sortKey(version):
+                return
+            temporary = os.path.join(self.root, f'.{LATEST}.{os.getpid()}.tmp')
+            with open(temporary, 'w') as f:
+                f.write(version)
+            os.replace(temporary, os.path.join(self.root, LATEST))
+
+    @staticmethod
+    def _sortKey(version):
+        name, _, suffix = version.partition('-')
+        return name, int(suffix or 0)
+
+    def versions(self):
+        """ Published versions, oldest first """
+        names = [name for name in os.listdir(self.root)
+                 if not name.startswith('.') and os.path.isfile(os.path.join(self.root, name, MANIFEST))]
+        return sorted(names, key=self._sortKey)
+
+    def latest(self):
+        """ Name of the latest version, or None if nothing was published """
+        try:
+            with open(os.path.join(self.root, LATEST)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            versions = self.versions()
+            return versions[-1] if versions else None
+
+    def open(self, version=None):
+        """ Calibration of a version (the latest by default), memory-mapped """
+        version = version or self.latest()
+        if version is None:
+            raise FileNotFoundError(f'no calibration published in {self.root}')
+        return Calibration(os.path.join(self.root, version))
+
+    def remove(self, version):
+        """ Delete an old version (not the latest); processes that have it open keep their mappings """
+        if version == self.latest():
+            raise ValueError('cannot remove the latest version')
+        shutil.rmtree(os.path.join(self.root, version))
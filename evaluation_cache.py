@@ -0,0 +1,174 @@
+"""
+LRU cache of model evaluations (vols, prices) keyed by quantized inputs and calibration version
+"""
+
+# ----------------------------------------------------------------
+# IMPORTS
+
+import numpy as np
+from collections import OrderedDict
+
+# ----------------------------------------------------------------
+# FUNCTIONS
+
+class EvaluationCache(object):
+    """
+    Bounded LRU cache in front of vectorized model evaluators
+
+    An entry is keyed by (model, calibration version, parameters, strike, tau), with every number
+    rounded to `decimals` decimal places, so that inputs equal up to floating-point noise share an entry.
+    When more than maxEntries values are cached, the least recently used ones are evicted.
+
+    Usage, e.g. with the evaluators of Volmodel/SABR.py, Volmodel/SVI.py and OptionPricing/SkewKurtAdjust.py:
+
+        cache = EvaluationCache(maxEntries=10**6)
+        cache.attach(store)         # CalibrationStore: cleared whenever a new calibration is published
+
+        vols = cache.evaluate('sabr', (beta, spot, alpha, rho, vVol), strikes, tau,
+                              lambda K, T: sabr_vol_out_atm(alpha, rho, vVol, beta, T, strike_terms(spot, K, beta)))
+        w = cache.evaluate('svi', (forward, *params), strikes, tau,
+                           lambda K, T: svi_total_variance(np.log(K / forward), *params))
+
+    function receives the missing points as 1-D arrays of strikes and taus and must evaluate them elementwise.
+    Inputs must be finite and below 2**63 / 10**decimals in magnitude (about 9.2e8 with the default decimals).
+    """
+
+    def __init__(self, maxEntries=2**20, decimals=10, version=None):
+        self.maxEntries = maxEntries
+        self.decimals = decimals
+        self.version = version
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """ Counters since creation (or reset_stats) """
+        lookups = self.hits + self.misses
+        return {
+            'entries' : len(self._entries), 'hits' : self.hits, 'misses' : self.misses,
+            'hitRate' : self.hits / lookups if lookups else np.nan,
+            'evictions' : self.evictions, 'invalidations' : self.invalidations,
+        }
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def _quantize(self, values):
+        scaled = np.round(np.asarray(values, dtype=np.float64) * 10.0 ** self.decimals)
+        # Beyond int64 (and for NaN or inf) the cast would silently map distinct inputs to the same key
+        if not np.all(np.abs(scaled) < 2.0 ** 63):
+            raise ValueError(f'cannot cache non-finite inputs or inputs of magnitude above '
+                             f'{2.0 ** 63 / 10.0 ** self.decimals:.3g} with decimals={self.decimals}')
+        return scaled.astype(np.int64)
+
+    def _unique_points(self, strikes, taus):
+        """
+        Quantized distinct (strike, tau) points of a query, as (keys, inverse, shape): the point i of the flattened
+        query is keys[inverse[i]]. Queries repeat the same strikes and expiries, so the dict is visited once per
+        distinct point only.
+        """
+        strikes, taus = np.broadcast_arrays(self._quantize(strikes), self._quantize(taus))
+        shape, strikes, taus = strikes.shape, strikes.ravel(), taus.ravel()
+        if strikes.size == 0:
+            return np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=np.int64), shape
+
+        # np.unique(..., axis=0) on the pairs, done with a lexsort (several times faster)
+        order = np.lexsort((taus, strikes))
+        sortedStrikes, sortedTaus = strikes[order], taus[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (sortedStrikes[1:] != sortedStrikes[:-1]) | (sortedTaus[1:] != sortedTaus[:-1])
+        inverse = np.empty(len(order), dtype=np.int64)
+        inverse[order] = np.cumsum(first) - 1
+        return np.stack([sortedStrikes[first], sortedTaus[first]], axis=1), inverse, shape
+
+    def _keys(self, model, params, points):
+        prefix = (model, self.version, tuple(self._quantize(np.ravel(params)).tolist()))
+        return [(prefix, strike, tau) for strike, tau in points.tolist()]
+
+    def lookup(self, model, params, strikes, taus):
+        """
+        Cached values of many (strike, tau) points with the same model parameters
+
+        Returns (values, found): arrays of the broadcast shape of strikes and taus; values is NaN where not found,
+        but cached values may be NaN too (e.g. outside the domain of a model), so use found
+        """
+        points, inverse, shape = self._unique_points(strikes, taus)
+        uniqueValues = np.full(len(points), np.nan)
+        uniqueFound = np.zeros(len(points), dtype=bool)
+
+        entries = self._entries
+        for i, key in enumerate(self._keys(model, params, points)):
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+                uniqueValues[i] = value
+                uniqueFound[i] = True
+
+        values = uniqueValues[inverse].reshape(shape)
+        found = uniqueFound[inverse].reshape(shape)
+        hits = int(found.sum())
+        self.hits += hits
+        self.misses += found.size - hits
+        return values, found
+
+    def fill(self, model, params, strikes, taus, values):
+        """ Store the values of many (strike, tau) points with the same model parameters """
+        points, inverse, shape = self._unique_points(strikes, taus)
+        uniqueValues = np.empty(len(points))
+        uniqueValues[inverse] = np.broadcast_to(np.asarray(values, dtype=np.float64), shape).ravel()
+
+        entries = self._entries
+        for key, value in zip(self._keys(model, params, points), uniqueValues.tolist()):
+            entries[key] = value
+            entries.move_to_end(key)
+
+        overflow = len(entries) - self.maxEntries
+        for _ in range(max(overflow, 0)):
+            entries.popitem(last=False)
+        self.evictions += max(overflow, 0)
+
+    def evaluate(self, model, params, strikes, taus, function):
+        """
+        Values of many (strike, tau) points: cached ones are looked up, the others computed by a single call
+        function(strikes, taus) on 1-D arrays of the distinct missing points, then cached
+
+        params : numbers that, with model, identify the evaluator (parameters, spot, beta, ...)
+        """
+        strikes, taus = np.broadcast_arrays(np.asarray(strikes, dtype=np.float64), np.asarray(taus, dtype=np.float64))
+        values, found = self.lookup(model, params, strikes, taus)
+        if not found.all():
+            missing = ~found
+            points, inverse, _ = self._unique_points(strikes[missing], taus[missing])
+            # Evaluate each distinct point once, at its quantized value, so that the result is what is cached
+            scale = 10.0 ** -self.decimals
+            computed = np.asarray(function(points[:, 0] * scale, points[:, 1] * scale), dtype=np.float64)
+            values[missing] = computed[inverse]
+            self.fill(model, params, points[:, 0] * scale, points[:, 1] * scale, computed)
+        return values
+
+    def clear(self):
+        self._entries.clear()
+
+    def set_version(self, version):
+        """ Switch to another calibration version; entries of the previous one are dropped """
+        if version != self.version:
+            self.version = version
+            self.clear()
+            self.invalidations += 1
+
+    def attach(self, store):
+        """
+        Follow the calibrations of a CalibrationStore: start at its latest version and switch on every publish
+        from this process. Processes that only read the store can call refresh(store) instead.
+        """
+        self.set_version(store.latest())
+        store.subscribe(self.set_version)
+
+    def refresh(self, store):
+        """ Switch to the latest version of store if it changed """
+        self.set_version(store.latest())
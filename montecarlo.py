@@ -0,0 +1,131 @@
+"""
+Memory-bounded Monte Carlo on Brownian bridge paths
+"""
+
+# ----------------------------------------------------------------
+# IMPORTS
+
+import numpy as np
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from brownianbridge import brownianBridgePaths, endNormal
+
+# ----------------------------------------------------------------
+# FUNCTIONS
+
+class RunningStatistics(object):
+    """
+    Count, mean and variance of a stream of values, merged chunk by chunk
+    (pairwise update of Chan, Golub and LeVeque) without keeping the values
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.asarray(values, dtype=np.float64)
+        mean = values.mean()
+        return cls(values.size, mean, ((values - mean) ** 2).sum())
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def standardError(self):
+        return math.sqrt(self.variance / self.count) if self.count > 1 else np.nan
+
+    def __repr__(self):
+        return f'RunningStatistics(count={self.count}, mean={self.mean}, standardError={self.standardError})'
+
+
+def simulateChunk(payoff, numberOfstepinhalfyear, starttime, endtime, numberOfPaths, seedSequence):
+    """
+    Generate one chunk of paths, apply the payoff and reduce it to running statistics
+
+    payoff : picklable function mapping (numberOfPaths, numberOfstepinhalfyear + 1) paths to (numberOfPaths,) values
+    """
+    generator = np.random.default_rng(seedSequence)
+    endrandomnormal = generator.standard_normal(numberOfPaths)
+    startrandomnormal = 0.0
+    if starttime > 0:
+        # endrandomnormal drives the increment W(T) - W(t_0), independent of the start point
+        startrandomnormal = generator.standard_normal(numberOfPaths)
+        endrandomnormal = endNormal(starttime, endtime, startrandomnormal, endrandomnormal)
+
+    Wiener = brownianBridgePaths(
+        numberOfstepinhalfyear, starttime, endtime, startrandomnormal, endrandomnormal,
+        numberOfPaths, generator=generator
+    )
+    return RunningStatistics.from_values(payoff(Wiener))
+
+
+def monteCarlo(
+    payoff, numberOfstepinhalfyear, starttime, endtime, numberOfPaths,
+    chunkSize = 2 ** 16, seed = None, targetStandardError = None, maxWorkers = None
+    ):
+    """
+    Price a path-dependent payoff with up to numberOfPaths Brownian bridge paths, in chunks of chunkSize paths
+
+    Every chunk has its own SeedSequence spawned from seed, and chunk statistics are merged in chunk order,
+    so the result depends only on seed and chunkSize, not on the number of workers.
+    If targetStandardError is given, the simulation stops after the first chunk at which the standard error
+    reaches it.
+
+    maxWorkers : number of processes (1 runs in this process, None uses os.cpu_count())
+
+    Returns RunningStatistics (mean, variance, standardError, count of paths used)
+    """
+    numberOfChunks = math.ceil(numberOfPaths / chunkSize)
+    chunkSeeds = np.random.SeedSequence(seed).spawn(numberOfChunks)
+    chunkPaths = [min(chunkSize, numberOfPaths - i * chunkSize) for i in range(numberOfChunks)]
+
+    statistics = RunningStatistics()
+
+    def reached(statistics):
+        return targetStandardError is not None and statistics.standardError <= targetStandardError
+
+    if maxWorkers == 1:
+        for paths, chunkSeed in zip(chunkPaths, chunkSeeds):
+            statistics.merge(simulateChunk(payoff, numberOfstepinhalfyear, starttime, endtime, paths, chunkSeed))
+            if reached(statistics):
+                break
+        return statistics
+
+    with ProcessPoolExecutor(max_workers=maxWorkers) as executor:
+        # Submit chunks in waves so that at most one wave of results is pending at a time
+        wave = maxWorkers or os.cpu_count()
+        for start in range(0, numberOfChunks, wave):
+            futures = [
+                executor.submit(
+                    simulateChunk, payoff, numberOfstepinhalfyear, starttime, endtime, paths, chunkSeed
+                )
+                for paths, chunkSeed in zip(chunkPaths[start:start+wave], chunkSeeds[start:start+wave])
+            ]
+            for future in futures:
+                statistics.merge(future.result())
+                if reached(statistics):
+                    for pending in futures:
+                        pending.cancel()
+                    return statistics
+
+    return statistics
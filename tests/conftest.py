@@ -0,0 +1,22 @@
+import json
+import os
+import sys
+from collections import OrderedDict
+
+import pytest
+
+# The modules import their siblings by name, as when run from their own directories
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, 'Volmodel'), os.path.join(ROOT, 'ZeroCurve'), ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+SNAPSHOT = os.path.join(ROOT, 'ZeroCurve', 'snapshots', '2021-03-15.json')
+
+
+@pytest.fixture
+def snapshot_quotes():
+    """ (present_date, LIBOR, ED, IRS) of the 2021-03-15 snapshot """
+    with open(SNAPSHOT) as f:
+        snapshot = json.load(f, object_pairs_hook=OrderedDict)
+    return snapshot['present_date'], snapshot['LIBOR'], snapshot['ED'], snapshot['IRS']
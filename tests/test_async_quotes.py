@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+from datetime import date
+
+import aiohttp
+import pytest
+
+import async_quotes
+from async_quotes import AsyncQuoteFetcher, AsyncQuoteProvider, fetch_quotes
+from fixture_server import FIXTURE_DIR, FIXTURE_PAGES, FixtureServer
+from request_quotes import parse_Eurodollar_Futures, parse_USD_LIBOR, parse_USD_Swap_Rates
+
+FAST = dict(backoff=0.01, timeouts={'LIBOR' : 1, 'ED' : 1, 'IRS' : 1})
+
+
+def fixture_quotes():
+    pages = dict()
+    for source, page in FIXTURE_PAGES.items():
+        with open(os.path.join(FIXTURE_DIR, page), 'rb') as f:
+            pages[source] = f.read()
+    return {
+        'LIBOR' : parse_USD_LIBOR(pages['LIBOR']),
+        'ED'    : parse_Eurodollar_Futures(pages['ED']),
+        'IRS'   : parse_USD_Swap_Rates(pages['IRS']),
+    }
+
+
+def fetch_all(server, **kwargs):
+    """ fetch_all() of a fetcher pointed at server; returns (quotes, fetcher) """
+    async def run():
+        async with AsyncQuoteFetcher(urls=server.urls, **dict(FAST, **kwargs)) as fetcher:
+            return await fetcher.fetch_all(), fetcher
+    return asyncio.run(run())
+
+
+def test_fetch_all_parses_every_fixture():
+    with FixtureServer() as server:
+        quotes, fetcher = fetch_all(server)
+    assert quotes == fixture_quotes()
+    assert fetcher.stale == set()
+    assert fetcher.fetch_dates == {source : date.today() for source in quotes}
+
+
+def test_failed_request_is_retried():
+    with FixtureServer(failures={'usd_libor.html' : 2}) as server:
+        quotes, fetcher = fetch_all(server, retries=2)
+    assert quotes['LIBOR'] == fixture_quotes()['LIBOR']
+    assert fetcher.stale == set()
+
+
+def test_timeout_without_fallback_raises():
+    with FixtureServer(delays={'usd_libor.html' : 1.0}) as server:
+        with pytest.raises(asyncio.TimeoutError):
+            fetch_all(server, retries=1, timeouts={'LIBOR' : 0.1})
+
+
+def test_failed_source_falls_back_to_last_good_snapshot(tmp_path):
+    path = str(tmp_path / 'last_good.json')
+    with FixtureServer() as server:
+        expected, _ = fetch_all(server, last_good_path=path)
+
+    # The snapshot was taken on an earlier day
+    with open(path) as f:
+        snapshot = json.load(f)
+    snapshot['present_date'] = '2021-03-15'
+    with open(path, 'w') as f:
+        json.dump(snapshot, f)
+
+    with FixtureServer(delays={'usd_libor.html' : 1.0}) as server:
+        quotes, fetcher = fetch_all(server, retries=1, timeouts={'LIBOR' : 0.1}, last_good_path=path)
+
+    assert quotes == expected
+    assert fetcher.stale == {'LIBOR'}
+    assert fetcher.fetch_dates['LIBOR'] == date(2021, 3, 15)
+    assert fetcher.fetch_dates['ED'] == date.today()
+    # The snapshot rewritten with the stale LIBOR quotes keeps their date
+    with open(path) as f:
+        assert json.load(f)['present_date'] == '2021-03-15'
+
+
+def test_all_sources_failed(tmp_path):
+    failures = {page : 100 for page in FIXTURE_PAGES.values()}
+    with FixtureServer(failures=failures) as server:
+        with pytest.raises(aiohttp.ClientResponseError):
+            fetch_all(server, retries=1)
+
+    path = str(tmp_path / 'last_good.json')
+    with FixtureServer() as server:
+        expected, _ = fetch_all(server, last_good_path=path)
+    with FixtureServer(failures=failures) as server:
+        quotes, fetcher = fetch_all(server, retries=1, last_good_path=path)
+    assert quotes == expected
+    assert fetcher.stale == set(quotes)
+
+
+def test_parser_bug_is_not_retried(monkeypatch):
+    calls = []
+
+    def broken_parser(page):
+        calls.append(page)
+        raise TypeError('bug')
+
+    monkeypatch.setitem(async_quotes.PARSERS, 'LIBOR', broken_parser)
+    with FixtureServer() as server:
+        with pytest.raises(TypeError):
+            fetch_all(server, retries=2)
+    assert len(calls) == 1
+
+
+def test_provider_fetches_once(monkeypatch):
+    calls = []
+
+    def counting_fetch_quotes(**kwargs):
+        calls.append(kwargs)
+        return fetch_quotes(**kwargs)
+
+    monkeypatch.setattr(async_quotes, 'fetch_quotes', counting_fetch_quotes)
+    with FixtureServer() as server:
+        provider = AsyncQuoteProvider(urls=server.urls, **FAST)
+        first = [provider.get(source) for source in ('LIBOR', 'ED', 'IRS')]
+        again = [provider.get(source) for source in ('LIBOR', 'IRS')]
+
+    assert len(calls) == 1
+    assert again == [first[0], first[2]]
@@ -0,0 +1,40 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from batch_backfill import backfill, build_rows
+
+
+def quote_table(quote_sets):
+    rows = [
+        (present_date, source, term, rate)
+        for present_date, LIBOR, ED, IRS in quote_sets
+        for source, quotes in (('LIBOR', LIBOR), ('ED', ED), ('IRS', IRS))
+        for term, rate in quotes.items()
+    ]
+    return pd.DataFrame(rows, columns=['date', 'source', 'term', 'rate'])
+
+
+def test_bad_date_is_logged_and_skipped(snapshot_quotes, caplog):
+    present_date, LIBOR, ED, IRS = snapshot_quotes
+    # On 2020-11-04 the middle curve of these quotes does not reach the first IRS coupon
+    quote_sets = [('2020-11-04', LIBOR, ED, IRS), (present_date, LIBOR, ED, IRS)]
+
+    with caplog.at_level(logging.WARNING, logger='batch_backfill'):
+        rows = build_rows(quote_sets)
+
+    assert np.isnan(rows[0]).all()
+    assert np.isfinite(rows[1]).all()
+    assert '2020-11-04' in caplog.text
+
+
+def test_backfill_writes_good_dates_around_a_bad_one(snapshot_quotes, tmp_path):
+    present_date, LIBOR, ED, IRS = snapshot_quotes
+    table = quote_table([('2020-11-04', LIBOR, ED, IRS), (present_date, LIBOR, ED, IRS)])
+
+    zero_rates = backfill(table, str(tmp_path), max_workers=1, chunksize=2)
+
+    assert np.isnan(zero_rates[0]).all()
+    np.testing.assert_allclose(zero_rates[1], build_rows([(present_date, LIBOR, ED, IRS)])[0])
+    assert list(np.load(tmp_path / 'dates.npy').astype(str)) == ['2020-11-04', present_date]
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from blackscholes import black_scholes, black_scholes_price
+
+SPOT, RATE, DIVIDEND, TAU = 100.0, 0.03, 0.01, 0.75
+STRIKES = np.array([70.0, 90.0, 100.0, 110.0, 140.0])
+VOLS = np.array([0.35, 0.25, 0.2, 0.22, 0.3])
+
+
+def price(spot=SPOT, vol=VOLS, tau=TAU, rate=RATE, optionType=0):
+    return black_scholes_price(spot, STRIKES, rate, DIVIDEND, vol, tau, optionType)
+
+
+@pytest.mark.parametrize('optionType', [0, 1])
+def test_greeks_match_finite_differences(optionType):
+    result = black_scholes(SPOT, STRIKES, RATE, DIVIDEND, VOLS, TAU, optionType)
+    h = 1e-4
+    derivative = lambda f: (f(h) - f(-h)) / (2 * h)
+
+    np.testing.assert_allclose(result.price, price(optionType=optionType), rtol=1e-14)
+    np.testing.assert_allclose(result.delta, derivative(lambda e: price(spot=SPOT + e, optionType=optionType)), rtol=1e-6)
+    np.testing.assert_allclose(result.vega, derivative(lambda e: price(vol=VOLS + e, optionType=optionType)), rtol=1e-6)
+    np.testing.assert_allclose(result.rho, derivative(lambda e: price(rate=RATE + e, optionType=optionType)), rtol=1e-6)
+    # theta is the derivative with respect to calendar time, i.e. minus the derivative in tau
+    np.testing.assert_allclose(result.theta, -derivative(lambda e: price(tau=TAU + e, optionType=optionType)), rtol=1e-6)
+
+    h = 1e-3
+    gamma = (price(spot=SPOT + h, optionType=optionType) - 2 * price(optionType=optionType)
+             + price(spot=SPOT - h, optionType=optionType)) / h ** 2
+    np.testing.assert_allclose(result.gamma, gamma, rtol=1e-5)
+
+    h = 1e-4
+    vega = lambda e: black_scholes(SPOT + e, STRIKES, RATE, DIVIDEND, VOLS, TAU, optionType).vega
+    np.testing.assert_allclose(result.vanna, (vega(h) - vega(-h)) / (2 * h), rtol=1e-6, atol=1e-6)
+    vega = lambda e: black_scholes(SPOT, STRIKES, RATE, DIVIDEND, VOLS + e, TAU, optionType).vega
+    np.testing.assert_allclose(result.volga, (vega(h) - vega(-h)) / (2 * h), rtol=1e-6, atol=1e-6)
+
+
+def test_put_call_parity():
+    call, put = price(optionType=0), price(optionType=1)
+    np.testing.assert_allclose(
+        call - put, SPOT * np.exp(-DIVIDEND * TAU) - STRIKES * np.exp(-RATE * TAU), rtol=1e-12
+    )
+
+
+def test_inputs_broadcast_against_each_other():
+    optionTypes = np.array([[0], [1]])
+    chain = black_scholes_price(SPOT, STRIKES, RATE, DIVIDEND, VOLS, TAU, optionTypes)
+
+    assert chain.shape == (2, len(STRIKES))
+    for i, (strike, vol) in enumerate(zip(STRIKES, VOLS)):
+        for optionType in (0, 1):
+            assert chain[optionType, i] == pytest.approx(
+                float(black_scholes_price(SPOT, strike, RATE, DIVIDEND, vol, TAU, optionType)), rel=1e-14
+            )
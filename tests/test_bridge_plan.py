@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from brownianbridge import BridgePlan, bridgePlan, brownianBridgeOnGrid
+
+
+def test_power_of_two_grid_is_filled_in_brownian_bridge_order():
+    plan = BridgePlan(np.linspace(0, 1, 9))
+
+    assert plan.middle.tolist() == [4, 2, 6, 1, 3, 5, 7]
+    assert [plan.middle[level].tolist() for level in plan.levels()] == [[4], [2, 6], [1, 3, 5, 7]]
+    assert plan.numberOfNormals == 7
+
+
+def test_every_interior_point_is_filled_once_after_its_neighbours():
+    plan = BridgePlan(np.sort(np.random.default_rng(0).uniform(0, 3, 13)))
+    filled = {0, 12}
+    for middle, lower, upper in zip(plan.middle, plan.lower, plan.upper):
+        assert lower in filled and upper in filled and middle not in filled
+        filled.add(middle)
+    assert filled == set(range(13))
+
+
+def test_irregular_grid_has_brownian_covariance():
+    timegrid = np.array([0.1, 0.15, 0.4, 0.45, 1.0, 1.7, 2.0])
+    rng = np.random.default_rng(2)
+    start, increment = rng.standard_normal((2, 200000))
+    # W(t_0) and W(T) - W(t_0) are independent
+    end = (np.sqrt(0.1) * start + np.sqrt(1.9) * increment) / np.sqrt(2.0)
+
+    Wiener = brownianBridgeOnGrid(timegrid, start, end, 200000, generator=rng)
+
+    np.testing.assert_allclose(np.cov(Wiener.T), np.minimum.outer(timegrid, timegrid), atol=0.02)
+
+
+def test_plan_round_trips_through_arrays_and_files(tmp_path):
+    plan = BridgePlan([0.0, 0.2, 0.5, 0.6, 1.3, 2.0])
+    path = str(tmp_path / 'plan.npz')
+    plan.save(path)
+
+    for restored in (BridgePlan.from_arrays(plan.to_arrays()), BridgePlan.load(path)):
+        for name, value in plan.to_arrays().items():
+            np.testing.assert_array_equal(getattr(restored, name), value)
+
+    normals = np.random.default_rng(4).standard_normal((3, plan.numberOfNormals))
+    np.testing.assert_array_equal(
+        BridgePlan.load(path).paths(0.0, 1.0, 3, randomnormals=normals),
+        plan.paths(0.0, 1.0, 3, randomnormals=normals),
+    )
+
+
+def test_plans_are_shared_by_grid_values():
+    assert bridgePlan(np.linspace(0, 1, 5)) is bridgePlan([0.0, 0.25, 0.5, 0.75, 1.0])
+    assert bridgePlan(np.linspace(0, 1, 5)) is not bridgePlan(np.linspace(0, 2, 5))
+
+
+@pytest.mark.parametrize('timegrid', [[1.0], [0.0, 0.5, 0.5, 1.0], [1.0, 0.5], [[0.0, 1.0]]])
+def test_invalid_grid_raises_value_error(timegrid):
+    with pytest.raises(ValueError):
+        BridgePlan(timegrid)
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from brownianbridge import brownianBridge, brownianBridgePaths, sobolBrownianBridgePaths
+
+
+def test_sobol_paths_with_start_time_have_brownian_covariance():
+    starttime, endtime = 0.5, 1.0
+    Wiener = sobolBrownianBridgePaths(8, starttime, endtime, 2 ** 14, numberOfReplications=4, seed=7)
+    Wiener = Wiener.reshape(-1, Wiener.shape[-1])
+    start, middle, end = Wiener[:, 0], Wiener[:, 4], Wiener[:, -1]
+
+    covariance = np.cov(np.stack([start, middle, end]))
+    # cov(W(s), W(t)) = min(s, t)
+    expected = np.minimum.outer([0.5, 0.75, 1.0], [0.5, 0.75, 1.0])
+    np.testing.assert_allclose(covariance, expected, atol=0.02)
+    np.testing.assert_allclose(np.var(end - start), endtime - starttime, atol=0.02)
+
+
+def test_paths_are_pinned_at_the_end_points():
+    start, end = np.array([0.3, -1.2]), np.array([1.5, 0.1])
+    Wiener = brownianBridgePaths(8, 0.25, 2.0, start, end, 2, generator=np.random.default_rng(0))
+
+    assert Wiener.shape == (2, 9)
+    np.testing.assert_allclose(Wiener[:, 0], np.sqrt(0.25) * start)
+    np.testing.assert_allclose(Wiener[:, -1], np.sqrt(2.0) * end)
+
+
+def test_paths_have_brownian_bridge_covariance():
+    # Pinned at W(0) = 0 and W(1) = 0: cov(W(s), W(t)) = min(s, t) - s * t
+    Wiener = brownianBridgePaths(4, 0.0, 1.0, 0.0, 0.0, 200000, generator=np.random.default_rng(1))
+    t = np.linspace(0, 1, 5)[1:-1]
+
+    covariance = np.cov(Wiener[:, 1:-1].T)
+    np.testing.assert_allclose(covariance, np.minimum.outer(t, t) - np.outer(t, t), atol=0.005)
+
+
+def test_paths_with_the_same_seed_are_equal():
+    first = brownianBridgePaths(16, 0.0, 1.0, 0.0, 1.0, 5, generator=np.random.default_rng(3))
+    second = brownianBridgePaths(16, 0.0, 1.0, 0.0, 1.0, 5, generator=np.random.default_rng(3))
+    np.testing.assert_array_equal(first, second)
+
+
+def test_given_normals_must_have_one_row_per_path():
+    with pytest.raises(ValueError):
+        brownianBridgePaths(8, 0.0, 1.0, 0.0, 1.0, 3, randomnormals=np.zeros((3, 8)))
+
+
+def test_single_path_matches_the_batched_paths_with_its_normals():
+    np.random.seed(5)
+    single = brownianBridge(8, 0.0, 1.0, 0.0, 0.7)
+
+    np.random.seed(5)
+    Z = np.random.normal(0, 1, size=9)
+    # brownianBridge draws one normal per grid point and uses those of the interior points in bridge order
+    batched = brownianBridgePaths(8, 0.0, 1.0, 0.0, 0.7, 1, randomnormals=Z[[4, 2, 6, 1, 3, 5, 7]][None, :])
+    np.testing.assert_allclose(single, batched[0])
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from calibration_store import LOCK, CalibrationStore, curveColumns, sabrColumns, sviColumns
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_publish_after_publisher_died_holding_the_lock(tmp_path):
+    store = CalibrationStore(str(tmp_path))
+    store.publish('2021-03-15T16:00:00', {'t' : {'x' : np.arange(3)}})
+
+    # A publisher that takes the lock and dies without releasing it
+    died = subprocess.run([sys.executable, '-c', (
+        'import os, sys; sys.path.insert(0, sys.argv[1]);'
+        'from calibration_store import CalibrationStore;'
+        'CalibrationStore(sys.argv[2])._lock().__enter__(); os._exit(1)'
+    ), ROOT, str(tmp_path)])
+    assert died.returncode == 1
+    assert os.path.exists(tmp_path / LOCK)
+
+    version = store.publish('2021-03-16T16:00:00', {'t' : {'x' : np.arange(4)}})
+    assert store.latest() == version == '20210316T160000'
+
+
+def test_publish_and_open_round_trip(tmp_path, snapshot_quotes):
+    from SABRSurface import SmileQuote, calibrate_surface
+    from SVISurface import SVISurface
+    from zero_curve import ZeroCurve
+
+    curve = ZeroCurve(*snapshot_quotes)
+    strikes = np.arange(80.0, 121.0, 10.0)
+    sabr = calibrate_surface([
+        SmileQuote('SPX', '2021-06-18', 0.25, 100.0, 100.0, strikes, np.array([0.25, 0.22, 0.2, 0.19, 0.2])),
+    ], 0.5, maxWorkers=1)
+    svi = SVISurface([0.25, 1.0], [100.0, 101.0], [[0.01, 0.05, -0.4, 0.0, 0.1], [0.04, 0.1, -0.3, 0.0, 0.1]])
+
+    store = CalibrationStore(str(tmp_path))
+    version = store.publish('2021-03-15T16:00:00', {
+        'curves' : curveColumns({'USD' : curve}),
+        'sabr' : sabrColumns(sabr),
+        'svi' : sviColumns({'SPX' : svi}),
+    }, metadata={'source' : 'snapshot'})
+
+    calibration = store.open()
+    assert calibration.version == version == '20210315T160000'
+    assert calibration.metadata == {'source' : 'snapshot'}
+
+    presentDate, days, rates = calibration.curve('USD')
+    assert presentDate == date(2021, 3, 15)
+    assert isinstance(rates, np.memmap)
+    assert days.tolist() == [(term - presentDate).days for term in curve.curve()]
+    np.testing.assert_array_equal(rates, list(curve.curve().values()))
+
+    np.testing.assert_array_equal(calibration.sabr_params('SPX', '2021-06-18'), sabr.params('SPX', '2021-06-18'))
+    restored = SVISurface.from_arrays(calibration.svi_arrays('SPX'))
+    np.testing.assert_array_equal(restored.params, svi.params)
+
+
+def test_versions_and_latest(tmp_path):
+    store = CalibrationStore(str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        store.open()
+
+    published = []
+    store.subscribe(published.append)
+    table = {'t' : {'x' : np.arange(3)}}
+    first = store.publish(date(2021, 3, 15), table)
+    again = store.publish('2021-03-15', table)
+    newest = store.publish('2021-03-16T09:30:00', table)
+    # Published late, but older than the latest: LATEST stays on the newest as-of
+    older = store.publish('2021-03-14', table)
+
+    assert (first, again) == ('20210315T000000', '20210315T000000-1')
+    assert store.versions() == [older, first, again, newest]
+    assert store.latest() == newest
+    assert published == [first, again, newest, older]
+
+    with pytest.raises(ValueError):
+        store.remove(newest)
+    store.remove(first)
+    assert store.versions() == [older, again, newest]
+
+
+def test_object_columns_are_rejected_without_leftovers(tmp_path):
+    store = CalibrationStore(str(tmp_path))
+    with pytest.raises(TypeError):
+        store.publish('2021-03-15', {'t' : {'x' : np.array([{}, None], dtype=object)}})
+
+    assert os.listdir(tmp_path) == []
+    assert store.latest() is None
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from scipy.interpolate import CubicSpline
+
+from zero_curve import ZeroCurve
+
+
+@pytest.fixture
+def curve(snapshot_quotes):
+    return ZeroCurve(*snapshot_quotes)
+
+
+def test_compiled_curve_reproduces_the_curve_points(curve):
+    points = curve.curve()
+    compiled = curve.compile()
+    dates = np.array(sorted(points), dtype='datetime64[D]')
+    rates = np.array([points[term] for term in sorted(points)])
+
+    np.testing.assert_allclose(compiled.zero_rate(dates), rates, rtol=1e-12)
+    days = (dates - np.datetime64(curve.present_date, 'D')).astype(np.float64)
+    np.testing.assert_allclose(compiled.discount_factor(days / 360), np.exp(-rates / 100 * days / 360), rtol=1e-12)
+
+
+def test_compiled_curve_matches_a_spline_of_the_curve(curve):
+    points = curve.curve()
+    days = np.array([(term - curve.present_date).days for term in sorted(points)])
+    spline = CubicSpline(days, [points[term] for term in sorted(points)])
+
+    queries = np.arange(days[0], days[-1], 17)
+    dates = [curve.present_date + timedelta(int(day)) for day in queries]
+    np.testing.assert_allclose(curve.compile().zero_rate(dates), spline(queries), rtol=1e-12)
+
+
+def test_forward_rates_are_consistent_with_discount_factors(curve):
+    compiled = curve.compile()
+    t1, t2 = np.array([0.5, 1.0, 5.0, 10.0]), np.array([1.0, 2.0, 7.0, 20.0])
+
+    forward = compiled.forward_rate(t1, t2)
+    ratio = compiled.discount_factor(t1) / compiled.discount_factor(t2)
+    np.testing.assert_allclose(forward, 100 * np.log(ratio) / (t2 - t1), rtol=1e-10)
+
+    # Instantaneous forward: limit of the forward over a short period
+    h = 1e-4
+    np.testing.assert_allclose(compiled.forward_rate(t1), compiled.forward_rate(t1, t1 + h), atol=1e-3)
+
+
+def test_rates_are_extended_flat(curve):
+    compiled = curve.compile()
+    np.testing.assert_allclose(compiled.zero_rate([0.0, 1e-3]), compiled.rates[0])
+    np.testing.assert_allclose(compiled.zero_rate(40.0), compiled.rates[-1])
+
+
+def test_compile_is_cached_until_the_quotes_change(curve):
+    compiled = curve.compile()
+    assert curve.compile() is compiled
+    curve.update_quotes(IRS={'30-Year' : curve.IRS['30-Year'] + 0.1})
+    assert curve.compile() is not compiled
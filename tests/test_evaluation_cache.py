@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from calibration_store import CalibrationStore
+from evaluation_cache import EvaluationCache
+
+PARAMS = (0.5, 100.0, 2.0, -0.3, 0.6)
+
+
+class CountingFunction:
+    """ Elementwise evaluator recording the points it was called on """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, strikes, taus):
+        self.calls.append((strikes.copy(), taus.copy()))
+        return strikes / 100 + taus
+
+
+def test_evaluate_computes_each_distinct_point_once():
+    cache, function = EvaluationCache(), CountingFunction()
+    strikes = np.array([[90.0, 100.0, 110.0], [90.0, 100.0, 110.0]])
+    taus = np.array([[0.5], [1.0]])
+
+    values = cache.evaluate('sabr', PARAMS, strikes, taus, function)
+    np.testing.assert_allclose(values, strikes / 100 + taus)
+    assert len(function.calls) == 1 and len(function.calls[0][0]) == 6
+    assert cache.stats()['misses'] == 6
+
+    # Repeated and noisy inputs are served from the cache
+    again = cache.evaluate('sabr', PARAMS, np.append(strikes[0], 100.0 + 1e-13), 0.5, function)
+    np.testing.assert_allclose(again, [1.4, 1.5, 1.6, 1.5])
+    assert len(function.calls) == 1
+    assert cache.stats()['hits'] == 4
+
+
+def test_only_missing_points_are_computed():
+    cache, function = EvaluationCache(), CountingFunction()
+    cache.evaluate('svi', PARAMS, [90.0, 100.0], 1.0, function)
+    values = cache.evaluate('svi', PARAMS, [90.0, 100.0, 120.0], 1.0, function)
+
+    np.testing.assert_allclose(values, [1.9, 2.0, 2.2])
+    np.testing.assert_array_equal(function.calls[-1][0], [120.0])
+
+
+def test_entries_are_keyed_by_model_and_parameters():
+    cache = EvaluationCache()
+    cache.fill('sabr', PARAMS, [100.0], 1.0, [0.2])
+
+    assert cache.lookup('sabr', PARAMS, [100.0], 1.0)[1].all()
+    assert not cache.lookup('svi', PARAMS, [100.0], 1.0)[1].any()
+    assert not cache.lookup('sabr', PARAMS[:-1] + (0.61,), [100.0], 1.0)[1].any()
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = EvaluationCache(maxEntries=3)
+    cache.fill('m', (), [1.0, 2.0, 3.0], 1.0, [1.0, 2.0, 3.0])
+    cache.lookup('m', (), [1.0], 1.0)            # 1.0 is now the most recently used
+    cache.fill('m', (), [4.0], 1.0, [4.0])
+
+    _, found = cache.lookup('m', (), [1.0, 2.0, 3.0, 4.0], 1.0)
+    assert found.tolist() == [True, False, True, True]
+    assert len(cache) == 3 and cache.stats()['evictions'] == 1
+
+
+def test_cached_nan_values_are_found():
+    cache = EvaluationCache()
+    cache.fill('m', (), [50.0, 100.0], 1.0, [np.nan, 0.2])
+
+    values, found = cache.lookup('m', (), [50.0, 100.0, 150.0], 1.0)
+    assert found.tolist() == [True, True, False]
+    assert np.isnan(values[0]) and values[1] == 0.2
+
+
+@pytest.mark.parametrize('strikes', [[np.nan], [np.inf], [1e9]])
+def test_inputs_that_cannot_be_keyed_raise_value_error(strikes):
+    with pytest.raises(ValueError):
+        EvaluationCache().lookup('m', (), strikes, 1.0)
+
+
+def test_new_calibration_versions_invalidate_the_cache(tmp_path):
+    store = CalibrationStore(str(tmp_path))
+    store.publish('2021-03-15', {'t' : {'x' : np.arange(3)}})
+    cache = EvaluationCache()
+    cache.attach(store)
+    assert cache.version == store.latest()
+
+    cache.fill('m', (), [100.0], 1.0, [0.2])
+    store.publish('2021-03-16', {'t' : {'x' : np.arange(3)}})
+    assert cache.version == store.latest()
+    assert len(cache) == 0
+
+    # A reader following the store without subscribing
+    reader = EvaluationCache(version='20210315T000000')
+    reader.fill('m', (), [100.0], 1.0, [0.2])
+    reader.refresh(store)
+    reader.refresh(store)
+    assert reader.version == '20210316T000000' and len(reader) == 0
+    assert reader.stats()['invalidations'] == 1
@@ -0,0 +1,66 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from blackscholes import black_scholes_price
+from ImvolBoundary import implied_vol
+
+SPOT, RATE, DIVIDEND = 100.0, 0.02, 0.01
+
+
+@pytest.mark.parametrize('optionType', [0, 1])
+def test_round_trip(optionType):
+    strikes = np.array([40.0, 70.0, 95.0, 100.0, 105.0, 130.0, 200.0])[:, None]
+    taus = np.array([0.02, 0.25, 1.0, 5.0])
+    vols = np.array([0.6, 0.3, 0.2, 0.18, 0.19, 0.25, 0.45])[:, None] * np.ones_like(taus)
+
+    prices = black_scholes_price(SPOT, strikes, RATE, DIVIDEND, vols, taus, optionType)
+    # Only prices carrying enough time value to pin the vol down in double precision
+    hasTimeValue = prices - np.maximum((1 - 2 * optionType) * (SPOT * np.exp(-DIVIDEND * taus)
+                                       - strikes * np.exp(-RATE * taus)), 0) > 1e-10 * SPOT
+
+    result = implied_vol(prices, SPOT, strikes, RATE, DIVIDEND, taus, optionType)
+    np.testing.assert_allclose(result[hasTimeValue], vols[hasTimeValue], rtol=1e-8)
+
+
+def test_calls_and_puts_of_one_chain():
+    strikes = np.linspace(60, 150, 10)
+    vol, tau = 0.27, 0.5
+    optionTypes = np.arange(10) % 2
+    prices = black_scholes_price(SPOT, strikes, RATE, DIVIDEND, vol, tau, optionTypes)
+
+    np.testing.assert_allclose(implied_vol(prices, SPOT, strikes, RATE, DIVIDEND, tau, optionTypes), vol, rtol=1e-8)
+
+
+def test_prices_outside_the_no_arbitrage_bounds_are_nan():
+    strike, tau = 90.0, 0.5
+    forward = SPOT * np.exp(-DIVIDEND * tau)
+    intrinsic = forward - strike * np.exp(-RATE * tau)
+    prices = np.array([intrinsic - 1, intrinsic, forward, forward + 1])
+
+    assert np.all(np.isnan(implied_vol(prices, SPOT, strike, RATE, DIVIDEND, tau, 0)))
+
+
+def test_expired_options_are_nan_without_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        result = implied_vol([5.0, 12.0], SPOT, [100.0, 90.0], RATE, DIVIDEND, 0.0, 0)
+
+    assert np.all(np.isnan(result))
+
+
+def test_not_converged_is_nan():
+    strikes = np.array([60.0, 100.0, 160.0])
+    prices = black_scholes_price(SPOT, strikes, RATE, DIVIDEND, 0.9, 2.0, 0)
+
+    assert np.all(np.isnan(implied_vol(prices, SPOT, strikes, RATE, DIVIDEND, 2.0, 0, maxIterations=0)))
+    assert np.all(np.isfinite(implied_vol(prices, SPOT, strikes, RATE, DIVIDEND, 2.0, 0)))
+
+
+def test_scalar_inputs_give_a_scalar_shape():
+    price = black_scholes_price(SPOT, 105.0, RATE, DIVIDEND, 0.2, 1.0, 0)
+    result = implied_vol(price, SPOT, 105.0, RATE, DIVIDEND, 1.0)
+
+    assert result.shape == ()
+    assert float(result) == pytest.approx(0.2, rel=1e-10)
@@ -0,0 +1,23 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from montecarlo import monteCarlo
+
+
+def squaredIncrement(Wiener):
+    return (Wiener[:, -1] - Wiener[:, 0]) ** 2
+
+
+def startTimesEnd(Wiener):
+    return Wiener[:, 0] * Wiener[:, -1]
+
+
+def test_increment_variance_with_start_time():
+    # E[(W(T) - W(t0))^2] = T - t0 and E[W(t0) W(T)] = t0
+    statistics = monteCarlo(squaredIncrement, 8, 0.5, 1.0, 2 ** 16, chunkSize=2 ** 14, seed=11, maxWorkers=1)
+    assert abs(statistics.mean - 0.5) < 4 * statistics.standardError
+
+    statistics = monteCarlo(startTimesEnd, 8, 0.5, 1.0, 2 ** 16, chunkSize=2 ** 14, seed=11, maxWorkers=1)
+    assert abs(statistics.mean - 0.5) < 4 * statistics.standardError
@@ -0,0 +1,69 @@
+from datetime import date
+import os
+
+import numpy as np
+import pytest
+
+import request_quotes
+from quote_parsers import parse_libor, parse_eurodollar_futures, parse_swap_rates
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'ZeroCurve', 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def test_libor(snapshot_quotes):
+    _, LIBOR, _, _ = snapshot_quotes
+    records = parse_libor(fixture('usd_libor.html'))
+
+    assert records.source == 'LIBOR'
+    assert records.as_of == date(2021, 3, 15)
+    assert records.rates.dtype == np.float64
+    assert records.terms.tolist() == ['overnight'] + list(LIBOR)
+    assert records.rates.tolist() == [0.07] + list(LIBOR.values())
+
+
+def test_eurodollar_futures_skip_contracts_without_a_last_price(snapshot_quotes):
+    _, _, ED, _ = snapshot_quotes
+    records = parse_eurodollar_futures(fixture('eurodollar_futures.json'))
+
+    assert records.source == 'ED'
+    assert records.as_of == date(2021, 3, 15)
+    assert 'OCT 2021' not in records.terms
+    assert records.to_dict() == ED
+
+
+def test_swap_rates(snapshot_quotes):
+    _, _, _, IRS = snapshot_quotes
+    records = parse_swap_rates(fixture('usd_swap_rates.html'))
+
+    assert records.source == 'IRS'
+    assert records.as_of is None
+    assert records.to_dict() == IRS
+
+
+@pytest.mark.parametrize('parse, name', [
+    (request_quotes.parse_USD_LIBOR, 'usd_libor.html'),
+    (request_quotes.parse_Eurodollar_Futures, 'eurodollar_futures.json'),
+    (request_quotes.parse_USD_Swap_Rates, 'usd_swap_rates.html'),
+])
+def test_dict_parsers_accept_bytes_and_str(parse, name):
+    page = fixture(name)
+    quotes = parse(page)
+
+    assert list(quotes) and all(isinstance(rate, float) for rate in quotes.values())
+    assert parse(page.decode('utf-8')) == quotes
+
+
+def test_pages_without_quotes_parse_to_empty_records():
+    assert len(parse_libor(b'<html><body></body></html>').terms) == 0
+    assert len(parse_swap_rates(b'<html><body></body></html>').terms) == 0
+
+
+@pytest.mark.parametrize('page', [b'<html>', b'{"quotes": [{"last": "99.8"}]}', b'{"quotes": null}'])
+def test_unexpected_eurodollar_page_raises_value_error(page):
+    with pytest.raises(ValueError):
+        parse_eurodollar_futures(page)
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from datetime import date
+
+import pytest
+
+import quote_providers
+from conftest import SNAPSHOT
+from quote_providers import CachedQuoteProvider, QuoteProvider, SnapshotQuoteProvider, save_snapshot
+from zero_curve import ZeroCurve
+
+
+class CountingProvider(QuoteProvider):
+    """ Serves fixed quotes and counts the requests of each source """
+
+    def __init__(self, quotes, present_date=None):
+        self._quotes = quotes
+        self.present_date = present_date
+        self.requests = {source : 0 for source in quotes}
+
+    def get(self, source):
+        self.requests[source] += 1
+        return OrderedDict(self._quotes[source])
+
+
+@pytest.fixture
+def counting_provider(snapshot_quotes):
+    present_date, LIBOR, ED, IRS = snapshot_quotes
+    return CountingProvider({'LIBOR' : LIBOR, 'ED' : ED, 'IRS' : IRS}, present_date)
+
+
+def test_snapshot_round_trip(tmp_path, snapshot_quotes):
+    present_date, LIBOR, ED, IRS = snapshot_quotes
+    path = str(tmp_path / 'snapshot.json')
+    save_snapshot(path, date(2021, 3, 15), LIBOR, ED, IRS)
+
+    provider = SnapshotQuoteProvider(path)
+    assert provider.present_date == present_date
+    assert provider.quotes() == {'LIBOR' : LIBOR, 'ED' : ED, 'IRS' : IRS}
+    assert list(provider.get('ED')) == list(ED)
+    with pytest.raises(KeyError):
+        provider.get('SOFR')
+
+
+def test_cached_provider_reuses_quotes_within_ttl(tmp_path, counting_provider):
+    cache = CachedQuoteProvider(counting_provider, ttl=3600, cache_dir=str(tmp_path))
+    first = cache.get('IRS')
+    assert cache.get('IRS') == first
+    assert counting_provider.requests['IRS'] == 1
+
+    # Another process: served from the disk cache
+    other = CachedQuoteProvider(counting_provider, ttl=3600, cache_dir=str(tmp_path))
+    assert other.get('IRS') == first
+    assert counting_provider.requests['IRS'] == 1
+
+
+def test_cached_provider_refetches_after_ttl(counting_provider):
+    cache = CachedQuoteProvider(counting_provider, ttl=0)
+    cache.get('LIBOR')
+    cache.get('LIBOR')
+    assert counting_provider.requests['LIBOR'] == 2
+
+
+def test_zero_curve_fetches_lazily(counting_provider):
+    curve = ZeroCurve('2021-03-15', provider=counting_provider)
+    assert sum(counting_provider.requests.values()) == 0
+
+    curve.LIBOR
+    assert counting_provider.requests == {'LIBOR' : 1, 'ED' : 0, 'IRS' : 0}
+    curve.curve()
+    curve.curve()
+    assert counting_provider.requests == {'LIBOR' : 1, 'ED' : 1, 'IRS' : 1}
+
+
+def test_zero_curve_given_quotes_are_not_fetched(snapshot_quotes, counting_provider):
+    present_date, LIBOR, ED, IRS = snapshot_quotes
+    curve = ZeroCurve(present_date, LIBOR, ED, provider=counting_provider)
+    curve.curve()
+    assert counting_provider.requests == {'LIBOR' : 0, 'ED' : 0, 'IRS' : 1}
+
+
+def test_present_date_defaults_to_the_provider(monkeypatch, snapshot_quotes):
+    monkeypatch.setenv('ZEROCURVE_SNAPSHOT', SNAPSHOT)
+    monkeypatch.setattr(quote_providers, '_default_provider', None)
+
+    curve = ZeroCurve()
+    assert curve.present_date == date(2021, 3, 15)
+    assert curve.curve() == ZeroCurve(*snapshot_quotes).curve()
+
+
+def test_quotes_and_present_date_can_be_reassigned(snapshot_quotes):
+    present_date, LIBOR, ED, IRS = snapshot_quotes
+    curve = ZeroCurve(present_date, LIBOR, ED, IRS)
+    curve.curve()
+
+    curve.IRS = OrderedDict((term, rate + 0.1) for term, rate in IRS.items())
+    bumped = OrderedDict((term, rate + 0.1) for term, rate in IRS.items())
+    assert curve.curve() == ZeroCurve(present_date, LIBOR, ED, bumped).curve()
+
+    curve.present_date = '2021-03-16'
+    assert curve.schedule.present_date == date(2021, 3, 16)
+    assert curve.curve() == ZeroCurve('2021-03-16', LIBOR, ED, bumped).curve()
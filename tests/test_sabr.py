@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from SABR import StochasticABR
+
+SPOT, BETA, TAU = 100.0, 0.5, 1.0
+STRIKES = np.array([80.0, 90.0, 95.0, 100.0, 105.0, 110.0, 120.0])
+PARAMS = (2.0, -0.3, 0.6)
+
+
+def market_vols(alpha, rho, vVol, spot=SPOT):
+    model = StochasticABR(BETA, 100.0, STRIKES, spot, TAU, np.zeros_like(STRIKES))
+    vols = np.empty_like(STRIKES)
+    vols[STRIKES != 100.0] = model.get_vol_of_out_atm(alpha, rho, vVol)
+    vols[STRIKES == 100.0] = model.get_vol_of_atm(alpha, rho, vVol)
+    return vols
+
+
+@pytest.fixture
+def model():
+    return StochasticABR(BETA, 100.0, STRIKES, SPOT, TAU, market_vols(*PARAMS))
+
+
+def test_residuals_match_the_objective(model):
+    args = (1.8, 0.1, 0.4)
+    assert np.sum(model.residuals(args) ** 2) == pytest.approx(float(model.calibrate_model(args)[0]), rel=1e-12)
+
+
+@pytest.mark.parametrize('args', [(1.8, 0.1, 0.4), (2.5, -0.7, 1.2), (2.0, 0.5, 0.05)])
+def test_jacobian_matches_finite_differences(model, args):
+    h = 1e-6
+    finiteDifferences = np.stack([
+        (model.residuals(np.add(args, step)) - model.residuals(np.subtract(args, step))) / (2 * h)
+        for step in h * np.eye(3)
+    ], axis=-1)
+
+    np.testing.assert_allclose(model.jacobian(np.array(args)), finiteDifferences, rtol=1e-5, atol=1e-9)
+
+
+def test_calibrate_recovers_the_parameters(model):
+    params = model.calibrate(xtol=1e-14, ftol=1e-14, gtol=1e-14)
+
+    np.testing.assert_allclose(params, PARAMS, rtol=1e-6)
+    np.testing.assert_allclose(model.residuals(params), 0, atol=1e-12)
+
+
+def test_update_market_warm_starts_from_the_last_fit(model):
+    model.calibrate(xtol=1e-14, ftol=1e-14, gtol=1e-14)
+    moved = (2.05, -0.32, 0.62)
+    model.update_market(market_vols(*moved, spot=101.0), spot=101.0)
+
+    evaluations = []
+    residuals = model.residuals
+    model.residuals = lambda args: evaluations.append(1) or residuals(args)
+
+    np.testing.assert_allclose(model.calibrate(xtol=1e-14, ftol=1e-14, gtol=1e-14), moved, rtol=1e-6)
+    assert len(evaluations) < 15
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from SABR import StochasticABR
+from SABRSurface import SmileQuote, calibrate_surface
+
+BETA = 0.5
+
+
+def smile(underlying, expiry, tau, params, strikes=np.arange(80.0, 121.0, 5.0), spot=100.0):
+    model = StochasticABR(BETA, spot, strikes, spot, tau, np.zeros_like(strikes))
+    vols = np.empty_like(strikes)
+    vols[strikes != spot] = model.get_vol_of_out_atm(*params)
+    vols[strikes == spot] = model.get_vol_of_atm(*params)
+    return SmileQuote(underlying, expiry, tau, spot, spot, strikes, vols)
+
+
+PARAMS = {
+    ('SPX', '2021-06-18'): (2.0, -0.3, 0.6),
+    ('SPX', '2021-04-16'): (1.5, -0.5, 0.9),
+    ('NDX', '2021-06-18'): (2.6, 0.1, 0.3),
+    ('NDX', '2021-09-17'): (1.2, -0.1, 0.5),
+}
+
+
+@pytest.fixture(scope='module')
+def smiles():
+    strikes = [np.arange(80.0, 121.0, 5.0), np.arange(90.0, 111.0, 5.0), np.arange(70.0, 131.0, 10.0), np.arange(85.0, 116.0, 5.0)]
+    return [smile(u, e, 0.25 * (i + 1), p, k) for i, ((u, e), p, k) in enumerate(zip(PARAMS, PARAMS.values(), strikes))]
+
+
+@pytest.fixture(scope='module')
+def surface(smiles):
+    return calibrate_surface(smiles, BETA, maxWorkers=1)
+
+
+def test_recovers_the_parameters(surface):
+    assert len(surface) == len(PARAMS)
+    for key, params in PARAMS.items():
+        np.testing.assert_allclose(surface.params(*key), params, rtol=1e-6)
+        assert surface[key]['converged']
+        assert surface[key]['rmse'] < 1e-10
+
+
+def test_table_is_sorted_by_underlying_and_expiry(surface):
+    assert surface.table['underlying'].tolist() == ['NDX', 'NDX', 'SPX', 'SPX']
+    assert surface.table['expiry'].astype(str).tolist() == ['2021-06-18', '2021-09-17', '2021-04-16', '2021-06-18']
+    assert surface.get('SPX', '2022-01-21') is None
+    with pytest.raises(KeyError):
+        surface['SPX', '2022-01-21']
+
+
+def test_batches_and_processes_match_one_batch(smiles, surface):
+    for kwargs in (dict(batchSize=1, maxWorkers=1), dict(batchSize=2, maxWorkers=2)):
+        other = calibrate_surface(smiles, BETA, **kwargs)
+        for key in PARAMS:
+            np.testing.assert_allclose(other.params(*key), surface.params(*key), rtol=1e-8)
+
+
+def test_matches_the_single_smile_calibration(smiles, surface):
+    for quote in smiles:
+        model = StochasticABR(BETA, quote.atTheMoney, quote.strikePrices, quote.spot, quote.tau, quote.marketVol)
+        np.testing.assert_allclose(surface.params(quote.underlying, quote.expiry), model.calibrate(), rtol=1e-6)
+
+
+def test_smiles_stopped_by_max_iterations_are_not_converged(smiles):
+    surface = calibrate_surface(smiles, BETA, maxWorkers=1, maxIterations=1)
+    assert not surface.table['converged'].any()
+    assert np.all(surface.table['iterations'] == 1)
+
+
+def test_warm_start_from_a_previous_surface(smiles, surface):
+    moved = [q._replace(marketVol=q.marketVol * 1.01) for q in smiles]
+    cold = calibrate_surface(moved, BETA, maxWorkers=1)
+    warm = calibrate_surface(moved, BETA, previous=surface, maxWorkers=1)
+
+    assert warm.table['converged'].all()
+    np.testing.assert_allclose(warm.table['rmse'], cold.table['rmse'], atol=1e-8)
+    assert warm.table['iterations'].sum() < cold.table['iterations'].sum()
+
+
+def test_no_smiles_raises_value_error():
+    with pytest.raises(ValueError):
+        calibrate_surface([], BETA)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from scipy.optimize import brentq
+
+from SABR import SERIES_Z_THRESHOLD, StochasticABR, sabr_vol, strike_terms
+
+BETA, SPOT, TAU = 0.5, 100.0, 1.0
+ALPHA = np.array([2.0, 1.5, 2.6])
+RHO = np.array([-0.3, -0.6, 0.2])
+VVOL = np.array([0.6, 0.9, 0.3])
+
+
+def test_matches_the_out_of_the_money_formula():
+    strikes = np.array([70.0, 85.0, 95.0, 105.0, 120.0, 150.0])
+    result = sabr_vol(ALPHA, RHO, VVOL, BETA, SPOT, TAU, strikes)
+
+    assert result.vol.shape == (3, len(strikes))
+    model = StochasticABR(BETA, SPOT, strikes, SPOT, TAU, np.zeros_like(strikes))
+    for i, params in enumerate(zip(ALPHA, RHO, VVOL)):
+        np.testing.assert_allclose(result.vol[i], model.get_vol_of_out_atm(*params), rtol=1e-12)
+
+
+def test_sensitivities_match_finite_differences():
+    # Strikes on both sides of the series / closed form switch of z / chi(z)
+    strikes = SPOT * np.exp(np.array([-0.3, -0.02, -1e-4, 0.0, 1e-4, 0.02, 0.3]))
+    result = sabr_vol(ALPHA, RHO, VVOL, BETA, SPOT, TAU, strikes)
+
+    h = 1e-6
+    vol = lambda alpha=ALPHA, rho=RHO, vVol=VVOL: sabr_vol(alpha, rho, vVol, BETA, SPOT, TAU, strikes).vol
+    np.testing.assert_allclose(result.dAlpha, (vol(alpha=ALPHA + h) - vol(alpha=ALPHA - h)) / (2 * h), rtol=1e-6)
+    np.testing.assert_allclose(result.dRho, (vol(rho=RHO + h) - vol(rho=RHO - h)) / (2 * h), rtol=1e-6, atol=1e-10)
+    np.testing.assert_allclose(result.dVVol, (vol(vVol=VVOL + h) - vol(vVol=VVOL - h)) / (2 * h), rtol=1e-6, atol=1e-10)
+
+
+def test_smooth_through_the_money():
+    logMoneyness = np.linspace(-1e-3, 1e-3, 201)
+    result = sabr_vol(ALPHA, RHO, VVOL, BETA, SPOT, TAU, SPOT * np.exp(logMoneyness))
+
+    assert np.all(np.isfinite(result.vol))
+    for values in result:
+        # A jump or kink at the money would show in the third differences at the size of the first ones
+        assert np.max(np.abs(np.diff(values, 3, axis=1))) < 1e-3 * np.max(np.abs(np.diff(values, axis=1)))
+
+
+def test_continuous_at_the_series_threshold():
+    # Strikes putting z just inside and just outside SERIES_Z_THRESHOLD for the first parameter set
+    def zValue(strike):
+        terms = strike_terms(SPOT, np.array([strike]), BETA)
+        return ALPHA[0] / VVOL[0] * terms.forwardXPower[0] * terms.logForwardXRatio[0]
+
+    strike = brentq(lambda k: zValue(k) - SERIES_Z_THRESHOLD, 50.0, SPOT, xtol=1e-14)
+    strikes = strike * np.array([1 - 1e-12, 1 + 1e-12])
+    assert zValue(strikes[0]) >= SERIES_Z_THRESHOLD > zValue(strikes[1])
+
+    result = sabr_vol(ALPHA[0], RHO[0], VVOL[0], BETA, SPOT, TAU, strikes)
+    for values in result:
+        assert values[0, 0] == pytest.approx(values[0, 1], rel=1e-8)
+
+
+def test_strikes_per_parameter_set_and_precomputed_terms():
+    strikes = np.array([[80.0, 100.0, 120.0], [90.0, 100.0, 110.0], [95.0, 100.0, 105.0]])
+    batched = sabr_vol(ALPHA, RHO, VVOL, BETA, SPOT, TAU, strikes)
+    for i in range(3):
+        single = sabr_vol(ALPHA[i], RHO[i], VVOL[i], BETA, SPOT, TAU, strikes[i])
+        np.testing.assert_allclose(batched.vol[i], single.vol[0], rtol=1e-14)
+
+    terms = strike_terms(SPOT, strikes, BETA)
+    np.testing.assert_array_equal(sabr_vol(ALPHA, RHO, VVOL, BETA, SPOT, TAU, None, terms=terms).vol, batched.vol)
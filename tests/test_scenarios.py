@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from scenarios import ScenarioEngine
+from zero_curve import ZeroCurve
+
+
+@pytest.fixture(scope='module')
+def engine():
+    from conftest import SNAPSHOT
+    from quote_providers import SnapshotQuoteProvider
+    provider = SnapshotQuoteProvider(SNAPSHOT)
+    return ScenarioEngine.from_quotes(
+        provider.present_date, provider.get('LIBOR'), provider.get('ED'), provider.get('IRS')
+    )
+
+
+@pytest.fixture(scope='module')
+def dates(engine):
+    return np.linspace(0.1, 29.5, 40)
+
+
+def rebuilt(engine, source, term, bump):
+    base = engine.curve
+    quotes = {'LIBOR' : OrderedDict(base.LIBOR), 'ED' : OrderedDict(base.ED_futures), 'IRS' : OrderedDict(base.IRS)}
+    quotes[source][term] += -bump if source == 'ED' else bump
+    present_date = datetime.strftime(base.present_date, '%Y-%m-%d')
+    return ZeroCurve(present_date, quotes['LIBOR'], quotes['ED'], quotes['IRS'])
+
+
+def test_zero_bump_is_the_base_curve(engine, dates):
+    bumped = engine.discount_factors(np.zeros((2, len(engine.quote_keys))), dates, max_workers=1)
+    base = engine.curve.compile().discount_factor(dates)
+    np.testing.assert_allclose(bumped, np.vstack([base, base]), rtol=1e-14)
+
+
+@pytest.mark.parametrize('source', ['LIBOR', 'ED', 'IRS'])
+def test_key_rate_bump_matches_a_rebuilt_curve(engine, dates, source):
+    index = next(i for i, key in enumerate(engine.quote_keys) if key[0] == source)
+    bumps = engine.key_rate_bumps(0.01)[index:index+1]
+
+    bumped = engine.discount_factors(bumps, dates, max_workers=1)
+    expected = rebuilt(engine, *engine.quote_keys[index], 0.01).compile().discount_factor(dates)
+    np.testing.assert_allclose(bumped[0], expected, rtol=1e-12)
+
+
+def test_rate_bumps_lower_discount_factors(engine, dates):
+    base = engine.curve.compile().discount_factor(dates)
+    bumped = engine.discount_factors(engine.parallel_bump(0.01), dates, max_workers=1)[0]
+    assert np.all(bumped <= base)
+    assert np.any(bumped < base)
+
+
+def test_process_pool_matches_serial(engine, dates):
+    bumps = engine.key_rate_bumps(0.01)
+    serial = engine.discount_factors(bumps, dates, max_workers=1)
+    pooled = engine.discount_factors(bumps, dates, max_workers=2, chunksize=4)
+    np.testing.assert_array_equal(serial, pooled)
+
+
+def test_sensitivities_of_a_portfolio(engine, dates):
+    amounts = np.linspace(1, 2, len(dates))
+    per_date = engine.key_rate_sensitivities(dates, max_workers=1)
+    portfolio = engine.key_rate_sensitivities(dates, amounts, max_workers=1)
+
+    assert per_date.shape == (len(engine.quote_keys), len(dates))
+    np.testing.assert_allclose(portfolio, per_date @ amounts)
+
+
+def test_twist_runs_from_short_to_long_size(engine):
+    twist = engine.twist(-0.01, 0.02)[0]
+    days = np.array(list(engine.maturities.values()))
+    assert twist[days.argmin()] == pytest.approx(-0.01)
+    assert twist[days.argmax()] == pytest.approx(0.02)
+
+
+def test_bumps_must_have_one_column_per_quote(engine, dates):
+    with pytest.raises(ValueError):
+        engine.discount_factors(np.zeros((1, len(engine.quote_keys) + 1)), dates)
@@ -0,0 +1,57 @@
+import calendar
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+import numpy as np
+import pytest
+
+from schedule import schedule_index
+
+PRESENT_DATES = [date(2021, 3, 15), date(2020, 8, 31), date(2020, 2, 29), date(2021, 1, 31)]
+
+
+def third_wednesday(year, month):
+    """ Settlement date of the Eurodollar Futures of a month, as computed before the schedule index """
+    wednesdays = [day for week in calendar.Calendar(calendar.SUNDAY).monthdatescalendar(year, month)
+                  for day in week if day.weekday() == calendar.WEDNESDAY and day.month == month]
+    return wednesdays[2]
+
+
+@pytest.mark.parametrize('present_date', PRESENT_DATES)
+def test_imm_days_are_third_wednesdays(present_date):
+    index = schedule_index(present_date)
+    for offset in range(-12, 12 * 32):
+        month = index.month_index(present_date) + offset
+        year, monthOfYear = divmod(month, 12)
+        expected = third_wednesday(year, monthOfYear + 1)
+        assert index.to_date(index.imm_day(month)) == expected
+
+
+@pytest.mark.parametrize('present_date', PRESENT_DATES)
+def test_coupon_days_roll_by_six_months(present_date):
+    index = schedule_index(present_date)
+    # Rolled coupon by coupon, carrying the clipped day of month forward
+    rolled, expected = present_date, [0]
+    for _ in range(len(index.coupon_days) - 1):
+        rolled += relativedelta(months=6)
+        expected.append((rolled - present_date).days)
+    np.testing.assert_array_equal(index.coupon_days, expected)
+    np.testing.assert_allclose(index.coupon_year_fractions, np.array(expected) / 360)
+
+
+def test_month_index_of_terms_and_dates():
+    index = schedule_index(date(2021, 3, 15))
+    assert index.month_index('MAR 2021') == index.month_index(date(2021, 3, 17)) == 2021 * 12 + 2
+    assert index.month_index('dec 2020') == 2020 * 12 + 11
+
+
+def test_months_outside_the_horizon_are_rejected():
+    index = schedule_index(date(2021, 3, 15), horizon_years=2)
+    with pytest.raises(ValueError):
+        index.imm_day(index.month_index('JAN 2020'))
+    with pytest.raises(ValueError):
+        index.imm_day(index.month_index('JAN 2025'))
+
+
+def test_schedule_index_is_shared():
+    assert schedule_index(date(2021, 3, 15)) is schedule_index(date(2021, 3, 15))
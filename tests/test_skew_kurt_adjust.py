@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from OptionPricing.SkewKurtAdjust import MODELS, OptionType, SkewKurtAdjust, calibrate_skew_kurt, price_chain
+
+SPOT, RATE, DIVIDEND = 100.0, 0.03, 0.01
+STRIKES = np.linspace(70, 130, 13)
+TAUS = np.array([0.1, 0.5, 1.0, 2.0])
+VOLS = np.array([0.3, 0.25, 0.2, 0.22])
+SKEWS = np.array([-0.6, -0.3, 0.0, 0.2])
+KURTS = np.array([4.5, 3.8, 3.0, 3.4])
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_chain_put_call_parity(model):
+    calls = price_chain(SPOT, STRIKES, RATE, VOLS, TAUS, DIVIDEND, SKEWS, KURTS, OptionType.CALL, model)
+    puts = price_chain(SPOT, STRIKES, RATE, VOLS, TAUS, DIVIDEND, SKEWS, KURTS, OptionType.PUT, model)
+
+    forward = SPOT * np.exp(-DIVIDEND * TAUS)[:, None]
+    discountedStrikes = STRIKES * np.exp(-RATE * TAUS)[:, None]
+    np.testing.assert_allclose(calls - puts, forward - discountedStrikes, rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize('model', MODELS)
+@pytest.mark.parametrize('optionType', list(OptionType))
+def test_chain_matches_scalar(model, optionType):
+    chain = price_chain(SPOT, STRIKES, RATE, VOLS, TAUS, DIVIDEND, SKEWS, KURTS, optionType, model)
+    for i, (tau, vol, skew, kurt) in enumerate(zip(TAUS, VOLS, SKEWS, KURTS)):
+        for j, strike in enumerate(STRIKES):
+            option = SkewKurtAdjust(SPOT, strike, RATE, vol, tau, DIVIDEND)
+            scalar = getattr(option, f'get_option_value_{model}')(skew, kurt, optionType)
+            assert chain[i, j] == pytest.approx(scalar, rel=1e-12, abs=1e-12)
+
+
+def test_corrado_su_normal_case_is_black_scholes():
+    # No skewness and no excess kurtosis: no adjustment
+    calls = price_chain(SPOT, STRIKES, RATE, VOLS, TAUS, DIVIDEND, 0.0 * SKEWS, 3.0 + 0.0 * KURTS,
+                        OptionType.CALL, 'corrado_su')
+    option = SkewKurtAdjust(SPOT, STRIKES, RATE, VOLS[:, None], TAUS[:, None], DIVIDEND)
+    np.testing.assert_allclose(calls, option.callOptionValue, rtol=1e-12)
+
+
+@pytest.mark.parametrize('model', ['jarrow_rudd', 'corrado_su'])
+@pytest.mark.parametrize('optionType', list(OptionType))
+def test_calibration_round_trip(model, optionType):
+    # Puts from the calls by put-call parity, independently of the put formulas
+    prices = price_chain(SPOT, STRIKES, RATE, VOLS, TAUS, DIVIDEND, SKEWS, KURTS, OptionType.CALL, model)
+    if optionType == OptionType.PUT:
+        prices = prices - SPOT * np.exp(-DIVIDEND * TAUS)[:, None] + STRIKES * np.exp(-RATE * TAUS)[:, None]
+
+    fit = calibrate_skew_kurt(SPOT, STRIKES, RATE, VOLS, TAUS, DIVIDEND, prices, optionType, model)
+
+    np.testing.assert_allclose(fit.skew, SKEWS, atol=1e-8)
+    np.testing.assert_allclose(fit.kurt, KURTS, atol=1e-8)
+    assert np.all(fit.rmse < 1e-10)
+
+
+def test_calibration_round_trip_mixed_chain_with_vol():
+    # Out-of-the-money puts below the spot, calls above
+    optionType = (STRIKES < SPOT).astype(int)
+    prices = price_chain(SPOT, STRIKES, RATE, VOLS, TAUS, DIVIDEND, SKEWS, KURTS, optionType, 'corrado_su')
+
+    fit = calibrate_skew_kurt(SPOT, STRIKES, RATE, None, TAUS, DIVIDEND, prices, optionType, 'corrado_su', fitVol=True)
+
+    np.testing.assert_allclose(fit.vol, VOLS, atol=1e-6)
+    np.testing.assert_allclose(fit.skew, SKEWS, atol=1e-4)
+    np.testing.assert_allclose(fit.kurt, KURTS, atol=1e-4)
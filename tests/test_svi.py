@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from SVI import SVI, svi_total_variance
+
+FORWARD, TAU = 100.0, 0.5
+STRIKES = np.linspace(60.0, 140.0, 17)
+PARAMS = (0.02, 0.1, -0.4, 0.02, 0.15)
+
+
+@pytest.fixture
+def svi():
+    k = np.log(STRIKES / FORWARD)
+    return SVI(STRIKES, FORWARD, TAU, np.sqrt(svi_total_variance(k, *PARAMS) / TAU))
+
+
+def test_residuals_match_the_objective(svi):
+    args = (0.01, 0.2, 0.1, -0.05, 0.3)
+    assert np.sum(svi.residuals(args) ** 2) == pytest.approx(svi.calibration(args), rel=1e-12)
+
+
+@pytest.mark.parametrize('args', [(0.01, 0.2, 0.1, -0.05, 0.3), PARAMS, (0.03, 0.5, -0.9, 0.3, 0.01)])
+def test_jacobian_matches_finite_differences(svi, args):
+    h = 1e-7
+    finiteDifferences = np.stack([
+        (svi.residuals(np.add(args, step)) - svi.residuals(np.subtract(args, step))) / (2 * h)
+        for step in h * np.eye(5)
+    ], axis=-1)
+
+    np.testing.assert_allclose(svi.jacobian(args), finiteDifferences, rtol=1e-6, atol=1e-9)
+
+
+def test_calibrate_recovers_the_parameters(svi):
+    params = svi.calibrate(xtol=1e-15, ftol=1e-15, gtol=1e-15)
+
+    np.testing.assert_allclose(params, PARAMS, rtol=1e-6)
+    np.testing.assert_array_equal(svi.params, params)
+
+
+def test_calibrate_quasi_explicit_recovers_the_parameters(svi):
+    params = svi.calibrate_quasi_explicit()
+
+    np.testing.assert_allclose(params, PARAMS, rtol=1e-5)
+    np.testing.assert_allclose(svi.residuals(params), 0, atol=1e-10)
+
+
+def test_linear_fit_is_exact_at_the_true_mu_and_sigma(svi):
+    (alpha, beta, rho), objective = svi.linear_fit(*PARAMS[3:])
+
+    np.testing.assert_allclose((alpha, beta, rho), PARAMS[:3], rtol=1e-10)
+    assert objective < 1e-24
+
+
+def test_linear_fit_keeps_rho_within_bounds():
+    # A skew steeper than any |rho| <= 1 allows at this (mu, sigma)
+    marketvol = np.linspace(0.6, 0.05, len(STRIKES))
+    svi = SVI(STRIKES, FORWARD, TAU, marketvol)
+    lower, upper = svi.bounds()
+
+    (alpha, beta, rho), _ = svi.linear_fit(0.0, 0.5)
+    assert lower[0] <= alpha <= upper[0]
+    assert lower[1] <= beta <= upper[1]
+    assert -1 <= rho <= 1
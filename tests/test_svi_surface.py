@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from SVI import svi_total_variance
+from SVISurface import SVISurface
+
+TAUS = np.array([0.25, 0.5, 1.0, 2.0])
+FORWARDS = np.array([100.0, 100.5, 101.0, 102.0])
+PARAMS = np.array([(0.01 * tau, 0.05 * np.sqrt(tau), -0.4, 0.0, 0.1) for tau in TAUS])
+
+
+def slices(params=PARAMS):
+    strikes = [np.linspace(60.0, 140.0, 17) for _ in TAUS]
+    vols = [np.sqrt(svi_total_variance(np.log(K / F), *p) / tau)
+            for K, F, p, tau in zip(strikes, FORWARDS, params, TAUS)]
+    return strikes, FORWARDS, TAUS, vols
+
+
+@pytest.fixture(scope='module')
+def surface():
+    return SVISurface(TAUS, FORWARDS, PARAMS)
+
+
+@pytest.mark.parametrize('quasiExplicit, kwargs', [(False, dict(xtol=1e-15, ftol=1e-15, gtol=1e-15)), (True, dict())])
+def test_calibrate_fits_every_slice_without_calendar_arbitrage(quasiExplicit, kwargs):
+    # Expiries given out of order are sorted by tau
+    strikes, forwards, taus, vols = slices()
+    order = [2, 0, 3, 1]
+    surface = SVISurface.calibrate([strikes[i] for i in order], forwards[order], taus[order], [vols[i] for i in order],
+                                   quasiExplicit=quasiExplicit, **kwargs)
+
+    np.testing.assert_array_equal(surface.taus, TAUS)
+    np.testing.assert_allclose(surface.params, PARAMS, rtol=1e-5, atol=1e-8)
+    assert not surface.calendarViolations.any()
+
+
+def test_calendar_violation_is_flagged():
+    params = PARAMS.copy()
+    params[2, 0] = 0.001   # total variance of the 1y slice below that of the 6m slice
+    strikes, forwards, taus, vols = slices(params)
+
+    surface = SVISurface.calibrate(strikes, forwards, taus, vols)
+    assert surface.calendarViolations.tolist() == [False, True, False]
+
+    with pytest.raises(ValueError, match='0.5 and 1'):
+        SVISurface.calibrate(strikes, forwards, taus, vols, strict=True)
+
+
+def test_warm_start_from_a_previous_surface(surface):
+    strikes, forwards, taus, vols = slices()
+    warm = SVISurface.calibrate(strikes, forwards, taus, vols, previous=surface)
+    np.testing.assert_allclose(warm.params, PARAMS, rtol=1e-8, atol=1e-12)
+
+
+def test_interpolation_matches_the_slices_at_the_expiries(surface):
+    strikes = np.linspace(70.0, 130.0, 13)
+    for tau, forward, params in zip(TAUS, FORWARDS, PARAMS):
+        np.testing.assert_allclose(
+            surface.total_variance(strikes, tau), svi_total_variance(np.log(strikes / forward), *params), rtol=1e-14
+        )
+
+
+def test_interpolation_between_and_outside_the_expiries(surface):
+    # Total variance increases with tau at fixed k and implied vol is flat in tau after the last expiry
+    k = np.linspace(-0.3, 0.3, 7)
+    taus = np.linspace(0.05, 4.0, 80)[:, None]
+    w = surface.total_variance(surface.forward(taus) * np.exp(k), taus)
+
+    assert np.all(np.diff(w, axis=0) > 0)
+    np.testing.assert_allclose(surface.total_variance(FORWARDS[0] * np.exp(k), 0.0), 0.0, atol=1e-15)
+    np.testing.assert_allclose(
+        surface.implied_vol(FORWARDS[-1] * np.exp(k), 3.0), surface.implied_vol(FORWARDS[-1] * np.exp(k), 2.0), rtol=1e-14
+    )
+
+
+def test_round_trips_through_arrays(surface):
+    restored = SVISurface.from_arrays(surface.to_arrays())
+    for name, value in surface.to_arrays().items():
+        np.testing.assert_array_equal(restored.to_arrays()[name], value)
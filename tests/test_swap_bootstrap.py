@@ -0,0 +1,118 @@
+import calendar
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from math import exp, log
+
+from dateutil.relativedelta import relativedelta
+import numpy as np
+import pytest
+from scipy.interpolate import CubicSpline
+
+from swap_bootstrap import bootstrap_discount_factors, long_end_zero_rates
+from zero_curve import ZeroCurve
+
+
+# ----------------------------------------------------------------
+# Date-by-date iterative bootstrap the curve was built with before the schedule index and the closed form
+
+def _settlement(term):
+    day = datetime.strptime(term, '%b %Y').date() if isinstance(term, str) else term
+    return [d for week in calendar.Calendar(calendar.SUNDAY).monthdatescalendar(day.year, day.month)
+            for d in week if d.weekday() == calendar.WEDNESDAY and d.month == day.month][2]
+
+
+def _interpolate(curve, day):
+    for t1, t2 in zip(list(curve)[:-1], list(curve)[1:]):
+        if t1 <= day <= t2:
+            return ((t2 - day).days * curve[t1] + (day - t1).days * curve[t2]) / (t2 - t1).days
+
+
+def reference_curve(present_date, LIBOR, ED, IRS, VOL=0.005):
+    present_date = datetime.strptime(present_date, '%Y-%m-%d').date()
+    delta = lambda day: (day - present_date).days / 360
+
+    short = dict()
+    for term, rate in LIBOR.items():
+        if term == 'overnight':
+            continue
+        days = int(term[0]) * 7 if 'week' in term else (int(term[0]) * 365 if '12' in term else int(term[0]) * 30)
+        short[present_date + timedelta(days)] = -log(1 / (1 + days / 360 * rate / 100)) / (days / 360) * 100
+    short = OrderedDict(sorted(short.items()))
+
+    middle, i, zero_rate = OrderedDict(), 0, None
+    while zero_rate is None:
+        zero_date = _settlement(list(ED)[i])
+        zero_rate = _interpolate(short, zero_date)
+        i += 1
+    discount_factor = exp(-delta(zero_date) * zero_rate / 100)
+    month = lambda day: datetime.strftime(day, '%b %Y').upper()
+    while month(zero_date) in ED:
+        settlement_date = zero_date
+        zero_date = _settlement(settlement_date + relativedelta(months=3))
+        forward_rate = 100 - ED[month(settlement_date)] - 0.5 * VOL ** 2 * delta(settlement_date) * delta(zero_date) * 100
+        discount_factor /= 1 + (zero_date - settlement_date).days / 360 * forward_rate / 100
+        middle[zero_date] = 100 * -log(discount_factor) / delta(zero_date)
+
+    years = lambda term: int(term.replace('-Year', ''))
+    zero_date = present_date + relativedelta(years=years(next(iter(IRS))))
+    sum_discount_factor = exp(-0.5 * _interpolate(middle, zero_date - relativedelta(months=6)) / 100)
+    spline = CubicSpline([years(term) * 365 for term in IRS], list(IRS.values()))
+    long, term_date = OrderedDict(), present_date + relativedelta(months=6)
+    for term in np.linspace(1, 31, 60, endpoint=False)[:-1]:
+        term_date += relativedelta(months=6)
+        swap_rate = spline((term_date - present_date).days) / 100
+        discount_factor = (1 - 0.5 * swap_rate * sum_discount_factor) / (1 + 0.5 * swap_rate)
+        long[term_date] = 100 * -log(discount_factor) / term
+        sum_discount_factor += discount_factor
+
+    return {**dict(list(short.items())[:2]), **dict(list(middle.items())[:3]), **long}
+
+
+# ----------------------------------------------------------------
+
+@pytest.mark.parametrize('present_date', ['2021-03-15', '2021-02-26', '2021-01-29'])
+def test_curve_matches_the_iterative_bootstrap(snapshot_quotes, present_date):
+    _, LIBOR, ED, IRS = snapshot_quotes
+    expected = reference_curve(present_date, LIBOR, ED, IRS)
+    curve = ZeroCurve(present_date, LIBOR, ED, IRS).curve()
+
+    assert list(curve) == list(expected)
+    np.testing.assert_allclose(list(curve.values()), list(expected.values()), rtol=1e-12, atol=1e-12)
+
+
+def test_closed_form_solves_the_par_swap_equations():
+    rng = np.random.default_rng(0)
+    swap_rates = rng.uniform(0.001, 0.05, (4, 59))
+    initial = rng.uniform(0.97, 0.999, 4)
+
+    D = bootstrap_discount_factors(swap_rates, initial)
+
+    # 0.5 * s_i * (D_0 + ... + D_i) + D_i = 1 for every curve and term
+    sums = initial[:, None] + np.cumsum(D, axis=1)
+    np.testing.assert_allclose(0.5 * swap_rates * sums + D, 1.0, rtol=0, atol=1e-13)
+
+
+def test_batched_long_end_matches_curve_by_curve():
+    IRS_days = np.array([1, 2, 3, 5, 7, 10, 30]) * 365
+    rng = np.random.default_rng(1)
+    IRS_rates = np.sort(rng.uniform(0.1, 2.5, (3, 5, len(IRS_days))), axis=-1)
+    term_days = np.arange(2, 61) * 182.5
+    terms = np.linspace(1, 31, 60, endpoint=False)[:-1]
+    initial = rng.uniform(0.05, 0.3, (3, 5))
+
+    batched = long_end_zero_rates(IRS_days, IRS_rates, term_days, terms, initial)
+    for index in np.ndindex(3, 5):
+        single = long_end_zero_rates(IRS_days, IRS_rates[index], term_days, terms, initial[index])
+        np.testing.assert_allclose(batched[index], single, rtol=1e-13)
+
+
+def test_batched_long_end_with_terms_per_curve():
+    IRS_days = np.array([1, 2, 3, 5, 7, 10, 30]) * 365
+    IRS_rates = np.array([[0.2, 0.3, 0.5, 0.9, 1.3, 1.6, 2.1], [0.1, 0.2, 0.4, 0.8, 1.2, 1.5, 2.0]])
+    term_days = np.array([np.arange(2, 61) * 182, np.arange(2, 61) * 183])
+    terms = np.linspace(1, 31, 60, endpoint=False)[:-1]
+
+    batched = long_end_zero_rates(IRS_days, IRS_rates, term_days, terms, np.array([0.1, 0.2]))
+    for i in range(2):
+        single = long_end_zero_rates(IRS_days, IRS_rates[i], term_days[i], terms, [0.1, 0.2][i])
+        np.testing.assert_allclose(batched[i], single, rtol=1e-13)
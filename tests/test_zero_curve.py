@@ -0,0 +1,68 @@
+from collections import OrderedDict
+
+import pytest
+
+from zero_curve import ZeroCurve
+
+BUILDERS = ('short', 'middle', 'long')
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """ Count the bootstraps of each segment """
+    counts = dict.fromkeys(BUILDERS, 0)
+    for name in BUILDERS:
+        attribute = f'_ZeroCurve__build_{name}_end_curve' if name != 'middle' else '_ZeroCurve__build_middle_curve'
+        build = getattr(ZeroCurve, attribute)
+
+        def counted(self, build=build, name=name):
+            counts[name] += 1
+            return build(self)
+        monkeypatch.setattr(ZeroCurve, attribute, counted)
+    return counts
+
+
+def bump(quotes, size):
+    return OrderedDict((term, rate + size) for term, rate in quotes.items())
+
+
+def test_segments_are_built_once(snapshot_quotes, builds):
+    curve = ZeroCurve(*snapshot_quotes)
+    curve.curve()
+    curve.curve()
+    curve.compile()
+    assert builds == {'short' : 1, 'middle' : 1, 'long' : 1}
+
+
+def test_changing_irs_only_rebuilds_the_long_end(snapshot_quotes, builds):
+    present_date, LIBOR, ED, IRS = snapshot_quotes
+    curve = ZeroCurve(present_date, LIBOR, ED, IRS)
+    curve.curve()
+
+    curve.update_quotes(IRS={'10-Year' : IRS['10-Year'] + 0.05})
+    updated = curve.curve()
+    assert builds == {'short' : 1, 'middle' : 1, 'long' : 2}
+
+    expected = ZeroCurve(present_date, LIBOR, ED, OrderedDict(IRS, **{'10-Year' : IRS['10-Year'] + 0.05})).curve()
+    assert updated == expected
+
+
+def test_changing_libor_rebuilds_every_segment(snapshot_quotes, builds):
+    present_date, LIBOR, ED, IRS = snapshot_quotes
+    curve = ZeroCurve(present_date, LIBOR, ED, IRS)
+    curve.curve()
+    curve.update_quotes(LIBOR=bump(LIBOR, 0.01))
+    curve.curve()
+    assert builds == {'short' : 2, 'middle' : 2, 'long' : 2}
+
+
+def test_bumped_copy_shares_unaffected_segments(snapshot_quotes, builds):
+    present_date, LIBOR, ED, IRS = snapshot_quotes
+    base = ZeroCurve(present_date, LIBOR, ED, IRS)
+    baseCurve = base.curve()
+
+    bumped = base.bumped(ED=bump(ED, -0.01))
+    assert bumped.curve() == ZeroCurve(present_date, LIBOR, bump(ED, -0.01), IRS).curve()
+    # The bumped copy reused the short end; the fresh curve above built its own
+    assert builds == {'short' : 2, 'middle' : 3, 'long' : 3}
+    assert base.curve() == baseCurve